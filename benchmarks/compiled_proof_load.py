@@ -0,0 +1,33 @@
+"""
+Compares loading a long proof from text and from the binary compiled format.
+
+Usage: python benchmarks/compiled_proof_load.py [number of lines]
+"""
+import sys
+import time
+
+from formal_proof_verifier import create_lines_from_text
+from formal_proof_verifier.compiled_proof import dumps, loads
+from formal_proof_verifier.proof_store import ProofStore
+from proof_store_memory import create_proof_text
+
+def measure(name: str, function):
+    start: float = time.perf_counter()
+    result = function()
+    print(f"{name}: {time.perf_counter() - start:.3f} s")
+    return result
+
+def main() -> None:
+    number_of_lines: int = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    text: str = create_proof_text(number_of_lines)
+    print(f"lines: {number_of_lines}")
+
+    measure("create_lines_from_text", lambda: list(create_lines_from_text(text)))
+    store: ProofStore = measure("ProofStore.from_text", lambda: ProofStore.from_text(text))
+    data: bytes = dumps(store)
+    print(f"text: {len(text.encode()) / 2 ** 10:.0f} KiB, compiled: {len(data) / 2 ** 10:.0f} KiB")
+    loaded: ProofStore = measure("loads", lambda: loads(data))
+    assert loaded.verify() == store.verify()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Measures the time spent in the cyclic garbage collector
+while large proofs are loaded, verified and released.
+
+Usage: python benchmarks/gc_pressure.py [number of lines] [number of rounds]
+"""
+import gc
+import sys
+import time
+from typing import Dict, List
+
+from formal_proof_verifier import create_lines_from_text
+
+def create_proof_text(number_of_lines: int) -> str:
+    # Blocks of an assumption and a conditional proof discharging it.
+    lines_str: List[str] = []
+    for i in range(1, number_of_lines, 2):
+        lines_str.append(f"{i} {i} P&Q A")
+        lines_str.append(f"- {i + 1} (P&Q)>(P&Q) {i},{i} CP")
+    return "\n".join(lines_str)
+
+def main() -> None:
+    number_of_lines: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    number_of_rounds: int = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    gc_time: float = 0.0
+    gc_collections: Dict[int, int] = {0: 0, 1: 0, 2: 0}
+    gc_start: float = 0.0
+
+    def callback(phase: str, info: Dict[str, int]) -> None:
+        nonlocal gc_time, gc_start
+        if phase == "start":
+            gc_start = time.perf_counter()
+        else:
+            gc_time += time.perf_counter() - gc_start
+            gc_collections[info["generation"]] += 1
+
+    text: str = create_proof_text(number_of_lines)
+
+    gc.collect()
+    gc.callbacks.append(callback)
+    start: float = time.perf_counter()
+    for _ in range(number_of_rounds):
+        lines = create_lines_from_text(text)
+        assert all(line[1].is_valid() for line in lines)
+        del lines
+    total_time: float = time.perf_counter() - start
+    gc.callbacks.remove(callback)
+
+    print(f"lines: {number_of_lines}, rounds: {number_of_rounds}")
+    print(f"total time: {total_time:.3f} s")
+    print(f"gc time: {gc_time:.3f} s ({100 * gc_time / total_time:.1f} %)")
+    print(f"gc collections per generation: {gc_collections}")
+
+if __name__ == "__main__":
+    main()
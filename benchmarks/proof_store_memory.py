@@ -0,0 +1,49 @@
+"""
+Compares the memory used by a long proof as `Line` objects
+and as a struct-of-arrays `ProofStore`.
+
+Usage: python benchmarks/proof_store_memory.py [number of lines]
+"""
+import sys
+import time
+import tracemalloc
+from typing import List
+
+from formal_proof_verifier import create_lines_from_text
+from formal_proof_verifier.proof_store import ProofStore
+
+def create_proof_text(number_of_lines: int) -> str:
+    # A premise, followed by double negation introductions and eliminations.
+    lines_str: List[str] = ["1 1 P&(Q>R) P"]
+    for i in range(2, number_of_lines + 1):
+        if i % 2 == 0:
+            lines_str.append(f"1 {i} ~(~(P&(Q>R))) {i - 1} DNI")
+        else:
+            lines_str.append(f"1 {i} P&(Q>R) {i - 1} DNE")
+    return "\n".join(lines_str)
+
+def measure(name: str, function) -> None:
+    tracemalloc.start()
+    start: float = time.perf_counter()
+    result = function()
+    elapsed: float = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name}: {size / 2 ** 20:.1f} MiB, {elapsed:.2f} s (under tracemalloc)")
+    return result
+
+def main() -> None:
+    number_of_lines: int = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    text: str = create_proof_text(number_of_lines)
+    print(f"lines: {number_of_lines}")
+
+    lines = measure("lines", lambda: list(create_lines_from_text(text)))
+    del lines
+    store = measure("store", lambda: ProofStore.from_text(text))
+
+    start: float = time.perf_counter()
+    assert all(store.verify())
+    print(f"store verification: {time.perf_counter() - start:.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,7 @@
+# The modules imported with the package (`formal_proof_verifier`, `formula`,
+# `line`, `rule` and `metrics`) and `cli` import `typing` only for type
+# checkers, behind `TYPE_CHECKING = False` and `from __future__ import
+# annotations`, because `typing` also imports `re` and other modules.
+# The other modules are imported on demand, and import `typing` as usual.
+# See the "Import-time budget" section of the README.
 from .formal_proof_verifier import Line, create_lines, create_lines_from_text
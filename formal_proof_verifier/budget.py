@@ -0,0 +1,129 @@
+import time
+from typing import Optional
+from .metrics import OperationCounter
+
+class Budget:
+    """
+    Limits of the work done on one proof by `verify_text`,
+    so that a pathological proof cannot pin a worker.
+    Each limit is `None` for no limit.
+    - `max_formula_length`: characters of the formula of a line,
+    - `max_formula_depth`: nesting depth of the parentheses of a formula,
+    - `max_lines`: lines of the proof,
+    - `max_nodes`: work units counted by `metrics` (formula nodes compared,
+      tokens, cited lines checked, dependency comparisons and formula nodes
+      evaluated by the sequent check),
+    - `deadline`: seconds of wall-clock time.
+    """
+    def __init__(
+        self,
+        max_formula_length: Optional[int] = None,
+        max_formula_depth: Optional[int] = None,
+        max_lines: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ):
+        self._max_formula_length: Optional[int] = max_formula_length
+        self._max_formula_depth: Optional[int] = max_formula_depth
+        self._max_lines: Optional[int] = max_lines
+        self._max_nodes: Optional[int] = max_nodes
+        self._deadline: Optional[float] = deadline
+
+    @property
+    def max_formula_length(self) -> Optional[int]:
+        return self._max_formula_length
+
+    @property
+    def max_formula_depth(self) -> Optional[int]:
+        return self._max_formula_depth
+
+    @property
+    def max_lines(self) -> Optional[int]:
+        return self._max_lines
+
+    @property
+    def max_nodes(self) -> Optional[int]:
+        return self._max_nodes
+
+    @property
+    def deadline(self) -> Optional[float]:
+        return self._deadline
+
+class BudgetExceeded(RuntimeError):
+    """
+    Raised when a limit of a `Budget` is exceeded.
+    `limit` is the name of the limit, like `"max_lines"`.
+    """
+    def __init__(self, limit: str, message: str):
+        super().__init__(f"Error: budget exceeded, {message}.")
+        self._limit: str = limit
+
+    @property
+    def limit(self) -> str:
+        return self._limit
+
+def formula_depth(formula_str: str) -> int:
+    """
+    Returns the nesting depth of the parentheses of a formula string,
+    without parsing it.
+    """
+    depth: int = 0
+    max_depth: int = 0
+    for c in formula_str:
+        if c == "(":
+            depth += 1
+            if depth > max_depth:
+                max_depth = depth
+        elif c == ")":
+            depth -= 1
+    return max_depth
+
+class BudgetCounter(OperationCounter):
+    """
+    Operation counter enforcing the `max_nodes` and `deadline` limits
+    of a budget while it is active: the work is interrupted
+    with `BudgetExceeded` at the first counted operation past a limit.
+    The deadline starts when the counter is created.
+    """
+    # The clock is only read every this many counted operations.
+    CLOCK_INTERVAL: int = 64
+
+    __slots__ = ("_budget", "_total", "_number_of_calls", "_deadline_time")
+
+    def __init__(self, budget: Budget):
+        super().__init__()
+        self._budget: Budget = budget
+        self._total: int = 0
+        self._number_of_calls: int = 0
+        self._deadline_time: Optional[float] = (
+            time.monotonic() + budget.deadline if budget.deadline is not None else None
+        )
+
+    def add(self, name: str, count: int = 1) -> None:
+        super().add(name, count)
+        self._total += count
+        if self._budget.max_nodes is not None and self._total > self._budget.max_nodes:
+            raise BudgetExceeded("max_nodes", f"more than {self._budget.max_nodes} nodes visited")
+        self._number_of_calls += 1
+        if self._number_of_calls % BudgetCounter.CLOCK_INTERVAL == 0:
+            self.check_deadline()
+
+    def check_deadline(self) -> None:
+        if self._deadline_time is not None and time.monotonic() > self._deadline_time:
+            raise BudgetExceeded("deadline", f"more than {self._budget.deadline} seconds")
+
+def check_lines(budget: Budget, number_of_lines: int) -> None:
+    if budget.max_lines is not None and number_of_lines > budget.max_lines:
+        raise BudgetExceeded("max_lines", f"more than {budget.max_lines} lines")
+
+def check_formula(budget: Budget, formula_str: str, line_number_str: str) -> None:
+    if budget.max_formula_length is not None and len(formula_str) > budget.max_formula_length:
+        raise BudgetExceeded(
+            "max_formula_length",
+            f"the formula of line number '{line_number_str}' is longer than {budget.max_formula_length} characters",
+        )
+    if budget.max_formula_depth is not None and formula_depth(formula_str) > budget.max_formula_depth:
+        raise BudgetExceeded(
+            "max_formula_depth",
+            f"the formula of line number '{line_number_str}' is nested deeper than {budget.max_formula_depth}",
+        )
@@ -0,0 +1,212 @@
+from __future__ import annotations
+import sys
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterator, List, Optional, Tuple
+    from .budget import Budget
+
+# Keep this module cheap to import: the `fpv` command is often started
+# once per file, so everything heavier than `sys` (`typing`, argument parsing,
+# the verifier itself, `json`, process pools) is imported on demand.
+# See the "Import-time budget" section of the README.
+
+STDIN_PATH: str = "-"
+
+def _read_proof(path: str) -> str:
+    if path == STDIN_PATH:
+        return sys.stdin.read()
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+def _verify_path(
+    path: str,
+    fail_fast: bool,
+    check_sequent: bool,
+    target: Optional[str],
+    budget: Optional[Budget],
+):
+    from .verification import ProofReport, verify_text
+
+    try:
+        text: str = _read_proof(path)
+    except OSError as error:
+        return ProofReport([], error=f"Error: {error.strerror}: '{path}'.")
+    return verify_text(
+        text,
+        fail_fast=fail_fast,
+        check_sequent=check_sequent,
+        target=target,
+        budget=budget,
+    )
+
+def _verify_paths(
+    paths: List[str],
+    jobs: int,
+    fail_fast: bool,
+    check_sequent: bool,
+    target: Optional[str],
+    budget: Optional[Budget],
+) -> Iterator[Tuple[str, object]]:
+    # Standard input can only be read by this process,
+    # so it is never handed over to the worker processes.
+    if jobs <= 1 or len(paths) <= 1 or STDIN_PATH in paths:
+        for path in paths:
+            yield path, _verify_path(path, fail_fast, check_sequent, target, budget)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        reports = executor.map(
+            _verify_path,
+            paths,
+            [fail_fast] * len(paths),
+            [check_sequent] * len(paths),
+            [target] * len(paths),
+            [budget] * len(paths),
+        )
+        try:
+            for path, report in zip(paths, reports):
+                yield path, report
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+def _format_text(path: str, report) -> str:
+    if report.error is not None:
+        return f"{path}: ERROR {report.error}"
+    dead_lines: List[str] = [
+        f"{path}: dead line '{line.line_str}'"
+        for line in report.dead_lines()
+    ]
+    if report.is_valid:
+        return "\n".join([f"{path}: OK"] + dead_lines)
+    else:
+        invalid_lines: List[str] = [
+            f"{path}: invalid line '{line.line_str}'"
+            for line in report.invalid_lines()
+        ]
+        return "\n".join([f"{path}: FAILED"] + invalid_lines + dead_lines)
+
+def _parse_arguments(argv: Optional[List[str]]):
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(prog="fpv", description="Formal logic proof verifier.")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        metavar="PATH",
+        help=f"proof files to verify, '{STDIN_PATH}' or no path reads standard input",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes verifying files in parallel",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("text", "json"),
+        default="text",
+        help="output format",
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="stop at the first invalid line or file",
+    )
+    parser.add_argument(
+        "--check-sequent",
+        action="store_true",
+        help="check the sequent of the proofs for a counterexample first",
+    )
+    parser.add_argument(
+        "--target",
+        metavar="LINE",
+        help="only verify the lines the line numbered LINE is derived from, "
+        "and report the other lines as dead",
+    )
+    parser.add_argument(
+        "--max-lines",
+        type=int,
+        metavar="N",
+        help="stop verifying a proof with more than N lines",
+    )
+    parser.add_argument(
+        "--max-formula-length",
+        type=int,
+        metavar="N",
+        help="stop verifying a proof with a formula longer than N characters",
+    )
+    parser.add_argument(
+        "--max-formula-depth",
+        type=int,
+        metavar="N",
+        help="stop verifying a proof with a formula nested deeper than N parentheses",
+    )
+    parser.add_argument(
+        "--max-nodes",
+        type=int,
+        metavar="N",
+        help="stop verifying a proof after N work units (formula nodes, tokens, lines)",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="stop verifying a proof after SECONDS seconds",
+    )
+    arguments = parser.parse_args(argv)
+    if arguments.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if len(arguments.paths) == 0:
+        arguments.paths = [STDIN_PATH]
+    return arguments
+
+def _budget(arguments) -> Optional[Budget]:
+    limits = dict(
+        max_formula_length=arguments.max_formula_length,
+        max_formula_depth=arguments.max_formula_depth,
+        max_lines=arguments.max_lines,
+        max_nodes=arguments.max_nodes,
+        deadline=arguments.deadline,
+    )
+    if all(limit is None for limit in limits.values()):
+        return None
+    from .budget import Budget
+
+    return Budget(**limits)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point of the `fpv` command.
+    Returns 0 if every proof is valid, and 1 otherwise.
+    """
+    arguments = _parse_arguments(argv)
+
+    results: List[Tuple[str, object]] = []
+    reports = _verify_paths(
+        arguments.paths,
+        arguments.jobs,
+        arguments.fail_fast,
+        arguments.check_sequent,
+        arguments.target,
+        _budget(arguments),
+    )
+    for path, report in reports:
+        results.append((path, report))
+        if arguments.format == "text":
+            print(_format_text(path, report))
+        if arguments.fail_fast and not report.is_valid:
+            break
+    reports.close()
+
+    if arguments.format == "json":
+        from json import dumps
+
+        print(dumps([dict(path=path, **report.to_dict()) for path, report in results], indent=2))
+
+    return 0 if all(report.is_valid for _, report in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+import struct
+import sys
+from array import array
+from typing import List, Tuple
+from zlib import crc32
+from .proof_store import FormulaTable, ProofStore, RULE_SYMBOLS
+
+# Binary format of a parsed proof (a `ProofStore` and its `FormulaTable`),
+# which is loaded without tokenising or parsing any formula:
+#
+#   header:  magic (4 bytes), version (u16), reserved (u16),
+#            payload length (u32), CRC-32 of the payload (u32)
+#   payload: the strings of the formula table, then the arrays of the
+#            formula table and of the store, in the order of
+#            `FORMULA_TABLE_ARRAYS` and `PROOF_STORE_ARRAYS`.
+#
+# Integers are little-endian. An array is its typecode (1 byte),
+# item size (u8), length (u32) and items, where the typecode is the
+# narrowest one which fits the items (they are widened when loaded).
+# The strings are the byte offsets array of their UTF-8 encodings,
+# then the encodings.
+MAGIC: bytes = b"FPVC"
+VERSION: int = 1
+
+_HEADER = struct.Struct("<4sHHII")
+_ARRAY_HEADER = struct.Struct("<cBI")
+
+FORMULA_TABLE_ARRAYS: Tuple[str, ...] = (
+    "_types",
+    "_lefts",
+    "_rights",
+    "_inners",
+    "_symbols",
+    "_variables_offsets",
+    "_variables",
+)
+PROOF_STORE_ARRAYS: Tuple[str, ...] = (
+    "_labels",
+    "_formula_ids",
+    "_opcodes",
+    "_citation_offsets",
+    "_citations",
+    "_dependency_offsets",
+    "_dependencies",
+)
+
+_IS_BIG_ENDIAN: bool = sys.byteorder == "big"
+
+def _narrowest_typecode(values: array) -> str:
+    if len(values) == 0:
+        return values.typecode
+    low: int = min(values)
+    high: int = max(values)
+    typecodes: Tuple[str, ...] = ("B", "H", "I") if low >= 0 else ("b", "h", "i")
+    for typecode in typecodes:
+        bits: int = 8 * array(typecode).itemsize
+        if low >= 0 and high < 1 << bits:
+            return typecode
+        elif low < 0 and -(1 << (bits - 1)) <= low and high < 1 << (bits - 1):
+            return typecode
+    return values.typecode
+
+def write_array(out: bytearray, values: array) -> None:
+    typecode: str = _narrowest_typecode(values)
+    if typecode != values.typecode or _IS_BIG_ENDIAN:
+        values = array(typecode, values)
+    if _IS_BIG_ENDIAN:
+        values.byteswap()
+    out += _ARRAY_HEADER.pack(typecode.encode(), values.itemsize, len(values))
+    out += values.tobytes()
+
+def read_array(data: memoryview, offset: int, wide_typecode: str) -> Tuple[array, int]:
+    if offset + _ARRAY_HEADER.size > len(data):
+        raise RuntimeError("Error: compiled proof is truncated.")
+    typecode, itemsize, length = _ARRAY_HEADER.unpack_from(data, offset)
+    offset += _ARRAY_HEADER.size
+    values: array = array(typecode.decode())
+    if values.itemsize != itemsize:
+        raise RuntimeError(
+            f"Error: compiled proof has arrays of '{typecode.decode()}' items "
+            f"of {itemsize} bytes, but they are {values.itemsize} bytes here."
+        )
+    end: int = offset + length * itemsize
+    if end > len(data):
+        raise RuntimeError("Error: compiled proof is truncated.")
+    values.frombytes(data[offset:end])
+    if _IS_BIG_ENDIAN:
+        values.byteswap()
+    if values.typecode != wide_typecode:
+        values = array(wide_typecode, values)
+    return values, end
+
+def write_strings(out: bytearray, strings: List[str]) -> None:
+    encoded_strings: List[bytes] = [s.encode("utf-8") for s in strings]
+    string_offsets: array = array("I", [0])
+    for encoded_string in encoded_strings:
+        string_offsets.append(string_offsets[-1] + len(encoded_string))
+    write_array(out, string_offsets)
+    out += b"".join(encoded_strings)
+
+def read_strings(data: memoryview, offset: int) -> Tuple[List[str], int]:
+    string_offsets, offset = read_array(data, offset, "I")
+    end: int = offset + string_offsets[-1]
+    if end > len(data):
+        raise RuntimeError("Error: compiled proof is truncated.")
+    encoded_strings: bytes = bytes(data[offset:end])
+    strings: List[str] = [
+        encoded_strings[string_offsets[i]:string_offsets[i + 1]].decode("utf-8")
+        for i in range(len(string_offsets) - 1)
+    ]
+    return strings, end
+
+def write_formula_table(out: bytearray, formula_table: FormulaTable) -> None:
+    write_strings(out, formula_table._strings)
+    for name in FORMULA_TABLE_ARRAYS:
+        write_array(out, getattr(formula_table, name))
+
+def read_formula_table(data: memoryview, offset: int) -> Tuple[FormulaTable, int]:
+    formula_table: FormulaTable = FormulaTable()
+    formula_table._strings, offset = read_strings(data, offset)
+    for name in FORMULA_TABLE_ARRAYS:
+        values, offset = read_array(data, offset, getattr(formula_table, name).typecode)
+        setattr(formula_table, name, values)
+    formula_table._string_ids = None
+    formula_table._node_ids = None
+    return formula_table, offset
+
+def write_proof_store(out: bytearray, store: ProofStore) -> None:
+    for name in PROOF_STORE_ARRAYS:
+        write_array(out, getattr(store, name))
+
+def read_proof_store(data: memoryview, offset: int, formula_table: FormulaTable) -> Tuple[ProofStore, int]:
+    store: ProofStore = ProofStore(formula_table)
+    for name in PROOF_STORE_ARRAYS:
+        values, offset = read_array(data, offset, getattr(store, name).typecode)
+        setattr(store, name, values)
+    if len(store._opcodes) != 0 and max(store._opcodes) >= len(RULE_SYMBOLS):
+        raise RuntimeError("Error: compiled proof has a rule which is not known.")
+    return store, offset
+
+def dumps(store: ProofStore) -> bytes:
+    """
+    Serialises the store, with its formula table.
+    """
+    payload: bytearray = bytearray()
+    write_formula_table(payload, store.formula_table)
+    write_proof_store(payload, store)
+    return _HEADER.pack(MAGIC, VERSION, 0, len(payload), crc32(payload)) + payload
+
+def loads(data: bytes) -> ProofStore:
+    """
+    Loads a store serialised by `dumps`, with its own formula table.
+    """
+    data = memoryview(data)
+    if len(data) < _HEADER.size:
+        raise RuntimeError("Error: compiled proof is truncated.")
+    magic, version, _, length, checksum = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise RuntimeError("Error: not a compiled proof.")
+    if version != VERSION:
+        raise RuntimeError(f"Error: compiled proof has version {version}, expected {VERSION}.")
+    payload: memoryview = data[_HEADER.size:]
+    if len(payload) != length:
+        raise RuntimeError("Error: compiled proof is truncated.")
+    if crc32(payload) != checksum:
+        raise RuntimeError("Error: compiled proof is corrupted (checksum mismatch).")
+
+    formula_table, offset = read_formula_table(payload, 0)
+    store, offset = read_proof_store(payload, offset, formula_table)
+    if offset != len(payload):
+        raise RuntimeError("Error: compiled proof has trailing data.")
+    return store
+
+def dump(store: ProofStore, path: str) -> None:
+    with open(path, "wb") as file:
+        file.write(dumps(store))
+
+def load(path: str) -> ProofStore:
+    with open(path, "rb") as file:
+        return loads(file.read())
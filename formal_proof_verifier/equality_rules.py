@@ -1,33 +1,57 @@
-from typing import List
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
 from .formula import FormulaType, Formula
-from .rule import Rule
-from .line import Line
-
-class EqualityIntroductionRule(Rule):
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
-    ) -> bool:
-        expected_dependencies = list()
-
-        if not self._same_set(expected_dependencies, dependencies):
-            return False
-
-        if current_line.formula.type != FormulaType.predicate_type:
-            return False
-
-        predicate: str = current_line.formula.predicate
-        if predicate != "=":
+from .rule import ProofView, Rule
+
+def _is_congruent(
+    formula_a: Formula,
+    formula_b: Formula,
+    is_replaceable: Callable[[str, str], bool],
+) -> bool:
+    """
+    Checks if `formula_b` is `formula_a` with some free variables
+    (names) replaced. The formulas are walked together once, and each
+    variable position must either be the same, or a pair of free variables
+    for which `is_replaceable` is true.
+    Below a quantifier, its variable is bound, so it cannot be replaced
+    there (and other variables cannot be replaced by it).
+    """
+    stack: List[Tuple[Formula, Formula, FrozenSet[str]]] = [(formula_a, formula_b, frozenset())]
+    while len(stack) != 0:
+        f_a, f_b, bound = stack.pop()
+        if (
+            f_a.type != f_b.type
+            or f_a.atom != f_b.atom
+            or f_a.predicate != f_b.predicate
+            or f_a.variable != f_b.variable
+        ):
             return False
 
-        variables: str = current_line.formula.variables
-        if len(variables) != 2:
-            return False
-        if variables[0] != variables[1]:
-            return False
+        if f_a.type == FormulaType.predicate_type:
+            if len(f_a.variables) != len(f_b.variables):
+                return False
+            for v_a, v_b in zip(f_a.variables, f_b.variables):
+                if v_a != v_b and (v_a in bound or v_b in bound or not is_replaceable(v_a, v_b)):
+                    return False
+        elif f_a.type in (FormulaType.universal_type, FormulaType.existential_type):
+            stack.append((f_a.inner, f_b.inner, bound | {f_a.variable}))
+        else:
+            for c_a, c_b in ((f_a.left, f_b.left), (f_a.right, f_b.right), (f_a.inner, f_b.inner)):
+                if (c_a is None) != (c_b is None):
+                    return False
+                if c_a is not None:
+                    stack.append((c_a, c_b, bound))
+    return True
 
-        return True
+class EqualityIntroductionRule(Rule):
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        formula: Formula = view.formula(view.node(line))
+        return (
+            formula.type == FormulaType.predicate_type
+            and formula.predicate == "="
+            and len(formula.variables) == 2
+            and formula.variables[0] == formula.variables[1]
+        )
 
     def symbol() -> str:
         return "=I"
@@ -35,20 +59,24 @@ class EqualityIntroductionRule(Rule):
     def number_of_lines() -> int:
         return 0
 
+    def conclusion_type() -> FormulaType:
+        return FormulaType.predicate_type
+
 class EqualityEliminationRule(Rule):
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        return EqualityEliminationRule.is_valid_formulas(
+            equality_formula=view.formula(view.node(lines[0])),
+            formula_a=view.formula(view.node(lines[1])),
+            formula_b=view.formula(view.node(line)),
+        )
+
+    @staticmethod
+    def is_valid_formulas(
+        equality_formula: Formula,
+        formula_a: Formula,
+        formula_b: Formula,
     ) -> bool:
-        expected_dependencies = list()
-        for line in self._lines:
-            expected_dependencies.extend(line.dependencies)
-
-        if not self._same_set(expected_dependencies, dependencies):
-            return False
-
-        equality_formula = self._lines[0].formula
         if equality_formula.type != FormulaType.predicate_type:
             return False
 
@@ -59,17 +87,164 @@ class EqualityEliminationRule(Rule):
         if len(variables) != 2:
             return False
 
-        formula_a = self._lines[1].formula
-        formula_b = current_line.formula
-        if formula_a.eq_with_variable_map(formula_b, {variables[0]: variables[1]}):
-            return True
-        if formula_a.eq_with_variable_map(formula_b, {variables[1]: variables[0]}):
-            return True
+        return EqualityEliminationRule.is_substitution(formula_a, formula_b, variables[0], variables[1])
 
-        return False
+    @staticmethod
+    def is_substitution(formula_a: Formula, formula_b: Formula, a: str, b: str) -> bool:
+        """
+        Checks if `formula_b` is `formula_a` with some (or none) of the free
+        occurrences of `a` replaced by `b`, and of `b` replaced by `a`.
+        """
+        return _is_congruent(formula_a, formula_b, lambda v_a, v_b: {v_a, v_b} == {a, b})
 
     def symbol() -> str:
         return "=E"
 
     def number_of_lines() -> int:
         return 2
+
+    def line_types() -> Tuple[Optional[FormulaType], ...]:
+        return (FormulaType.predicate_type, None)
+
+class UnionFind:
+    """
+    Disjoint sets of names, with union by size.
+    The unions can be undone in the reverse order (see `undo`), so the finds
+    do not compress paths; union by size keeps them logarithmic.
+    """
+    def __init__(self):
+        self._parents: Dict[str, str] = {}
+        self._sizes: Dict[str, int] = {}
+        # For each union, the merged roots, or `None` if they were the same.
+        self._history: List[Optional[Tuple[str, str]]] = []
+
+    def __len__(self) -> int:
+        # The number of unions which can be undone.
+        return len(self._history)
+
+    def find(self, name: str) -> str:
+        parent: Optional[str] = self._parents.get(name)
+        if parent is None:
+            return name
+        while parent != name:
+            name, parent = parent, self._parents[parent]
+        return name
+
+    def union(self, name_a: str, name_b: str) -> None:
+        for name in (name_a, name_b):
+            if name not in self._parents:
+                self._parents[name] = name
+                self._sizes[name] = 1
+        root_a: str = self.find(name_a)
+        root_b: str = self.find(name_b)
+        if root_a == root_b:
+            self._history.append(None)
+            return
+        if self._sizes[root_a] < self._sizes[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parents[root_b] = root_a
+        self._sizes[root_a] += self._sizes[root_b]
+        self._history.append((root_a, root_b))
+
+    def undo(self, number_of_unions: int) -> None:
+        """
+        Undoes the unions after the first `number_of_unions`.
+        """
+        while len(self._history) > number_of_unions:
+            roots: Optional[Tuple[str, str]] = self._history.pop()
+            if roots is not None:
+                root_a, root_b = roots
+                self._parents[root_b] = root_b
+                self._sizes[root_a] -= self._sizes[root_b]
+
+    def is_same(self, name_a: str, name_b: str) -> bool:
+        return self.find(name_a) == self.find(name_b)
+
+class _Closure:
+    """
+    The classes of equal names of the equalities cited by the last line
+    checked with `EqualityClosureRule` in a proof. The next line undoes
+    the unions of the equalities it does not cite (back to the longest
+    prefix of the applied equalities which it cites), and applies its new
+    equalities, so lines citing more and more equalities only pay for
+    the new ones.
+    """
+    def __init__(self):
+        self.union_find: UnionFind = UnionFind()
+        # The equalities, in the order of their unions.
+        self._equalities: List[Tuple[str, str]] = []
+
+    def apply(self, equalities: FrozenSet[Tuple[str, str]]) -> UnionFind:
+        kept: int = 0
+        while kept < len(self._equalities) and self._equalities[kept] in equalities:
+            kept += 1
+        self.union_find.undo(kept)
+        del self._equalities[kept:]
+        applied: FrozenSet[Tuple[str, str]] = frozenset(self._equalities)
+        for equality in sorted(equalities - applied):
+            self.union_find.union(*equality)
+            self._equalities.append(equality)
+        return self.union_find
+
+class EqualityClosureRule(Rule):
+    """
+    The formula follows from the formulas of the lines by the closure of
+    their equalities: it is an equality of names which are equal
+    by reflexivity, symmetry and transitivity, or it is the formula of
+    one of the lines with some names replaced by equal names.
+    The classes of equal names are kept for the lines of a proof in the
+    proof cache, and updated incrementally from the equalities cited by
+    each line (see `_Closure`).
+    """
+    @staticmethod
+    def is_derived() -> bool:
+        return True
+
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        return EqualityClosureRule.is_valid_formulas(
+            line_formulas=[view.formula(view.node(l)) for l in lines],
+            formula=view.formula(view.node(line)),
+            proof_cache=view.proof_cache,
+        )
+
+    @staticmethod
+    def _equality(formula: Formula) -> Optional[Tuple[str, str]]:
+        if (
+            formula.type == FormulaType.predicate_type
+            and formula.predicate == "="
+            and len(formula.variables) == 2
+        ):
+            return formula.variables[0], formula.variables[1]
+        return None
+
+    @staticmethod
+    def is_valid_formulas(
+        line_formulas: List[Formula],
+        formula: Formula,
+        proof_cache: Dict,
+    ) -> bool:
+        equalities: FrozenSet[Tuple[str, str]] = frozenset(
+            equality for f in line_formulas
+            if (equality := EqualityClosureRule._equality(f)) is not None
+        )
+        closure: Optional[_Closure] = proof_cache.get(_Closure)
+        if closure is None:
+            closure = _Closure()
+            proof_cache[_Closure] = closure
+        union_find: UnionFind = closure.apply(equalities)
+
+        equality: Optional[Tuple[str, str]] = EqualityClosureRule._equality(formula)
+        if equality is not None and union_find.is_same(*equality):
+            return True
+
+        return any(
+            _is_congruent(f, formula, union_find.is_same)
+            for f in line_formulas
+        )
+
+    def symbol() -> str:
+        return "=*"
+
+    def number_of_lines() -> Optional[int]:
+        return None
@@ -1,59 +1,125 @@
-from re import split
-from typing import Dict, List, Tuple
-from .formula import Formula, create_formula
-from .rule import Rule
+from __future__ import annotations
+# Imported with the package: `typing` only for type checkers, see `__init__`.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, List, Optional, Tuple
+    from .formula_pool import FormulaPool
+from .formula import Formula, FormulaType, create_formula
+from .rule import Rule, InferredRule
 from .line import Line
-from .propositional_rules import *
-from .predicate_rules import *
-from .equality_rules import *
 
-def create_lines(lines_str: List[str]) -> List[Tuple[str, Line]]:
-    lines: Dict[str, Tuple[str, Line]] = {}
+EMPTY_DEPENDENCY: str = "-"
 
-    for line_str in lines_str:
-        unformatted_line_str = line_str
+def split_line(line_str: str, infer_rules: bool = False) -> Tuple[List[str], str, str, List[str], str]:
+    """
+    Splits a proof line into its dependencies, line number, formula,
+    the line numbers cited by the rule and the rule symbol.
+    The empty dependency ('-') is removed from the dependencies.
+    If `infer_rules` is true, the rule symbol can be missing (empty string).
+    """
+    unformatted_line_str = line_str
 
-        line_str = line_str.split(sep="#", maxsplit=1)
-        line_str = line_str[0]
-        line_str = line_str.strip(" ")
-        line_str = split(" +", line_str)
+    line_str = line_str.split(sep="#", maxsplit=1)
+    line_str = line_str[0]
+    line_str = line_str.strip(" ")
+    line_str = [s for s in line_str.split(" ") if s != ""]
+
+    if infer_rules and len(line_str) == 3:
+        line_str.append("")
 
-        if (len(line_str) == 4 or len(line_str) == 5):
-            dependencies_str: List[str] = line_str[0].split(",")
-            line_number_str: str = line_str[1]
-            formula_str: str = line_str[2]
-            rule_symbol: str = line_str[4] if len(line_str) == 5 else line_str[3]
-            rule_lines_str: List[str] = line_str[3].split(",") if len(line_str) == 5 else []
+    if (len(line_str) == 4 or len(line_str) == 5):
+        dependencies_str: List[str] = line_str[0].split(",")
+        line_number_str: str = line_str[1]
+        formula_str: str = line_str[2]
+        rule_symbol: str = line_str[4] if len(line_str) == 5 else line_str[3]
+        rule_lines_str: List[str] = line_str[3].split(",") if len(line_str) == 5 else []
 
-            empty_dependency: str = "-"
+        if line_number_str == EMPTY_DEPENDENCY:
+            raise RuntimeError(f"Error: Line number cannot be '{line_number_str}'.")
 
-            if line_number_str == empty_dependency:
-                raise RuntimeError(f"Error: Line number cannot be '{line_number_str}'.")
+        dependencies_str = list(filter(lambda x: x != EMPTY_DEPENDENCY, dependencies_str))
+        return dependencies_str, line_number_str, formula_str, rule_lines_str, rule_symbol
+    else:
+        raise RuntimeError(f"Error: Invalid line '{unformatted_line_str}'.")
 
-            if line_number_str in lines:
-                raise RuntimeError(f"Error: Line number '{line_number_str}' already exists.")
+def create_lines(
+    lines_str: List[str],
+    infer_rules: bool = False,
+    lazy_formulas: bool = False,
+    formula_pool: Optional[FormulaPool] = None,
+) -> List[Tuple[str, Line]]:
+    """
+    Creates the lines of a proof.
+    If `infer_rules` is true, lines with a missing or invalid rule symbol
+    get an `InferredRule`, which finds the rules justifying the line.
+    If `lazy_formulas` is true, the formula of a line is only parsed
+    when it is first accessed, and an invalid formula is only reported then.
+    The line numbers of the rules and the dependencies are still checked here.
+    With a `formula_pool`, the formulas (which are not lazy) are shared
+    with the other proofs using the pool.
+    """
+    lines: Dict[str, Tuple[str, Line]] = {}
+    proof_cache: Dict = {}
+
+    for line_str in lines_str:
+        unformatted_line_str = line_str
 
-            formula: Formula = create_formula(formula_str)
+        dependencies_str, line_number_str, formula_str, rule_lines_str, rule_symbol = (
+            split_line(line_str, infer_rules)
+        )
 
-            if any(l not in lines for l in rule_lines_str):
-                raise RuntimeError(f"Error: Invalid line number for rule in '{unformatted_line_str}'.")
-            rule_lines: List[Line] = [lines[l][1] for l in rule_lines_str]
-            rule = Rule.create(symbol=rule_symbol, lines=rule_lines)
+        if (
+            infer_rules
+            and len(rule_lines_str) == 0
+            and Rule.find(rule_symbol) is None
+            and all(l in lines for l in rule_symbol.split(","))
+        ):
+            # The line numbers are given, but the rule symbol is missing.
+            rule_lines_str = rule_symbol.split(",")
+            rule_symbol = ""
 
-            dependencies_str = list(filter(lambda x: x != empty_dependency, dependencies_str))
-            if any((l != line_number_str and l not in lines) for l in dependencies_str):
-                raise RuntimeError(f"Error: Invalid line number for dependencies in '{unformatted_line_str}'.")
-            dependencies: List[Line] = [lines[l][1] for l in dependencies_str if l != line_number_str]
+        if line_number_str in lines:
+            raise RuntimeError(f"Error: Line number '{line_number_str}' already exists.")
 
-            is_self_dependency: bool = (line_number_str in dependencies_str)
+        formula: Optional[Formula] = None
+        if not lazy_formulas:
+            if formula_pool is not None:
+                formula = formula_pool.create_formula(formula_str)
+            else:
+                formula = create_formula(formula_str)
 
-            line: Line = Line(dependencies=dependencies, formula=formula, rule=rule, is_self_dependency=is_self_dependency)
-            lines[line_number_str] = (unformatted_line_str, line)
+        if any(l not in lines for l in rule_lines_str):
+            raise RuntimeError(f"Error: Invalid line number for rule in '{unformatted_line_str}'.")
+        rule_lines: List[Line] = [lines[l][1] for l in rule_lines_str]
+        rule_class: Optional[type] = Rule.find(rule_symbol)
+        if infer_rules and (rule_class is None or rule_class.number_of_lines() not in (None, len(rule_lines))):
+            rule = InferredRule(rule_lines, proof_cache)
         else:
-            raise RuntimeError(f"Error: Invalid line '{unformatted_line_str}'.")
+            rule = Rule.create(symbol=rule_symbol, lines=rule_lines, proof_cache=proof_cache)
+
+        if any((l != line_number_str and l not in lines) for l in dependencies_str):
+            raise RuntimeError(f"Error: Invalid line number for dependencies in '{unformatted_line_str}'.")
+        dependencies: List[Line] = [lines[l][1] for l in dependencies_str if l != line_number_str]
+
+        is_self_dependency: bool = (line_number_str in dependencies_str)
+
+        line: Line = Line(
+            dependencies=dependencies,
+            formula=formula,
+            rule=rule,
+            is_self_dependency=is_self_dependency,
+            formula_str=formula_str,
+            line_str=unformatted_line_str.strip() if lazy_formulas else None,
+        )
+        lines[line_number_str] = (unformatted_line_str, line)
     return lines.values()
 
-def create_lines_from_text(text: str) -> List[Tuple[str, Line]]:
+def create_lines_from_text(
+    text: str,
+    infer_rules: bool = False,
+    lazy_formulas: bool = False,
+    formula_pool: Optional[FormulaPool] = None,
+) -> List[Tuple[str, Line]]:
     text = text.split("\n")
     lines_str: List[str] = []
     for unformatted_line_str in text:
@@ -64,4 +130,4 @@ def create_lines_from_text(text: str) -> List[Tuple[str, Line]]:
         line_str = line_str.strip(" ")
         if line_str != "":
             lines_str.append(unformatted_line_str)
-    return create_lines(lines_str)
+    return create_lines(lines_str, infer_rules, lazy_formulas, formula_pool)
@@ -0,0 +1,324 @@
+import re
+from typing import Dict, List, Optional, Set, Tuple, Union
+from . import metrics
+from .formula import Formula, FormulaType
+
+# Connectives by their notations. Every notation of a connective
+# is accepted, and the longest notation matching at a position wins.
+CONNECTIVES: Dict[str, FormulaType] = {
+    "&": FormulaType.and_type,
+    "/\\": FormulaType.and_type,
+    "\u2227": FormulaType.and_type,
+    "v": FormulaType.or_type,
+    "\\/": FormulaType.or_type,
+    "\u2228": FormulaType.or_type,
+    ">": FormulaType.conditional_type,
+    "->": FormulaType.conditional_type,
+    "\u2192": FormulaType.conditional_type,
+    "~": FormulaType.not_type,
+    "\u00ac": FormulaType.not_type,
+    "A": FormulaType.universal_type,
+    "\u2200": FormulaType.universal_type,
+    "E": FormulaType.existential_type,
+    "\u2203": FormulaType.existential_type,
+}
+
+# The kinds of the tokens.
+CONNECTIVE_TOKEN: str = "connective"
+NAME_TOKEN: str = "name"
+OPEN_TOKEN: str = "("
+CLOSE_TOKEN: str = ")"
+EQUALS_TOKEN: str = "="
+COMMA_TOKEN: str = ","
+
+class Lexer:
+    """
+    Splits a formula string into tokens with one regular expression,
+    generated from a table of connective notations.
+    Each token is its kind, its text and its position in the formula string.
+    Whitespace is skipped, and every other character which is not part of
+    a connective, a parenthesis, `=` or `,` is part of a name.
+    """
+    def __init__(self, connectives: Dict[str, FormulaType] = CONNECTIVES):
+        self._connectives: Dict[str, FormulaType] = dict(connectives)
+        connective_pattern: str = "|".join(
+            re.escape(c) for c in sorted(self._connectives, key=len, reverse=True)
+        )
+        self._pattern = re.compile(
+            r"(?P<space>\s+)"
+            rf"|(?P<{CONNECTIVE_TOKEN}>{connective_pattern})"
+            r"|(?P<paren>[()])"
+            rf"|(?P<equals>{EQUALS_TOKEN})"
+            rf"|(?P<comma>{COMMA_TOKEN})"
+            rf"|(?P<{NAME_TOKEN}>(?:(?!{connective_pattern})[^\s()=,])+)"
+        )
+
+    def connective(self, text: str) -> FormulaType:
+        return self._connectives[text]
+
+    def tokenize(self, formula_str: str) -> List[Tuple[str, str, int]]:
+        tokens: List[Tuple[str, str, int]] = []
+        for match in self._pattern.finditer(formula_str):
+            kind: str = match.lastgroup
+            if kind == "space":
+                continue
+            text: str = match.group()
+            if kind in ("paren", "equals", "comma"):
+                kind = text
+            tokens.append((kind, text, match.start()))
+        counter: Optional[metrics.OperationCounter] = metrics.local.active
+        if counter is not None:
+            counter.add(metrics.TOKENS, len(tokens))
+        return tokens
+
+_default_lexer: Optional[Lexer] = None
+
+def _get_default_lexer() -> Lexer:
+    global _default_lexer
+    if _default_lexer is None:
+        _default_lexer = Lexer()
+    return _default_lexer
+
+def tokenize(formula_str: str) -> List[Tuple[str, str, int]]:
+    return _get_default_lexer().tokenize(formula_str)
+
+class _Parser:
+    """
+    Parses the tokens of a formula string.
+    The index of the matching parenthesis of each parenthesis is found first,
+    so every range of tokens is split into its constituents without
+    rescanning the parenthesized groups, and parsing is linear.
+
+    A range of tokens is split into items: connectives, names, `=`,
+    and parenthesized groups (spans of tokens).
+    Consecutive non-connective items are a constituent:
+    one item is a formula (or an atom), two items are a predicate
+    and its variables separated by commas, and three items are a binary
+    predicate between two variables (for example `a=b`).
+    A quantifier is followed by its variable and the quantified formula.
+    """
+    def __init__(self, formula_str: str, lexer: Lexer):
+        self._formula_str: str = formula_str
+        self._lexer: Lexer = lexer
+        self._tokens: List[Tuple[str, str, int]] = lexer.tokenize(formula_str)
+        self._matches: List[int] = [-1] * len(self._tokens)
+
+        open_indices: List[int] = []
+        for i, (kind, _, position) in enumerate(self._tokens):
+            if kind == OPEN_TOKEN:
+                open_indices.append(i)
+            elif kind == CLOSE_TOKEN:
+                if len(open_indices) == 0:
+                    raise RuntimeError(
+                        f"Error: unexpected ')' at position {position} in formula '{formula_str}'."
+                    )
+                j: int = open_indices.pop()
+                self._matches[i] = j
+                self._matches[j] = i
+        # Like a missing ')' at the end of the formula string,
+        # an unclosed '(' is closed at the end.
+        for j in reversed(open_indices):
+            self._matches[j] = len(self._tokens)
+
+    def _text(self, start: int, end: int) -> str:
+        # The formula string of the tokens from `start` to `end` (exclusive).
+        if start >= end:
+            return ""
+        kind, text, position = self._tokens[end - 1]
+        return self._formula_str[self._tokens[start][2]:position + len(text)]
+
+    def _items(self, start: int, end: int) -> List[Union[FormulaType, Tuple[int, int, bool]]]:
+        """
+        Splits the tokens into items: connectives, and spans of tokens
+        `(start, end, is_group)`, where a group is the tokens inside parentheses.
+        """
+        if start >= end:
+            raise RuntimeError(f"Error: empty formula in formula '{self._formula_str}'.")
+
+        items: List[Union[FormulaType, Tuple[int, int, bool]]] = []
+        i: int = start
+        while i < end:
+            kind, text, position = self._tokens[i]
+            if kind == CONNECTIVE_TOKEN:
+                items.append(self._lexer.connective(text))
+                i += 1
+            elif kind == OPEN_TOKEN:
+                items.append((i + 1, self._matches[i], True))
+                i = self._matches[i] + 1
+            elif kind == COMMA_TOKEN:
+                raise RuntimeError(
+                    f"Error: unexpected ',' at position {position} in formula '{self._formula_str}'."
+                )
+            else:
+                items.append((i, i + 1, False))
+                i += 1
+        return items
+
+    def _item_text(self, item: Union[FormulaType, Tuple[int, int, bool]]) -> str:
+        if isinstance(item, FormulaType):
+            raise RuntimeError(
+                f"Error: formula '{self._formula_str}' has a connective ('{item}') "
+                f"in place of a variable or a predicate."
+            )
+        return self._text(item[0], item[1])
+
+    def _variables(self, item: Union[FormulaType, Tuple[int, int, bool]]) -> List[str]:
+        # The variables of a predicate are separated by commas.
+        if isinstance(item, FormulaType) or not item[2]:
+            return [self._item_text(item)]
+        variables: List[str] = []
+        start: int = item[0]
+        for i in range(item[0], item[1]):
+            if self._tokens[i][0] == COMMA_TOKEN:
+                variables.append(self._text(start, i))
+                start = i + 1
+        variables.append(self._text(start, item[1]))
+        return variables
+
+    def parse(self) -> Formula:
+        return self._formula(0, len(self._tokens), set())
+
+    def _formula(self, start: int, end: int, reserved_variables: Set[str]) -> Formula:
+        items: List[Union[FormulaType, Tuple[int, int, bool]]] = self._items(start, end)
+
+        if len(items) == 1:
+            item = items[0]
+            if isinstance(item, FormulaType):
+                raise RuntimeError(
+                    f"Error: formula '{self._formula_str}' has one constituent, "
+                    f"and it is a connective ('{item}')."
+                )
+            elif item[2]:
+                return self._formula(item[0], item[1], reserved_variables)
+            else:
+                return Formula(type=FormulaType.atomic_type, atom=self._item_text(item))
+        elif items[0] == FormulaType.universal_type or items[0] == FormulaType.existential_type:
+            if len(items) < 3:
+                raise RuntimeError(
+                    f"Error: formula '{self._formula_str}' if quantified, but "
+                    f"missing the variable or the formula to be quantified."
+                )
+            variable: str = self._item_text(items[1])
+            if variable in reserved_variables:
+                raise RuntimeError(
+                    f"Error: formula '{self._formula_str}' has an already used "
+                    f"quantified variable '{variable}'."
+                )
+            # The variables of the enclosing quantifiers are one set, to which
+            # the variable is added while its scope is parsed, instead of a copy
+            # per quantifier, so pushing and looking up a variable is O(1).
+            reserved_variables.add(variable)
+            try:
+                inner: Formula = self._unquantified_formula(items[2:], reserved_variables)
+            finally:
+                reserved_variables.remove(variable)
+            return Formula(
+                type=items[0],
+                variable=variable,
+                inner=inner,
+            )
+        else:
+            return self._unquantified_formula(items, reserved_variables)
+
+    def _constituent(
+        self,
+        group: List[Tuple[int, int, bool]],
+        reserved_variables: Set[str],
+    ) -> Formula:
+        if len(group) == 1:
+            return self._formula(group[0][0], group[0][1], reserved_variables)
+        elif len(group) == 2:
+            return Formula(
+                type=FormulaType.predicate_type,
+                predicate=self._item_text(group[0]),
+                variables=self._variables(group[1]),
+            )
+        elif len(group) == 3:
+            return Formula(
+                type=FormulaType.predicate_type,
+                predicate=self._item_text(group[1]),
+                variables=[self._item_text(group[0]), self._item_text(group[2])],
+            )
+        else:
+            raise RuntimeError(
+                f"Error: formula has more than 3 tokens "
+                f"next to each other without any connective: "
+                f"'{self._text(group[0][0], group[-1][1])}'."
+            )
+
+    def _operand(self, constituent: Union[Formula, FormulaType]) -> Formula:
+        if isinstance(constituent, FormulaType):
+            raise RuntimeError(
+                f"Error: formula '{self._formula_str}' has a connective "
+                f"('{constituent}') in place of a formula."
+            )
+        return constituent
+
+    def _unquantified_formula(
+        self,
+        items: List[Union[FormulaType, Tuple[int, int, bool]]],
+        reserved_variables: Set[str],
+    ) -> Formula:
+        constituents: List[Union[Formula, FormulaType]] = []
+        group: List[Tuple[int, int, bool]] = []
+        for item in items:
+            if isinstance(item, FormulaType):
+                if len(group) != 0:
+                    constituents.append(self._constituent(group, reserved_variables))
+                    group = []
+                constituents.append(item)
+            else:
+                group.append(item)
+        if len(group) != 0:
+            constituents.append(self._constituent(group, reserved_variables))
+
+        biconnectives = {
+            FormulaType.and_type,
+            FormulaType.or_type,
+            FormulaType.conditional_type,
+        }
+        uniconnectives = {
+            FormulaType.not_type,
+        }
+        if any(c in constituents for c in biconnectives):
+            if len(constituents) != 3:
+                raise RuntimeError(
+                    "Error: main connective is a biconnective, "
+                    "but the number of constituents are not 3."
+                )
+            connective = constituents[1]
+            if connective not in biconnectives:
+                raise RuntimeError(
+                    "Error: main connective is a biconnective, "
+                    "but it's not the 2nd constituent."
+                )
+            left_formula = self._operand(constituents[0])
+            right_formula = self._operand(constituents[2])
+            return Formula(type=connective, left=left_formula, right=right_formula)
+        elif any(c in constituents for c in uniconnectives):
+            if len(constituents) != 2:
+                raise RuntimeError(
+                    "Error: main connective is a uniconnective, "
+                    "but the number of constituents are not 2."
+                )
+            connective = constituents[0]
+            if connective not in uniconnectives:
+                raise RuntimeError(
+                    "Error: main connective is a uniconnective, "
+                    "but it's not the 1st constituent."
+                )
+            inner_formula = self._operand(constituents[1])
+            return Formula(type=connective, inner=inner_formula)
+        else:
+            if len(constituents) == 1 and isinstance(constituents[0], Formula):
+                return constituents[0]
+            else:
+                raise RuntimeError(
+                    f"Error: formula '{self._formula_str}' cannot be interpreted."
+                )
+
+def parse_formula(formula_str: str, lexer: Optional[Lexer] = None) -> Formula:
+    """
+    Parses the formula string, see `create_formula`.
+    """
+    return _Parser(formula_str, lexer if lexer is not None else _get_default_lexer()).parse()
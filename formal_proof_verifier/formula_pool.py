@@ -0,0 +1,133 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from weakref import WeakValueDictionary
+from .formula import Formula, create_formula
+
+class FormulaPool:
+    """
+    Interning pool of formulas, shared by the proofs of a long-running process.
+    Structurally equal formulas (and subformulas) are the same object
+    while any of them is in use.
+    The pool only holds weak references, so a formula is freed as soon as
+    no proof uses it, and the memory returns to the baseline when the proofs
+    are released. Optionally, the `lru_size` most recently used formulas
+    are also kept alive with strong references, so that formulas recurring
+    between proofs are not parsed again.
+    """
+    def __init__(self, lru_size: int = 0):
+        # Formulas by their structure, in which the subformulas are identified
+        # by their ids. The subformulas of a pooled formula are pooled, and are
+        # kept alive by it, so the ids in a key are never reused while the key exists.
+        self._formulas: WeakValueDictionary = WeakValueDictionary()
+        self._formulas_by_str: WeakValueDictionary = WeakValueDictionary()
+        self._lru: OrderedDict = OrderedDict()
+        self._lru_size: int = lru_size
+        self._lock: Lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._formulas)
+
+    @property
+    def lru_size(self) -> int:
+        return self._lru_size
+
+    @staticmethod
+    def _key(formula: Formula) -> Tuple:
+        return (
+            formula.type,
+            id(formula.left) if formula.left is not None else None,
+            id(formula.right) if formula.right is not None else None,
+            id(formula.inner) if formula.inner is not None else None,
+            formula.atom,
+            formula.predicate,
+            formula.variable,
+            formula.variables,
+        )
+
+    def _use(self, formula: Formula) -> None:
+        if self._lru_size > 0:
+            self._lru[id(formula)] = formula
+            self._lru.move_to_end(id(formula))
+            while len(self._lru) > self._lru_size:
+                self._lru.popitem(last=False)
+
+    def intern(self, formula: Formula) -> Formula:
+        """
+        Returns the pooled formula equal to `formula`,
+        adding it (with its subformulas) if there is none.
+        """
+        with self._lock:
+            pooled: Dict[int, Formula] = {}
+            stack: List[Formula] = [formula]
+            while len(stack) != 0:
+                original: Formula = stack[-1]
+                children: List[Formula] = [
+                    c for c in (original.left, original.right, original.inner)
+                    if c is not None and id(c) not in pooled
+                ]
+                if len(children) != 0:
+                    stack.extend(children)
+                    continue
+                stack.pop()
+
+                # The formula itself is pooled if its subformulas are pooled,
+                # otherwise a copy with the pooled subformulas.
+                f: Formula = original
+                left: Optional[Formula] = pooled[id(f.left)] if f.left is not None else None
+                right: Optional[Formula] = pooled[id(f.right)] if f.right is not None else None
+                inner: Optional[Formula] = pooled[id(f.inner)] if f.inner is not None else None
+                if left is not f.left or right is not f.right or inner is not f.inner:
+                    f = Formula(
+                        type=f.type,
+                        left=left,
+                        right=right,
+                        inner=inner,
+                        atom=f.atom,
+                        predicate=f.predicate,
+                        variable=f.variable,
+                        variables=f.variables,
+                    )
+                key: Tuple = FormulaPool._key(f)
+                p: Optional[Formula] = self._formulas.get(key)
+                if p is None:
+                    p = f
+                    self._formulas[key] = p
+                pooled[id(original)] = p
+            result: Formula = pooled[id(formula)]
+            self._use(result)
+            return result
+
+    def create_formula(self, formula_str: str) -> Formula:
+        """
+        Like `create_formula`, but returns a pooled formula,
+        and does not parse a formula string again while its formula is in use.
+        """
+        with self._lock:
+            formula: Optional[Formula] = self._formulas_by_str.get(formula_str)
+            if formula is not None:
+                self._use(formula)
+                return formula
+        # Parsed without the lock, so that threads parse in parallel. Threads
+        # parsing the same string get the same formula from `intern`.
+        formula = self.intern(create_formula(formula_str))
+        with self._lock:
+            self._formulas_by_str[formula_str] = formula
+        return formula
+
+    def clear(self) -> None:
+        with self._lock:
+            self._formulas.clear()
+            self._formulas_by_str.clear()
+            self._lru.clear()
+
+_default_pool: Optional[FormulaPool] = None
+
+def default_pool() -> FormulaPool:
+    """
+    Returns the pool of the process, created on the first call.
+    """
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = FormulaPool()
+    return _default_pool
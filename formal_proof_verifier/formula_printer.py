@@ -0,0 +1,65 @@
+from typing import Dict, List, Set, Union
+from .formula import Formula, FormulaType
+
+_ATOMIC: int = FormulaType.atomic_type.value
+_NOT: int = FormulaType.not_type.value
+_PREDICATE: int = FormulaType.predicate_type.value
+_BINARY_TYPES: Set[int] = {
+    FormulaType.and_type.value,
+    FormulaType.or_type.value,
+    FormulaType.conditional_type.value,
+}
+_SYMBOLS: Dict[int, str] = {
+    FormulaType.and_type.value: "&",
+    FormulaType.or_type.value: "v",
+    FormulaType.conditional_type.value: ">",
+    FormulaType.not_type.value: "~",
+    FormulaType.universal_type.value: "A",
+    FormulaType.existential_type.value: "E",
+}
+
+def _push_operand(stack: List[Union[Formula, str]], operand: Formula) -> None:
+    # Pushed in reverse order, as the stack is popped from the end.
+    if operand._type._value_ == _ATOMIC or operand._type._value_ == _PREDICATE:
+        stack.append(operand)
+    else:
+        stack += (")", operand, "(")
+
+def print_formula(formula: Formula) -> str:
+    """
+    Returns the canonical string of the formula, see `Formula.__str__`.
+    """
+    # The pieces are written into one list from an explicit stack, so deep
+    # formulas do not reach the recursion limit, and the strings already
+    # cached by subformulas are reused. Only `formula` caches its string:
+    # caching every subformula would take quadratic memory for deep formulas.
+    pieces: List[str] = []
+    stack: List[Union[Formula, str]] = [formula]
+    while len(stack) != 0:
+        item: Union[Formula, str] = stack.pop()
+        if item.__class__ is str:
+            pieces.append(item)
+            continue
+        f: Formula = item
+        if f._str is not None:
+            pieces.append(f._str)
+            continue
+        type: int = f._type._value_
+        if type == _ATOMIC:
+            pieces.append(f._atom)
+        elif type == _PREDICATE:
+            if f._predicate == "=" and len(f._variables) == 2:
+                pieces += (f._variables[0], "=", f._variables[1])
+            else:
+                pieces += (f._predicate, "(", ",".join(f._variables), ")")
+        elif type in _BINARY_TYPES:
+            _push_operand(stack, f._right)
+            stack.append(_SYMBOLS[type])
+            _push_operand(stack, f._left)
+        elif type == _NOT:
+            _push_operand(stack, f._inner)
+            stack.append("~")
+        else:
+            stack += (")", f._inner)
+            pieces += (_SYMBOLS[type], f._variable, "(")
+    return "".join(pieces)
@@ -1,35 +1,110 @@
-from typing import List, Self
-from .formula import Formula
+from __future__ import annotations
+# Imported with the package: `typing` only for type checkers, see `__init__`.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterable, List, Optional, Self, Tuple
+from .formula import Formula, create_formula
 from .rule import Rule
 
 class Line:
+    # A premise or an assumption depends on itself, which is stored as a flag
+    # instead of a reference to itself, so that proofs have no reference cycles
+    # and are freed by reference counting without the cyclic garbage collector.
+    # Lines are immutable like formulas: the dependencies are a tuple, and
+    # only the cached formula (parsed lazily) and validity are set after `__init__`.
+    __slots__ = (
+        "_dependencies",
+        "_formula",
+        "_rule",
+        "_is_self_dependency",
+        "_validity",
+        "_line_str",
+    )
+
     def __init__(
         self,
-        dependencies: List[Self],
-        formula: Formula,
+        dependencies: Iterable[Self],
+        formula: Optional[Formula],
         rule: Rule,
-        is_self_dependency: bool
+        is_self_dependency: bool,
+        formula_str: Optional[str] = None,
+        line_str: Optional[str] = None,
     ):
-        self._dependencies: List[Self] = dependencies
-        self._formula: Formula = formula
-        self._rule: Rule = rule
+        set_attribute = object.__setattr__
+        set_attribute(self, "_dependencies", tuple(dependencies))
+        # Without a formula, the formula string is kept,
+        # and parsed on the first access of `formula`.
+        set_attribute(self, "_formula", formula if formula is not None else formula_str)
+        # Only used in the error message of an invalid formula string.
+        set_attribute(self, "_line_str", line_str)
+        set_attribute(self, "_rule", rule)
+        set_attribute(self, "_is_self_dependency", is_self_dependency)
+        set_attribute(self, "_validity", None)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"Error: line is immutable, cannot set '{name}'.")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"Error: line is immutable, cannot delete '{name}'.")
+
+    def __reduce__(self):
+        # Pickled as the last line of the lines it depends on or cites,
+        # packed as flat tables (see `PackedProof`), so that a long proof
+        # does not reach the recursion limit of pickle. Each pickled line is
+        # self-contained: the lines of a proof pickled together are packed
+        # once with `PackedProof.pack`.
+        from .packing import PackedProof, _unpack_line
 
-        if is_self_dependency:
-            self._dependencies.append(self)
+        packed_proof: PackedProof = PackedProof.pack([self])
+        return (_unpack_line, (packed_proof, len(packed_proof) - 1))
 
     @property
-    def dependencies(self) -> List[Self]:
-        return self._dependencies
+    def dependencies(self) -> Tuple[Self, ...]:
+        if self._is_self_dependency:
+            return self._dependencies + (self,)
+        else:
+            return self._dependencies
 
     @property
     def formula(self) -> Formula:
+        if isinstance(self._formula, str):
+            try:
+                object.__setattr__(self, "_formula", create_formula(self._formula))
+            except RuntimeError as error:
+                from .budget import BudgetExceeded
+                # A budget exceeded while parsing is not an invalid formula.
+                if isinstance(error, BudgetExceeded):
+                    raise
+                raise RuntimeError(
+                    f"Error: invalid formula '{self._formula}' in line '{self._line_str}'. {error}"
+                )
         return self._formula
 
+    @property
+    def rule(self) -> Rule:
+        return self._rule
+
     def is_assumption(self) -> bool:
         return self._rule.is_assumption()
 
     def is_valid(self) -> bool:
-        return self._rule.is_valid(
-            current_line=self,
-        )
-
+        # The cited lines are validated first with an explicit worklist
+        # instead of recursion, so the length of a proof is not limited
+        # by the recursion limit. The validity of each line is computed
+        # only once, even if it is cited by many lines.
+        stack: List[Self] = [self]
+        while len(stack) != 0:
+            line: Self = stack[-1]
+            if line._validity is not None:
+                stack.pop()
+            elif (pending := [
+                l for l in line._rule.lines
+                if l is not line and l._validity is None
+            ]):
+                stack.extend(pending)
+            else:
+                stack.pop()
+                object.__setattr__(line, "_validity", line._rule.is_valid(
+                    current_line=line,
+                ))
+        return self._validity
@@ -0,0 +1,74 @@
+from __future__ import annotations
+# Imported with the package: `typing` only for type checkers, see `__init__`.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, Optional, Tuple
+from _thread import _local
+
+# Deterministic work units, counted while an `OperationCounter` is active.
+# Unlike wall-clock time, they do not depend on the machine,
+# so tests can bound the work done on a proof.
+FORMULA_NODES: str = "formula_nodes"
+TOKENS: str = "tokens"
+LINE_VALIDATIONS: str = "line_validations"
+DEPENDENCY_COMPARISONS: str = "dependency_comparisons"
+EVALUATED_NODES: str = "evaluated_nodes"
+
+COUNTERS: Tuple[str, ...] = (
+    FORMULA_NODES,
+    TOKENS,
+    LINE_VALIDATIONS,
+    DEPENDENCY_COMPARISONS,
+    EVALUATED_NODES,
+)
+
+class OperationCounter:
+    """
+    Context manager counting the work done while it is active:
+    - `formula_nodes`: pairs of formula nodes compared by `Formula.__eq__`
+      (and `eq_with_variable_map`),
+    - `tokens`: tokens produced by the lexer,
+    - `line_validations`: cited lines checked by `Rule.is_valid`,
+    - `dependency_comparisons`: comparisons of lines by `Rule._same_set`,
+    - `evaluated_nodes`: formula nodes evaluated by the sequent checks
+      (`truth_table` and `model_finder`), each on a block of valuations
+      or on an interpretation.
+    Counters can be nested: the counts of an inner counter are added
+    to the outer one when it exits. Each thread has its own active counter,
+    so only the work of the thread which entered a counter is counted.
+    """
+    __slots__ = ("_counts", "_previous")
+
+    def __init__(self):
+        self._counts: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+        self._previous: Optional[OperationCounter] = None
+
+    def __getitem__(self, name: str) -> int:
+        return self._counts[name]
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self._counts)
+
+    def add(self, name: str, count: int = 1) -> None:
+        self._counts[name] += count
+
+    def __enter__(self) -> OperationCounter:
+        self._previous = local.active
+        local.active = self
+        return self
+
+    def __exit__(self, *args) -> None:
+        local.active = self._previous
+        if self._previous is not None:
+            for name, count in self._counts.items():
+                self._previous._counts[name] += count
+        self._previous = None
+
+class _Local(_local):
+    # The active counter of the thread, or `None` when nothing is counted.
+    # A class attribute, so that it is `None` in new threads.
+    active: Optional[OperationCounter] = None
+
+# The counted code reads `local.active` once before counting,
+# so counting costs one lookup when it is off.
+local: _Local = _Local()
@@ -0,0 +1,330 @@
+import itertools
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+from .formula import Formula, FormulaType
+from . import metrics
+
+# The value of a formula is a packed bit-vector (a Python integer) over
+# the assignments of the variables bound by the enclosing quantifiers.
+# For a domain of size `s` and bound variables `x_0, ..., x_{m-1}`
+# (outermost first), bit `d_0 + d_1 * s + ... + d_{m-1} * s^(m-1)`
+# is the value when each `x_i` is the element `d_i`.
+# The innermost variable is the most significant axis, so a quantifier
+# reduces its body with `s` shifted ANDs (or ORs) of whole slices,
+# instead of looping over the assignments.
+
+EQUALITY: str = "="
+
+class Model:
+    """
+    Interpretation over the domain `0, ..., domain_size - 1`:
+    the elements of the names (free variables), the truth values of the atoms,
+    and the extensions of the predicates (sets of tuples of elements).
+    """
+    def __init__(
+        self,
+        domain_size: int,
+        names: Dict[str, int],
+        atoms: Dict[str, bool],
+        predicates: Dict[Tuple[str, int], FrozenSet[Tuple[int, ...]]],
+    ):
+        self._domain_size: int = domain_size
+        self._names: Dict[str, int] = names
+        self._atoms: Dict[str, bool] = atoms
+        self._predicates: Dict[Tuple[str, int], FrozenSet[Tuple[int, ...]]] = predicates
+
+    @property
+    def domain_size(self) -> int:
+        return self._domain_size
+
+    @property
+    def names(self) -> Dict[str, int]:
+        return self._names
+
+    @property
+    def atoms(self) -> Dict[str, bool]:
+        return self._atoms
+
+    @property
+    def predicates(self) -> Dict[Tuple[str, int], FrozenSet[Tuple[int, ...]]]:
+        return self._predicates
+
+    def __str__(self) -> str:
+        def _tuple_str(t: Tuple[int, ...]) -> str:
+            return str(t[0]) if len(t) == 1 else "(" + ",".join(str(e) for e in t) + ")"
+
+        parts: List[str] = [f"domain of size {self.domain_size}"]
+        parts.extend(f"{name}={element}" for name, element in self.names.items())
+        parts.extend(
+            f"{predicate}={{" + ",".join(_tuple_str(t) for t in sorted(extension)) + "}"
+            for (predicate, _), extension in self.predicates.items()
+        )
+        parts.extend(f"{atom}={'T' if value else 'F'}" for atom, value in self.atoms.items())
+        return ", ".join(parts)
+
+class _Signature:
+    """
+    The names, atoms and predicates (with their arities) of formulas,
+    in the order of their appearance.
+    """
+    def __init__(self, formulas: List[Formula]):
+        self.names: List[str] = []
+        self.atoms: List[str] = []
+        self.predicates: List[Tuple[str, int]] = []
+
+        for formula in formulas:
+            stack: List[Tuple[Formula, FrozenSet[str]]] = [(formula, frozenset())]
+            while len(stack) != 0:
+                f, bound = stack.pop()
+                if f.type == FormulaType.atomic_type:
+                    if f.atom not in self.atoms:
+                        self.atoms.append(f.atom)
+                elif f.type == FormulaType.predicate_type:
+                    key: Tuple[str, int] = (f.predicate, len(f.variables))
+                    if f.predicate != EQUALITY and key not in self.predicates:
+                        self.predicates.append(key)
+                    for variable in f.variables:
+                        if variable not in bound and variable not in self.names:
+                            self.names.append(variable)
+                elif f.type in (FormulaType.universal_type, FormulaType.existential_type):
+                    stack.append((f.inner, bound | {f.variable}))
+                else:
+                    stack.extend((c, bound) for c in (f.right, f.left, f.inner) if c is not None)
+
+def _name_assignments(number_of_names: int, domain_size: int) -> Iterator[Tuple[int, ...]]:
+    """
+    Assignments of the names to elements in restricted growth form:
+    each name is an already used element, or the smallest unused one.
+    Every assignment is isomorphic to one of these.
+    """
+    def _extend(prefix: Tuple[int, ...], used: int) -> Iterator[Tuple[int, ...]]:
+        if len(prefix) == number_of_names:
+            yield prefix
+            return
+        for element in range(min(used + 1, domain_size)):
+            yield from _extend(prefix + (element,), max(used, element + 1))
+
+    return _extend((), 0)
+
+class _Program:
+    """
+    The formulas compiled for a domain size and an assignment of the names.
+    Each instruction computes the value of a subformula from earlier values,
+    in post-order.
+    """
+    def __init__(
+        self,
+        formulas: List[Formula],
+        signature: _Signature,
+        domain_size: int,
+        names: Dict[str, int],
+    ):
+        self._domain_size: int = domain_size
+        self._names: Dict[str, int] = names
+        self._predicate_indices: Dict[Tuple[str, int], int] = {
+            key: i for i, key in enumerate(signature.predicates)
+        }
+        self._atom_indices: Dict[str, int] = {atom: i for i, atom in enumerate(signature.atoms)}
+        self.instructions: List[Tuple] = []
+        self.roots: List[int] = [self._compile(f) for f in formulas]
+
+    def _width(self, depth: int) -> int:
+        return self._domain_size ** depth
+
+    def _occurrence_masks(self, variables: List[str], axes: Dict[str, int], depth: int) -> List[int]:
+        """
+        For each tuple of elements, the assignments of the bound variables
+        which make the variables (terms) of a predicate that tuple.
+        Bit `p` of an extension is the tuple whose elements are the base
+        `domain_size` digits of `p`, the first element least significant.
+        """
+        s: int = self._domain_size
+        masks: List[int] = [0] * (s ** len(variables))
+        for assignment in range(self._width(depth)):
+            p: int = 0
+            for k, variable in enumerate(variables):
+                if variable in axes:
+                    element: int = (assignment // s ** axes[variable]) % s
+                else:
+                    element = self._names[variable]
+                p += element * s ** k
+            masks[p] |= 1 << assignment
+        return masks
+
+    def _compile(self, formula: Formula) -> int:
+        # The stack holds the formula, its bound variables (axis by variable),
+        # and whether its subformulas are already compiled.
+        results: Dict[int, int] = {}
+        stack: List[Tuple[Formula, Dict[str, int], bool]] = [(formula, {}, False)]
+        while len(stack) != 0:
+            f, axes, is_expanded = stack.pop()
+            depth: int = len(axes)
+            mask: int = (1 << self._width(depth)) - 1
+
+            if f.type in (FormulaType.universal_type, FormulaType.existential_type):
+                inner_axes: Dict[str, int] = {**axes, f.variable: depth}
+                if not is_expanded:
+                    stack.append((f, axes, True))
+                    stack.append((f.inner, inner_axes, False))
+                    continue
+                instruction = (f.type, results[id(f.inner)], self._width(depth), mask)
+            elif f.type in (FormulaType.and_type, FormulaType.or_type, FormulaType.conditional_type):
+                if not is_expanded:
+                    stack.append((f, axes, True))
+                    stack.append((f.right, axes, False))
+                    stack.append((f.left, axes, False))
+                    continue
+                instruction = (f.type, results[id(f.left)], results[id(f.right)], mask)
+            elif f.type == FormulaType.not_type:
+                if not is_expanded:
+                    stack.append((f, axes, True))
+                    stack.append((f.inner, axes, False))
+                    continue
+                instruction = (f.type, results[id(f.inner)], None, mask)
+            elif f.type == FormulaType.atomic_type:
+                instruction = (f.type, self._atom_indices[f.atom], None, mask)
+            elif f.predicate == EQUALITY and len(f.variables) == 2:
+                masks: List[int] = self._occurrence_masks(f.variables, axes, depth)
+                equal: int = 0
+                for element in range(self._domain_size):
+                    equal |= masks[element * (self._domain_size + 1)]
+                instruction = (EQUALITY, equal, None, mask)
+            else:
+                key: Tuple[str, int] = (f.predicate, len(f.variables))
+                instruction = (
+                    f.type,
+                    self._predicate_indices[key],
+                    self._occurrence_masks(f.variables, axes, depth),
+                    mask,
+                )
+
+            results[id(f)] = len(self.instructions)
+            self.instructions.append(instruction)
+        return results[id(formula)]
+
+    def evaluate(self, atoms: int, extensions: Tuple[int, ...]) -> List[int]:
+        """
+        Returns the values of the roots, with bit `k` of `atoms` as the value of the `k`-th atom.
+        """
+        values: List[int] = []
+        for type, a, b, mask in self.instructions:
+            if type == FormulaType.and_type:
+                values.append(values[a] & values[b])
+            elif type == FormulaType.or_type:
+                values.append(values[a] | values[b])
+            elif type == FormulaType.conditional_type:
+                values.append((values[a] ^ mask) | values[b])
+            elif type == FormulaType.not_type:
+                values.append(values[a] ^ mask)
+            elif type == FormulaType.predicate_type:
+                extension: int = extensions[a]
+                value: int = 0
+                while extension != 0:
+                    p: int = (extension & -extension).bit_length() - 1
+                    value |= b[p]
+                    extension &= extension - 1
+                values.append(value)
+            elif type == FormulaType.atomic_type:
+                values.append(mask if (atoms >> a) & 1 else 0)
+            elif type == EQUALITY:
+                values.append(a)
+            else:
+                # Reduction of the most significant axis of the body.
+                body: int = values[a]
+                value = mask if type == FormulaType.universal_type else 0
+                for element in range(self._domain_size):
+                    chunk: int = (body >> (element * b)) & mask
+                    if type == FormulaType.universal_type:
+                        value &= chunk
+                    else:
+                        value |= chunk
+                values.append(value)
+        return [values[root] for root in self.roots]
+
+def _diagonal_bits(signature: _Signature, domain_size: int) -> List[List[int]]:
+    # The bit of the tuple `(e, ..., e)` of each predicate, for each element `e`.
+    return [
+        [sum(e * domain_size ** k for k in range(arity)) for _, arity in signature.predicates]
+        for e in range(domain_size)
+    ]
+
+def _is_canonical(
+    extensions: Tuple[int, ...],
+    diagonal_bits: List[List[int]],
+    number_of_named_elements: int,
+) -> bool:
+    """
+    The elements which are not named can be permuted freely,
+    so only the models in which their diagonal values (whether `(e, ..., e)`
+    is in the extension of each predicate, which is preserved by permutations)
+    are in non-increasing order are checked.
+    """
+    previous: Optional[Tuple[int, ...]] = None
+    for bits in diagonal_bits[number_of_named_elements:]:
+        key: Tuple[int, ...] = tuple((x >> bit) & 1 for x, bit in zip(extensions, bits))
+        if previous is not None and key > previous:
+            return False
+        previous = key
+    return True
+
+def find_countermodel(
+    premises: List[Formula],
+    conclusion: Formula,
+    max_domain_size: int = 3,
+    max_interpretations: int = 1 << 16,
+) -> Optional[Model]:
+    """
+    Searches for a model, with a domain of size 1 to `max_domain_size`,
+    in which every premise is true and the conclusion is false.
+    Free variables are names of elements, `=` is equality,
+    and atoms are propositions.
+    Domain sizes with more than `max_interpretations` interpretations
+    (up to isomorphism of the names) are not searched.
+    Returns `None` if there is no such model in the searched domains,
+    which does not mean that the sequent is valid.
+    """
+    formulas: List[Formula] = premises + [conclusion]
+    signature: _Signature = _Signature(formulas)
+    # Counted per interpretation, see `truth_table.find_countermodel`.
+    counter: Optional[metrics.OperationCounter] = metrics.local.active
+
+    for domain_size in range(1, max_domain_size + 1):
+        name_assignments: List[Tuple[int, ...]] = list(
+            _name_assignments(len(signature.names), domain_size)
+        )
+        extension_ranges: List[range] = [
+            range(1 << domain_size ** arity) for _, arity in signature.predicates
+        ]
+        number_of_interpretations: int = len(name_assignments) << len(signature.atoms)
+        for r in extension_ranges:
+            number_of_interpretations *= len(r)
+        if number_of_interpretations > max_interpretations:
+            break
+
+        diagonal_bits: List[List[int]] = _diagonal_bits(signature, domain_size)
+        for elements in name_assignments:
+            names: Dict[str, int] = dict(zip(signature.names, elements))
+            number_of_named_elements: int = max(elements, default=-1) + 1
+            program: _Program = _Program(formulas, signature, domain_size, names)
+
+            for extensions in itertools.product(*extension_ranges):
+                if not _is_canonical(extensions, diagonal_bits, number_of_named_elements):
+                    continue
+                for atoms in range(1 << len(signature.atoms)):
+                    if counter is not None:
+                        counter.add(metrics.EVALUATED_NODES, len(program.instructions))
+                    values: List[int] = program.evaluate(atoms, extensions)
+                    if values[-1] == 0 and all(v == 1 for v in values[:-1]):
+                        return Model(
+                            domain_size,
+                            names,
+                            {atom: (atoms >> k) & 1 == 1 for k, atom in enumerate(signature.atoms)},
+                            {
+                                key: frozenset(
+                                    tuple((p // domain_size ** k) % domain_size for k in range(key[1]))
+                                    for p in range(domain_size ** key[1])
+                                    if (extension >> p) & 1
+                                )
+                                for key, extension in zip(signature.predicates, extensions)
+                            },
+                        )
+    return None
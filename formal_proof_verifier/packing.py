@@ -0,0 +1,197 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+from .formula import Formula, FormulaType
+from .line import Line
+
+_FORMULA_TYPES: Dict[int, FormulaType] = {t.value: t for t in FormulaType}
+_ATOMIC: int = FormulaType.atomic_type.value
+_NOT: int = FormulaType.not_type.value
+_PREDICATE: int = FormulaType.predicate_type.value
+_BINARY_TYPES: Set[int] = {
+    FormulaType.and_type.value,
+    FormulaType.or_type.value,
+    FormulaType.conditional_type.value,
+}
+
+class FormulaPacker:
+    """
+    Flattens formulas into a table of nodes, in which subformulas are
+    referenced by their indices in the table. Equal nodes are stored once,
+    so the formulas built by `unpack_formulas` share their subformulas.
+    A node is a tuple of its type value and, by type:
+    the atom; the predicate and its variables; the inner formula of a
+    negation; the left and right formulas; or the variable and the
+    inner formula of a quantifier.
+    """
+    def __init__(self):
+        self.nodes: List[Tuple] = []
+        # The added formulas (and so their subformulas) are kept alive,
+        # so that their ids are not reused by other formulas.
+        self._formulas: List[Formula] = []
+        self._indices_by_id: Dict[int, int] = {}
+        self._indices: Dict[Tuple, int] = {}
+
+    def add(self, formula: Formula) -> int:
+        """
+        Adds the formula (with its subformulas), and returns its index.
+        """
+        self._formulas.append(formula)
+        indices_by_id: Dict[int, int] = self._indices_by_id
+        indices: Dict[Tuple, int] = self._indices
+        nodes: List[Tuple] = self.nodes
+        stack: List[Formula] = [formula]
+        while len(stack) != 0:
+            f: Formula = stack[-1]
+            if id(f) in indices_by_id:
+                stack.pop()
+                continue
+            is_pending: bool = False
+            for child in (f._left, f._right, f._inner):
+                if child is not None and id(child) not in indices_by_id:
+                    stack.append(child)
+                    is_pending = True
+            if is_pending:
+                continue
+            stack.pop()
+
+            # `_value_` is a plain attribute, unlike `value`.
+            type_value: int = f._type._value_
+            if type_value in _BINARY_TYPES:
+                node: Tuple = (type_value, indices_by_id[id(f._left)], indices_by_id[id(f._right)])
+            elif type_value == _NOT:
+                node = (type_value, indices_by_id[id(f._inner)])
+            elif type_value == _ATOMIC:
+                node = (type_value, f._atom)
+            elif type_value == _PREDICATE:
+                node = (type_value, f._predicate, f._variables)
+            else:
+                node = (type_value, f._variable, indices_by_id[id(f._inner)])
+
+            index: Optional[int] = indices.get(node)
+            if index is None:
+                index = len(nodes)
+                nodes.append(node)
+                indices[node] = index
+            indices_by_id[id(f)] = index
+        return indices_by_id[id(formula)]
+
+def unpack_formulas(nodes: List[Tuple], formulas: Optional[List[Formula]] = None) -> List[Formula]:
+    """
+    Returns the formulas of the nodes of a `FormulaPacker`, by index.
+    With `formulas` (of the previous nodes), the formulas are appended to it.
+    """
+    if formulas is None:
+        formulas = []
+    for node in nodes:
+        type_value: int = node[0]
+        type: FormulaType = _FORMULA_TYPES[type_value]
+        if type_value in _BINARY_TYPES:
+            formula: Formula = Formula(type, left=formulas[node[1]], right=formulas[node[2]])
+        elif type_value == _NOT:
+            formula = Formula(type, inner=formulas[node[1]])
+        elif type_value == _ATOMIC:
+            formula = Formula(type, atom=node[1])
+        elif type_value == _PREDICATE:
+            formula = Formula(type, predicate=node[1], variables=node[2])
+        else:
+            formula = Formula(type, variable=node[1], inner=formulas[node[2]])
+        formulas.append(formula)
+    return formulas
+
+def _unpack_formula(nodes: List[Tuple], index: int) -> Formula:
+    return unpack_formulas(nodes)[index]
+
+
+class PackedProof:
+    """
+    Lines of a proof encoded as a table of formula nodes (see `FormulaPacker`)
+    and a table of line records, in which lines and formulas are referenced
+    by their indices. The tables are made of tuples, ints, strings and rule
+    classes only, so they pickle compactly. The validity of the lines is not kept.
+    """
+    __slots__ = (
+        "_nodes",
+        "_records",
+        "_lines",
+    )
+
+    def __init__(self, nodes: List[Tuple], records: List[Tuple]):
+        self._nodes: List[Tuple] = nodes
+        self._records: List[Tuple] = records
+        # The unpacked lines, created once.
+        self._lines: Optional[List[Line]] = None
+
+    def __reduce__(self):
+        return (PackedProof, (self._nodes, self._records))
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @staticmethod
+    def pack(lines: Iterable[Line]) -> "PackedProof":
+        """
+        Packs the lines, with the lines they depend on or cite.
+        A line comes after the lines it depends on or cites,
+        and the last of the given lines is the last packed line.
+        """
+        formula_packer: FormulaPacker = FormulaPacker()
+        records: List[Tuple] = []
+        # The indices of the packed lines, by id.
+        # The lines are alive while they are packed, so their ids are not reused.
+        indices: Dict[int, int] = {}
+        dependencies_tuples: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+
+        stack: List[Line] = list(reversed(list(lines)))
+        while len(stack) != 0:
+            line: Line = stack[-1]
+            if id(line) in indices:
+                stack.pop()
+                continue
+            pending: List[Line] = [
+                l for l in line._dependencies + line._rule._lines
+                if l is not line and id(l) not in indices
+            ]
+            if len(pending) != 0:
+                stack.extend(pending)
+                continue
+            stack.pop()
+
+            formula: Union[Formula, str] = line._formula
+            dependencies: Tuple[int, ...] = tuple(indices[id(l)] for l in line._dependencies)
+            # Lines often have the same dependencies, which are then
+            # the same tuple, and pickled once.
+            dependencies = dependencies_tuples.setdefault(dependencies, dependencies)
+            records.append((
+                dependencies,
+                formula if isinstance(formula, str) else formula_packer.add(formula),
+                type(line._rule),
+                tuple(indices[id(l)] for l in line._rule._lines),
+                line._is_self_dependency,
+                line._line_str,
+            ))
+            indices[id(line)] = len(records) - 1
+        return PackedProof(formula_packer.nodes, records)
+
+    def lines(self) -> List[Line]:
+        """
+        Returns the packed lines, which are created once. They share
+        formulas and rules like the packed lines, and their rules share
+        a new proof cache.
+        """
+        if self._lines is None:
+            formulas: List[Formula] = unpack_formulas(self._nodes)
+            lines: List[Line] = []
+            proof_cache: Dict = {}
+            for dependencies, formula, rule_class, rule_lines, is_self_dependency, line_str in self._records:
+                lines.append(Line(
+                    dependencies=[lines[i] for i in dependencies],
+                    formula=formulas[formula] if not isinstance(formula, str) else None,
+                    rule=rule_class([lines[i] for i in rule_lines], proof_cache),
+                    is_self_dependency=is_self_dependency,
+                    formula_str=formula if isinstance(formula, str) else None,
+                    line_str=line_str,
+                ))
+            self._lines = lines
+        return self._lines
+
+def _unpack_line(packed_proof: PackedProof, index: int) -> Line:
+    return packed_proof.lines()[index]
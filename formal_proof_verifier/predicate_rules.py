@@ -1,42 +1,79 @@
-from typing import List
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
 from .formula import FormulaType, Formula
-from .rule import Rule
-from .line import Line
+from .rule import ProofView, Rule
+
+def _match_instance(inner_formula: Formula, variable: str, instance_formula: Formula) -> Optional[Dict[str, str]]:
+    """
+    Matches the inner formula of a quantifier of `variable` with an instance,
+    in a single walk of both formulas.
+    Returns the substitution of the variable (empty if it does not occur),
+    or `None` if the instance is not the inner formula with every occurrence
+    of the variable replaced by the same name.
+    The substitution is built at the first occurrence of the variable,
+    and any later conflict fails immediately. A name which would be bound by
+    a nested quantifier of the instance (captured) is not a valid substitution.
+    """
+    substitution: Dict[str, str] = {}
+    stack: List[Tuple[Formula, Formula, FrozenSet[str]]] = [(inner_formula, instance_formula, frozenset())]
+    while len(stack) != 0:
+        f, g, bound = stack.pop()
+        if (
+            f.type != g.type
+            or f.atom != g.atom
+            or f.predicate != g.predicate
+            or f.variable != g.variable
+        ):
+            return None
+
+        if f.type == FormulaType.predicate_type:
+            if len(f.variables) != len(g.variables):
+                return None
+            for v, w in zip(f.variables, g.variables):
+                if v == variable:
+                    if w in bound or substitution.setdefault(variable, w) != w:
+                        return None
+                elif v != w:
+                    return None
+        elif f.type in (FormulaType.universal_type, FormulaType.existential_type):
+            stack.append((f.inner, g.inner, bound | {f.variable}))
+        else:
+            for f_child, g_child in ((f.inner, g.inner), (f.right, g.right), (f.left, g.left)):
+                if (f_child is None) != (g_child is None):
+                    return None
+                if f_child is not None:
+                    stack.append((f_child, g_child, bound))
+    return substitution
 
 class UniversalIntroductionRule(Rule):
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
-    ) -> bool:
-        expected_dependencies = list()
-        for line in self._lines:
-            expected_dependencies.extend(line.dependencies)
-
-        if not self._same_set(expected_dependencies, dependencies):
-            return False
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        return UniversalIntroductionRule.is_valid_formulas(
+            universal_formula=view.formula(view.node(line)),
+            instance_formula=view.formula(view.node(lines[0])),
+            dependency_formulas=(view.formula(view.node(l)) for l in view.dependencies(lines[0])),
+        )
 
-        if current_line.formula.type != FormulaType.universal_type:
+    @staticmethod
+    def is_valid_formulas(
+        universal_formula: Formula,
+        instance_formula: Formula,
+        dependency_formulas: Iterable[Formula],
+    ) -> bool:
+        if universal_formula.type != FormulaType.universal_type:
             return False
 
-        inner_formula: Formula = current_line.formula.inner
-        variable: str = current_line.formula.variable
-        other_formula: Formula = self._lines[0].formula
-        corresponding_variable: Optional[str] = (
-            inner_formula.find_corresponding_variable(variable, other_formula)
+        variable: str = universal_formula.variable
+        substitution: Optional[Dict[str, str]] = (
+            _match_instance(universal_formula.inner, variable, instance_formula)
         )
+        if substitution is None:
+            return False
 
-        if corresponding_variable:
-            variable_map: Dict[str, str] = {variable: corresponding_variable}
-            if inner_formula.eq_with_variable_map(other_formula, variable_map):
-                for dependency in self._lines[0].dependencies:
-                    if dependency.formula.is_variable_in(corresponding_variable):
-                        return False
-                return True
-            else:
-                return False
-        else:
-            return inner_formula == other_formula
+        if variable in substitution:
+            for dependency_formula in dependency_formulas:
+                if dependency_formula.is_variable_in(substitution[variable]):
+                    return False
+        return True
 
     def symbol() -> str:
         return "UI"
@@ -44,35 +81,26 @@ class UniversalIntroductionRule(Rule):
     def number_of_lines() -> int:
         return 1
 
-class UniversalEliminationRule(Rule):
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
-    ) -> bool:
-        expected_dependencies = list()
-        for line in self._lines:
-            expected_dependencies.extend(line.dependencies)
+    def conclusion_type() -> FormulaType:
+        return FormulaType.universal_type
 
-        if not self._same_set(expected_dependencies, dependencies):
-            return False
+class UniversalEliminationRule(Rule):
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        return UniversalEliminationRule.is_valid_formulas(
+            universal_formula=view.formula(view.node(lines[0])),
+            instance_formula=view.formula(view.node(line)),
+        )
 
-        universal_formula: Formula = self._lines[0].formula
+    @staticmethod
+    def is_valid_formulas(
+        universal_formula: Formula,
+        instance_formula: Formula,
+    ) -> bool:
         if universal_formula.type != FormulaType.universal_type:
             return False
 
-        inner_formula: Formula = universal_formula.inner
-        variable: str = universal_formula.variable
-        other_formula: Formula = current_line.formula
-        corresponding_variable: Optional[str] = (
-            inner_formula.find_corresponding_variable(variable, other_formula)
-        )
-
-        if corresponding_variable:
-            variable_map: Dict[str, str] = {variable: corresponding_variable}
-            return inner_formula.eq_with_variable_map(other_formula, variable_map)
-        else:
-            return inner_formula == other_formula
+        return _match_instance(universal_formula.inner, universal_formula.variable, instance_formula) is not None
 
     def symbol() -> str:
         return "UE"
@@ -80,34 +108,26 @@ class UniversalEliminationRule(Rule):
     def number_of_lines() -> int:
         return 1
 
-class ExistentialIntroductionRule(Rule):
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
-    ) -> bool:
-        expected_dependencies = list()
-        for line in self._lines:
-            expected_dependencies.extend(line.dependencies)
+    def line_types() -> Tuple[Optional[FormulaType], ...]:
+        return (FormulaType.universal_type,)
 
-        if not self._same_set(expected_dependencies, dependencies):
-            return False
+class ExistentialIntroductionRule(Rule):
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        return ExistentialIntroductionRule.is_valid_formulas(
+            existential_formula=view.formula(view.node(line)),
+            instance_formula=view.formula(view.node(lines[0])),
+        )
 
-        if current_line.formula.type != FormulaType.existential_type:
+    @staticmethod
+    def is_valid_formulas(
+        existential_formula: Formula,
+        instance_formula: Formula,
+    ) -> bool:
+        if existential_formula.type != FormulaType.existential_type:
             return False
 
-        inner_formula: Formula = current_line.formula.inner
-        variable: str = current_line.formula.variable
-        other_formula: Formula = self._lines[0].formula
-        corresponding_variable: Optional[str] = (
-            inner_formula.find_corresponding_variable(variable, other_formula)
-        )
-
-        if corresponding_variable:
-            variable_map: Dict[str, str] = {variable: corresponding_variable}
-            return inner_formula.eq_with_variable_map(other_formula, variable_map)
-        else:
-            return inner_formula == other_formula
+        return _match_instance(existential_formula.inner, existential_formula.variable, instance_formula) is not None
 
     def symbol() -> str:
         return "EI"
@@ -115,55 +135,51 @@ class ExistentialIntroductionRule(Rule):
     def number_of_lines() -> int:
         return 1
 
-class ExistentialEliminationRule(Rule):
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
-    ) -> bool:
-        expected_dependencies = list()
-        for line in self._lines:
-            expected_dependencies.extend(line.dependencies)
-
-        expected_dependencies = list(filter(
-            lambda l: (l is not self._lines[1]),
-            expected_dependencies
-        ))
-
-        if not self._same_set(expected_dependencies, dependencies):
-            return False
+    def conclusion_type() -> FormulaType:
+        return FormulaType.existential_type
 
+class ExistentialEliminationRule(Rule):
+    @staticmethod
+    def discharged_lines() -> Tuple[int, ...]:
+        return (1,)
+
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        return ExistentialEliminationRule.is_valid_formulas(
+            existential_formula=view.formula(view.node(lines[0])),
+            typical_disjunct_formula=view.formula(view.node(lines[1])),
+            conclusion_formula=view.formula(view.node(lines[2])),
+            formula=view.formula(view.node(line)),
+            dependency_formulas=(view.formula(view.node(l)) for l in view.dependencies(line)),
+        )
 
-        existential_formula: Formula = self._lines[0].formula
+    @staticmethod
+    def is_valid_formulas(
+        existential_formula: Formula,
+        typical_disjunct_formula: Formula,
+        conclusion_formula: Formula,
+        formula: Formula,
+        dependency_formulas: Iterable[Formula],
+    ) -> bool:
         if existential_formula.type != FormulaType.existential_type:
             return False
 
-        if not self._lines[1].is_assumption():
-            return False
-
-        typical_disjunct_formula: Formula = self._lines[1].formula
-
-        inner_formula: Formula = existential_formula.inner
         variable: str = existential_formula.variable
-        corresponding_variable: Optional[str] = (
-            inner_formula.find_corresponding_variable(variable, typical_disjunct_formula)
+        substitution: Optional[Dict[str, str]] = (
+            _match_instance(existential_formula.inner, variable, typical_disjunct_formula)
         )
+        if substitution is None:
+            return False
 
-        if corresponding_variable:
-            variable_map: Dict[str, str] = {variable: corresponding_variable}
-            if not inner_formula.eq_with_variable_map(typical_disjunct_formula, variable_map):
-                return False
-
-            if self._lines[2].formula.is_variable_in(corresponding_variable):
+        if variable in substitution:
+            if conclusion_formula.is_variable_in(substitution[variable]):
                 return False
 
-            for dependency in current_line.dependencies:
-                if dependency.formula.is_variable_in(corresponding_variable):
+            for dependency_formula in dependency_formulas:
+                if dependency_formula.is_variable_in(substitution[variable]):
                     return False
-        elif inner_formula != typical_disjunct_formula:
-            return False
 
-        if self._lines[2].formula != current_line.formula:
+        if conclusion_formula != formula:
             return False
 
         return True
@@ -174,3 +190,6 @@ class ExistentialEliminationRule(Rule):
     def number_of_lines() -> int:
         return 3
 
+    def line_types() -> Tuple[Optional[FormulaType], ...]:
+        return (FormulaType.existential_type, None, None)
+
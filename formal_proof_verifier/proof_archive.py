@@ -0,0 +1,190 @@
+import struct
+from array import array
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+from zlib import crc32
+from .compiled_proof import (
+    read_array,
+    read_formula_table,
+    read_proof_store,
+    read_strings,
+    write_array,
+    write_formula_table,
+    write_proof_store,
+    write_strings,
+)
+from .proof_store import FormulaTable, ProofStore
+
+# Archive of many proofs sharing one formula table, so that a formula
+# (or label) used by many proofs is stored once:
+#
+#   header:  magic (4 bytes), version (u16), reserved (u16)
+#   records: the arrays of each proof store (see `compiled_proof`),
+#            one after the other, in the order the proofs were added
+#   table:   the formula table of all the proofs
+#   index:   the names of the proofs, the offsets of their records
+#            (record i is between offsets i and i + 1) and their CRC-32
+#   footer:  offset of the table (u64), offset of the index (u64),
+#            CRC-32 of the table and index (u32), magic (4 bytes)
+#
+# The records are written as the proofs are added, and the table and
+# index when the archive is closed. A reader loads the table and the
+# index once, and then reads any proof with one seek.
+MAGIC: bytes = b"FPVA"
+VERSION: int = 1
+
+_HEADER = struct.Struct("<4sHH")
+_FOOTER = struct.Struct("<QQI4s")
+
+class ArchiveWriter:
+    """
+    Writes proofs to an archive, see `ArchiveReader`.
+    The proofs must be stores on the formula table of the writer
+    (or texts, which are parsed into it).
+    """
+    def __init__(self, path: str):
+        self._file: BinaryIO = open(path, "wb")
+        self._formula_table: FormulaTable = FormulaTable()
+        self._names: List[str] = []
+        self._offsets: array = array("Q", [_HEADER.size])
+        self._checksums: array = array("I")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, 0))
+
+    @property
+    def formula_table(self) -> FormulaTable:
+        return self._formula_table
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, name: str, proof: Union[str, ProofStore]) -> int:
+        """
+        Adds a proof, and returns its index in the archive.
+        """
+        if isinstance(proof, str):
+            proof = ProofStore.from_text(proof, self._formula_table)
+        elif proof.formula_table is not self._formula_table:
+            raise RuntimeError(f"Error: proof '{name}' does not use the formula table of the archive.")
+        record: bytearray = bytearray()
+        write_proof_store(record, proof)
+        self._file.write(record)
+        self._names.append(name)
+        self._offsets.append(self._offsets[-1] + len(record))
+        self._checksums.append(crc32(record))
+        return len(self._names) - 1
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        trailer: bytearray = bytearray()
+        write_formula_table(trailer, self._formula_table)
+        index_offset: int = len(trailer)
+        write_strings(trailer, self._names)
+        write_array(trailer, self._offsets)
+        write_array(trailer, self._checksums)
+        table_offset: int = self._offsets[-1]
+        self._file.write(trailer)
+        self._file.write(_FOOTER.pack(table_offset, table_offset + index_offset, crc32(trailer), MAGIC))
+        self._file.close()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+class ArchiveReader:
+    """
+    Reads the proofs of an archive written by `ArchiveWriter`, by index
+    or by name. The loaded stores share the formula table of the archive,
+    so equal formulas of different proofs have the same node id.
+    """
+    def __init__(self, path: str):
+        self._file: BinaryIO = open(path, "rb")
+        try:
+            self._read_trailer()
+        except BaseException:
+            self._file.close()
+            raise
+
+    def _read_trailer(self) -> None:
+        header: bytes = self._file.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise RuntimeError("Error: archive is truncated.")
+        magic, version, _ = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise RuntimeError("Error: not a proof archive.")
+        if version != VERSION:
+            raise RuntimeError(f"Error: archive has version {version}, expected {VERSION}.")
+
+        size: int = self._file.seek(0, 2)
+        if size < _HEADER.size + _FOOTER.size:
+            raise RuntimeError("Error: archive is truncated.")
+        self._file.seek(size - _FOOTER.size)
+        table_offset, index_offset, checksum, magic = _FOOTER.unpack(self._file.read(_FOOTER.size))
+        if magic != MAGIC or not (_HEADER.size <= table_offset <= index_offset <= size - _FOOTER.size):
+            raise RuntimeError("Error: archive is truncated.")
+        self._file.seek(table_offset)
+        trailer: memoryview = memoryview(self._file.read(size - _FOOTER.size - table_offset))
+        if crc32(trailer) != checksum:
+            raise RuntimeError("Error: archive is corrupted (checksum mismatch).")
+
+        self._formula_table: FormulaTable
+        self._formula_table, offset = read_formula_table(trailer, 0)
+        offset = index_offset - table_offset
+        self._names: List[str]
+        self._names, offset = read_strings(trailer, offset)
+        self._offsets: array
+        self._offsets, offset = read_array(trailer, offset, "Q")
+        self._checksums: array
+        self._checksums, offset = read_array(trailer, offset, "I")
+        if not (len(self._names) + 1 == len(self._offsets) and len(self._names) == len(self._checksums)):
+            raise RuntimeError("Error: archive has an invalid index.")
+        self._indices: Optional[Dict[str, int]] = None
+
+    @property
+    def formula_table(self) -> FormulaTable:
+        return self._formula_table
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def index(self, name: str) -> int:
+        if self._indices is None:
+            self._indices = {name: i for i, name in enumerate(self._names)}
+        index: Optional[int] = self._indices.get(name)
+        if index is None:
+            raise RuntimeError(f"Error: archive has no proof '{name}'.")
+        return index
+
+    def proof(self, key: Union[int, str]) -> ProofStore:
+        """
+        Reads a proof, given its index or its name.
+        """
+        index: int = self.index(key) if isinstance(key, str) else key
+        if not (0 <= index < len(self._names)):
+            raise RuntimeError(f"Error: archive has no proof {index}.")
+        start: int = self._offsets[index]
+        end: int = self._offsets[index + 1]
+        self._file.seek(start)
+        record: bytes = self._file.read(end - start)
+        if len(record) != end - start:
+            raise RuntimeError("Error: archive is truncated.")
+        if crc32(record) != self._checksums[index]:
+            raise RuntimeError(f"Error: proof '{self._names[index]}' is corrupted (checksum mismatch).")
+        store, offset = read_proof_store(memoryview(record), 0, self._formula_table)
+        if offset != len(record):
+            raise RuntimeError(f"Error: proof '{self._names[index]}' has trailing data.")
+        return store
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,444 @@
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .formula import Formula, FormulaType, create_formula
+from .rule import ProofView, Rule
+from .line import Line
+from .formal_proof_verifier import split_line
+
+# The opcode of a rule is its index in this tuple.
+# New rules must be appended, so that existing opcodes do not change.
+RULE_SYMBOLS: Tuple[str, ...] = (
+    "P", "A",
+    "&I", "&E", "vI", "vE", "CP", "MP", "DNI", "DNE", "MT", "RAA",
+    "UI", "UE", "EI", "EE",
+    "=I", "=E",
+    "TF",
+    "=*",
+)
+RULE_OPCODES: Dict[str, int] = {symbol: i for i, symbol in enumerate(RULE_SYMBOLS)}
+
+NO_NODE: int = -1
+
+class FormulaTable:
+    """
+    Columnar table of formula nodes.
+    Each node is stored once (hash-consing), so two formulas are equal
+    if and only if they have the same node id.
+    The columns are parallel arrays indexed by the node id: the type,
+    the ids of the left, right and inner subformulas (or `NO_NODE`),
+    the symbol (atom, predicate or quantified variable) as an index into
+    the string table, and the variables of predicates as a slice of
+    the variables array given by the variables offsets.
+    """
+    def __init__(self):
+        self._strings: List[str] = []
+        # The indices of the strings and of the nodes are only needed
+        # to add to the table, so a loaded table builds them on demand.
+        self._string_ids: Optional[Dict[str, int]] = {}
+
+        self._types: array = array("B")
+        self._lefts: array = array("i")
+        self._rights: array = array("i")
+        self._inners: array = array("i")
+        self._symbols: array = array("i")
+        self._variables_offsets: array = array("I", [0])
+        self._variables: array = array("I")
+
+        self._node_ids: Optional[Dict[Tuple, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def _build_indices(self) -> None:
+        self._string_ids = {string: i for i, string in enumerate(self._strings)}
+        self._node_ids = {
+            (
+                self._types[n],
+                self._lefts[n],
+                self._rights[n],
+                self._inners[n],
+                self._symbols[n],
+                tuple(self._variables[self._variables_offsets[n]:self._variables_offsets[n + 1]]),
+            ): n
+            for n in range(len(self._types))
+        }
+
+    def string_id(self, string: str) -> int:
+        if self._string_ids is None:
+            self._build_indices()
+        string_id: Optional[int] = self._string_ids.get(string)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(string)
+            self._string_ids[string] = string_id
+        return string_id
+
+    def string(self, string_id: int) -> str:
+        return self._strings[string_id]
+
+    def _add_node(
+        self,
+        type: int,
+        left: int,
+        right: int,
+        inner: int,
+        symbol: int,
+        variables: Tuple[int, ...],
+    ) -> int:
+        if self._node_ids is None:
+            self._build_indices()
+        key: Tuple = (type, left, right, inner, symbol, variables)
+        node: Optional[int] = self._node_ids.get(key)
+        if node is None:
+            node = len(self._types)
+            self._types.append(type)
+            self._lefts.append(left)
+            self._rights.append(right)
+            self._inners.append(inner)
+            self._symbols.append(symbol)
+            self._variables.extend(variables)
+            self._variables_offsets.append(len(self._variables))
+            self._node_ids[key] = node
+        return node
+
+    def add(self, formula: Formula) -> int:
+        """
+        Adds the formula to the table, and returns its node id.
+        """
+        # Iterative post-order traversal, so that deep formulas
+        # are not limited by the recursion limit.
+        node_ids: Dict[int, int] = {}
+        stack: List[Formula] = [formula]
+        while len(stack) != 0:
+            f: Formula = stack[-1]
+            children: List[Formula] = [
+                c for c in (f.left, f.right, f.inner)
+                if c is not None and id(c) not in node_ids
+            ]
+            if len(children) != 0:
+                stack.extend(children)
+                continue
+            stack.pop()
+
+            def _node_id(f: Optional[Formula]) -> int:
+                return NO_NODE if f is None else node_ids[id(f)]
+
+            symbol: Optional[str] = f.atom or f.predicate or f.variable
+            node_ids[id(f)] = self._add_node(
+                type=f.type.value,
+                left=_node_id(f.left),
+                right=_node_id(f.right),
+                inner=_node_id(f.inner),
+                symbol=NO_NODE if symbol is None else self.string_id(symbol),
+                variables=(
+                    () if f.variables is None
+                    else tuple(self.string_id(v) for v in f.variables)
+                ),
+            )
+        return node_ids[id(formula)]
+
+    def type(self, node: int) -> FormulaType:
+        return FormulaType(self._types[node])
+
+    def left(self, node: int) -> int:
+        return self._lefts[node]
+
+    def right(self, node: int) -> int:
+        return self._rights[node]
+
+    def inner(self, node: int) -> int:
+        return self._inners[node]
+
+    def symbol(self, node: int) -> Optional[str]:
+        symbol: int = self._symbols[node]
+        return None if symbol == NO_NODE else self._strings[symbol]
+
+    def variables(self, node: int) -> List[str]:
+        start: int = self._variables_offsets[node]
+        end: int = self._variables_offsets[node + 1]
+        return [self._strings[v] for v in self._variables[start:end]]
+
+    def formula(self, node: int) -> Formula:
+        """
+        Creates the `Formula` object of the node.
+        """
+        formulas: Dict[int, Formula] = {}
+        stack: List[int] = [node]
+        while len(stack) != 0:
+            n: int = stack[-1]
+            children: List[int] = [
+                c for c in (self._lefts[n], self._rights[n], self._inners[n])
+                if c != NO_NODE and c not in formulas
+            ]
+            if len(children) != 0:
+                stack.extend(children)
+                continue
+            stack.pop()
+
+            type: FormulaType = FormulaType(self._types[n])
+            symbol: Optional[str] = self.symbol(n)
+            formulas[n] = Formula(
+                type=type,
+                left=formulas.get(self._lefts[n]),
+                right=formulas.get(self._rights[n]),
+                inner=formulas.get(self._inners[n]),
+                atom=symbol if type == FormulaType.atomic_type else None,
+                predicate=symbol if type == FormulaType.predicate_type else None,
+                variable=(
+                    symbol
+                    if type in (FormulaType.universal_type, FormulaType.existential_type)
+                    else None
+                ),
+                variables=self.variables(n) if type == FormulaType.predicate_type else None,
+            )
+        return formulas[node]
+
+class ProofStore:
+    """
+    Struct-of-arrays representation of a proof, for very long proofs.
+    Instead of `Line`, `Rule` and `Formula` objects, each line is a row
+    of parallel arrays: the formula id into a (possibly shared) `FormulaTable`,
+    the rule opcode (see `RULE_SYMBOLS`), the cited lines and the dependencies.
+    The cited lines and the dependencies of line `i` are the slices
+    between the offsets `i` and `i + 1` of their arrays.
+    The dependencies are stored as sorted, unique line indices
+    (a line depending on itself contains its own index).
+    """
+    def __init__(self, formula_table: Optional[FormulaTable] = None):
+        self._formula_table: FormulaTable = (
+            formula_table if formula_table is not None else FormulaTable()
+        )
+
+        self._labels: array = array("I")
+        self._formula_ids: array = array("I")
+        self._opcodes: array = array("B")
+        self._citation_offsets: array = array("I", [0])
+        self._citations: array = array("I")
+        self._dependency_offsets: array = array("I", [0])
+        self._dependencies: array = array("I")
+        # Shared by the rule checks of the store, see `Rule`.
+        self._proof_cache: Dict = {}
+
+    @property
+    def formula_table(self) -> FormulaTable:
+        return self._formula_table
+
+    def __len__(self) -> int:
+        return len(self._opcodes)
+
+    def append(
+        self,
+        label: str,
+        formula: Formula,
+        symbol: str,
+        citations: Iterable[int],
+        dependencies: Iterable[int],
+    ) -> int:
+        """
+        Appends a line, and returns its index.
+        The cited lines and the dependencies are indices of lines,
+        and a line can depend on itself by its future index (`len(store)`).
+        """
+        index: int = len(self)
+        opcode: Optional[int] = RULE_OPCODES.get(symbol)
+        if opcode is None:
+            raise RuntimeError(f"Error: rule '{symbol}' is invalid.")
+        citations = list(citations)
+        dependencies = sorted(set(dependencies))
+        if any(not (0 <= l < index) for l in citations):
+            raise RuntimeError(f"Error: Invalid line number for rule in line '{label}'.")
+        if any(not (0 <= l <= index) for l in dependencies):
+            raise RuntimeError(f"Error: Invalid line number for dependencies in line '{label}'.")
+
+        self._labels.append(self._formula_table.string_id(label))
+        self._formula_ids.append(self._formula_table.add(formula))
+        self._opcodes.append(opcode)
+        self._citations.extend(citations)
+        self._citation_offsets.append(len(self._citations))
+        self._dependencies.extend(dependencies)
+        self._dependency_offsets.append(len(self._dependencies))
+        return index
+
+    @staticmethod
+    def from_lines_str(
+        lines_str: Iterable[str],
+        formula_table: Optional[FormulaTable] = None,
+    ) -> "ProofStore":
+        """
+        Creates the store directly from the proof lines,
+        without creating `Line` and `Rule` objects.
+        The same structural errors are raised as by `create_lines`.
+        """
+        store: ProofStore = ProofStore(formula_table)
+        indices: Dict[str, int] = {}
+
+        for line_str in lines_str:
+            dependencies_str, line_number_str, formula_str, rule_lines_str, rule_symbol = (
+                split_line(line_str)
+            )
+
+            if line_number_str in indices:
+                raise RuntimeError(f"Error: Line number '{line_number_str}' already exists.")
+
+            formula: Formula = create_formula(formula_str)
+
+            if any(l not in indices for l in rule_lines_str):
+                raise RuntimeError(f"Error: Invalid line number for rule in '{line_str}'.")
+            rule = Rule.find(rule_symbol)
+            if rule is None:
+                raise RuntimeError(f"Error: rule '{rule_symbol}' is invalid.")
+            if rule.number_of_lines() not in (None, len(rule_lines_str)):
+                raise RuntimeError(f"Error: rule '{rule_symbol}' has invalid number of line numbers.")
+
+            if any((l != line_number_str and l not in indices) for l in dependencies_str):
+                raise RuntimeError(f"Error: Invalid line number for dependencies in '{line_str}'.")
+
+            index: int = len(store)
+            store.append(
+                label=line_number_str,
+                formula=formula,
+                symbol=rule_symbol,
+                citations=(indices[l] for l in rule_lines_str),
+                dependencies=(
+                    index if l == line_number_str else indices[l]
+                    for l in dependencies_str
+                ),
+            )
+            indices[line_number_str] = index
+        return store
+
+    @staticmethod
+    def from_text(text: str, formula_table: Optional[FormulaTable] = None) -> "ProofStore":
+        lines_str: List[str] = []
+        for line_str in text.split("\n"):
+            if line_str.split(sep="#", maxsplit=1)[0].strip(" ") != "":
+                lines_str.append(line_str)
+        return ProofStore.from_lines_str(lines_str, formula_table)
+
+    @staticmethod
+    def from_lines(
+        lines: Iterable[Tuple[str, Line]],
+        formula_table: Optional[FormulaTable] = None,
+    ) -> "ProofStore":
+        """
+        Creates the store from the result of `create_lines`.
+        """
+        store: ProofStore = ProofStore(formula_table)
+        indices: Dict[int, int] = {}
+
+        for line_str, line in lines:
+            symbol: Optional[str] = type(line.rule).symbol()
+            if symbol is None:
+                raise RuntimeError(f"Error: rule of line '{line_str}' is not known.")
+            index: int = len(store)
+            indices[id(line)] = index
+            store.append(
+                label=split_line(line_str)[1],
+                formula=line.formula,
+                symbol=symbol,
+                citations=(indices[id(l)] for l in line.rule.lines),
+                dependencies=(indices[id(l)] for l in line.dependencies),
+            )
+        return store
+
+    def label(self, index: int) -> str:
+        return self._formula_table.string(self._labels[index])
+
+    def formula_id(self, index: int) -> int:
+        return self._formula_ids[index]
+
+    def formula(self, index: int) -> Formula:
+        return self._formula_table.formula(self._formula_ids[index])
+
+    def symbol(self, index: int) -> str:
+        return RULE_SYMBOLS[self._opcodes[index]]
+
+    def citations(self, index: int) -> array:
+        return self._citations[self._citation_offsets[index]:self._citation_offsets[index + 1]]
+
+    def dependencies(self, index: int) -> array:
+        return self._dependencies[self._dependency_offsets[index]:self._dependency_offsets[index + 1]]
+
+    def verify(self) -> List[bool]:
+        """
+        Returns the validity of every line.
+        A line is valid if its cited lines are valid and the rule is applied correctly.
+        Lines only cite earlier lines, so a single pass in order is enough.
+        """
+        validity: bytearray = bytearray(len(self))
+        citation_offsets: array = self._citation_offsets
+        citations: array = self._citations
+        opcodes: array = self._opcodes
+        # The lines are checked by the rules (see `Rule.check`), with their
+        # formulas compared by node ids and their dependencies as sets of
+        # line indices, so that the loop does not create `Formula` objects
+        # for the propositional rules.
+        view: _StoreView = _StoreView(self)
+        for i in range(len(self)):
+            cited: array = citations[citation_offsets[i]:citation_offsets[i + 1]]
+            if all(validity[c] for c in cited) and Rule.check(_RULE_CLASSES[opcodes[i]], view, i, cited):
+                validity[i] = 1
+        return [v == 1 for v in validity]
+
+    # Helpers of the rule checks.
+
+    def _dependency_set(self, index: int) -> Set[int]:
+        return set(self._dependencies[self._dependency_offsets[index]:self._dependency_offsets[index + 1]])
+
+    def _has_dependencies(self, index: int, cited: Iterable[int], discharged: Iterable[int] = ()) -> bool:
+        expected_dependencies: Set[int] = set()
+        for c in cited:
+            expected_dependencies.update(self._dependency_set(c))
+        expected_dependencies.difference_update(discharged)
+        return self._dependency_set(index) == expected_dependencies
+
+    def _is_assumption(self, index: int) -> bool:
+        return self._opcodes[index] == RULE_OPCODES["A"]
+
+class _StoreView(ProofView):
+    """
+    View of the lines of a store by their indices,
+    whose nodes are the ids of their formulas in the formula table.
+    """
+    def __init__(self, store: ProofStore):
+        super().__init__(store._proof_cache)
+        self._store: ProofStore = store
+        self._formula_ids: array = store._formula_ids
+        self._formula_table: FormulaTable = store._formula_table
+        self._types: array = store._formula_table._types
+        self._lefts: array = store._formula_table._lefts
+        self._rights: array = store._formula_table._rights
+        self._inners: array = store._formula_table._inners
+
+    def is_self_dependent(self, line: int) -> bool:
+        return self._store._dependency_set(line) == {line}
+
+    def has_dependencies(self, line: int, lines: array, discharged: List[int]) -> bool:
+        return self._store._has_dependencies(line, lines, discharged)
+
+    def dependencies(self, line: int) -> Set[int]:
+        return self._store._dependency_set(line)
+
+    def is_assumption(self, line: int) -> bool:
+        return self._store._is_assumption(line)
+
+    def node(self, line: int) -> int:
+        return self._formula_ids[line]
+
+    def type_value(self, node: int) -> int:
+        return self._types[node]
+
+    def left(self, node: int) -> int:
+        return self._lefts[node]
+
+    def right(self, node: int) -> int:
+        return self._rights[node]
+
+    def inner(self, node: int) -> int:
+        return self._inners[node]
+
+    def formula(self, node: int) -> Formula:
+        return self._formula_table.formula(node)
+
+# The rule classes by opcode.
+_RULE_CLASSES: Tuple[type, ...] = tuple(Rule.find(symbol) for symbol in RULE_SYMBOLS)
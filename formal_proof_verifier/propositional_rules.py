@@ -1,18 +1,20 @@
-from typing import List
-from .formula import FormulaType
-from .rule import Rule
-from .line import Line
+from typing import Dict, List, Optional, Tuple
+from .formula import Formula, FormulaType
+from .rule import ProofView, Rule
+
+_AND: int = FormulaType.and_type.value
+_OR: int = FormulaType.or_type.value
+_CONDITIONAL: int = FormulaType.conditional_type.value
+_NOT: int = FormulaType.not_type.value
 
 class PremiseRule(Rule):
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
-    ) -> bool:
-        return (
-            len(dependencies) == 1
-            and next(iter(dependencies)) is current_line
-        )
+    @staticmethod
+    def is_self_dependent() -> bool:
+        return True
+
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        return True
 
     def symbol() -> str:
         return "P"
@@ -25,15 +27,13 @@ class AssumptionRule(Rule):
     def is_assumption() -> bool:
         return True
 
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
-    ) -> bool:
-        return (
-            len(dependencies) == 1
-            and next(iter(dependencies)) is current_line
-        )
+    @staticmethod
+    def is_self_dependent() -> bool:
+        return True
+
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        return True
 
     def symbol() -> str:
         return "A"
@@ -42,28 +42,14 @@ class AssumptionRule(Rule):
         return 0
 
 class AndIntroductionRule(Rule):
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
-    ) -> bool:
-        expected_dependencies = list()
-        for line in self._lines:
-            expected_dependencies.extend(line.dependencies)
-
-        if not self._same_set(expected_dependencies, dependencies):
-            return False
-
-        if current_line.formula.type != FormulaType.and_type:
-            return False
-
-        if self._lines[0].formula != current_line.formula.left:
-            return False
-
-        if self._lines[1].formula != current_line.formula.right:
-            return False
-
-        return True
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        formula = view.node(line)
+        return (
+            view.type_value(formula) == _AND
+            and view.node(lines[0]) == view.left(formula)
+            and view.node(lines[1]) == view.right(formula)
+        )
 
     def symbol() -> str:
         return "&I"
@@ -71,29 +57,17 @@ class AndIntroductionRule(Rule):
     def number_of_lines() -> int:
         return 2
 
-class AndEliminationRule(Rule):
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
-    ) -> bool:
-        expected_dependencies = list()
-        for line in self._lines:
-            expected_dependencies.extend(line.dependencies)
-
-        if not self._same_set(expected_dependencies, dependencies):
-            return False
+    def conclusion_type() -> FormulaType:
+        return FormulaType.and_type
 
-        if self._lines[0].formula.type != FormulaType.and_type:
+class AndEliminationRule(Rule):
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        formula_0 = view.node(lines[0])
+        if view.type_value(formula_0) != _AND:
             return False
-
-        if self._lines[0].formula.left == current_line.formula:
-            return True
-
-        if self._lines[0].formula.right == current_line.formula:
-            return True
-
-        return False
+        formula = view.node(line)
+        return view.left(formula_0) == formula or view.right(formula_0) == formula
 
     def symbol() -> str:
         return "&E"
@@ -101,29 +75,17 @@ class AndEliminationRule(Rule):
     def number_of_lines() -> int:
         return 1
 
-class OrIntroductionRule(Rule):
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
-    ) -> bool:
-        expected_dependencies = list()
-        for line in self._lines:
-            expected_dependencies.extend(line.dependencies)
-
-        if not self._same_set(expected_dependencies, dependencies):
-            return False
+    def line_types() -> Tuple[Optional[FormulaType], ...]:
+        return (FormulaType.and_type,)
 
-        if current_line.formula.type != FormulaType.or_type:
+class OrIntroductionRule(Rule):
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        formula = view.node(line)
+        if view.type_value(formula) != _OR:
             return False
-
-        if self._lines[0].formula == current_line.formula.left:
-            return True
-
-        if self._lines[0].formula == current_line.formula.right:
-            return True
-
-        return False
+        formula_0 = view.node(lines[0])
+        return formula_0 == view.left(formula) or formula_0 == view.right(formula)
 
     def symbol() -> str:
         return "vI"
@@ -131,48 +93,30 @@ class OrIntroductionRule(Rule):
     def number_of_lines() -> int:
         return 1
 
-class OrEliminationRule(Rule):
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
-    ) -> bool:
-        expected_dependencies = list()
-        for line in self._lines:
-            expected_dependencies.extend(line.dependencies)
-
-        expected_dependencies = list(filter(
-            lambda l: (l is not self._lines[1] and l is not self._lines[3]),
-            expected_dependencies
-        ))
-
-        if not self._same_set(expected_dependencies, dependencies):
-            return False
-
-        if self._lines[0].formula.type != FormulaType.or_type:
-            return False
+    def conclusion_type() -> FormulaType:
+        return FormulaType.or_type
 
-        if not self._lines[1].is_assumption():
-            return False
-        if self._lines[1].formula != self._lines[0].formula.left:
-            return False
-
-        if self._lines[1] not in self._lines[2].dependencies:
-            return False
-        if self._lines[2].formula != current_line.formula:
-            return False
+class OrEliminationRule(Rule):
+    @staticmethod
+    def discharged_lines() -> Tuple[int, ...]:
+        return (1, 3)
 
-        if not self._lines[3].is_assumption():
-            return False
-        if self._lines[3].formula != self._lines[0].formula.right:
-            return False
+    @staticmethod
+    def subproofs() -> Tuple[Tuple[int, int], ...]:
+        return ((1, 2), (3, 4))
 
-        if self._lines[3] not in self._lines[4].dependencies:
-            return False
-        if self._lines[4].formula != current_line.formula:
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        formula_0 = view.node(lines[0])
+        if view.type_value(formula_0) != _OR:
             return False
-
-        return True
+        formula = view.node(line)
+        return (
+            view.node(lines[1]) == view.left(formula_0)
+            and view.node(lines[2]) == formula
+            and view.node(lines[3]) == view.right(formula_0)
+            and view.node(lines[4]) == formula
+        )
 
     def symbol() -> str:
         return "vE"
@@ -180,40 +124,26 @@ class OrEliminationRule(Rule):
     def number_of_lines() -> int:
         return 5
 
-class CPRule(Rule):
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
-    ) -> bool:
-        expected_dependencies = list()
-        for line in self._lines:
-            expected_dependencies.extend(line.dependencies)
-
-        expected_dependencies = list(filter(
-            lambda l: (l is not self._lines[0]),
-            expected_dependencies
-        ))
-
-        if not self._same_set(expected_dependencies, dependencies):
-            return False
-
-        if current_line.formula.type != FormulaType.conditional_type:
-            return False
-
-        if not self._lines[0].is_assumption():
-            return False
+    def line_types() -> Tuple[Optional[FormulaType], ...]:
+        return (FormulaType.or_type, None, None, None, None)
 
-        if self._lines[0] not in self._lines[1].dependencies:
-            return False
-
-        if self._lines[0].formula != current_line.formula.left:
-            return False
+class CPRule(Rule):
+    @staticmethod
+    def discharged_lines() -> Tuple[int, ...]:
+        return (0,)
 
-        if self._lines[1].formula != current_line.formula.right:
-            return False
+    @staticmethod
+    def subproofs() -> Tuple[Tuple[int, int], ...]:
+        return ((0, 1),)
 
-        return True
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        formula = view.node(line)
+        return (
+            view.type_value(formula) == _CONDITIONAL
+            and view.node(lines[0]) == view.left(formula)
+            and view.node(lines[1]) == view.right(formula)
+        )
 
     def symbol() -> str:
         return "CP"
@@ -221,29 +151,18 @@ class CPRule(Rule):
     def number_of_lines() -> int:
         return 2
 
-class ModusPonensRule(Rule):
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
-    ) -> bool:
-        expected_dependencies = list()
-        for line in self._lines:
-            expected_dependencies.extend(line.dependencies)
-
-        if not self._same_set(expected_dependencies, dependencies):
-            return False
-
-        if self._lines[0].formula.type != FormulaType.conditional_type:
-            return False
-
-        if self._lines[0].formula.left != self._lines[1].formula:
-            return False
-
-        if self._lines[0].formula.right != current_line.formula:
-            return False
+    def conclusion_type() -> FormulaType:
+        return FormulaType.conditional_type
 
-        return True
+class ModusPonensRule(Rule):
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        formula_0 = view.node(lines[0])
+        return (
+            view.type_value(formula_0) == _CONDITIONAL
+            and view.left(formula_0) == view.node(lines[1])
+            and view.right(formula_0) == view.node(line)
+        )
 
     def symbol() -> str:
         return "MP"
@@ -251,29 +170,18 @@ class ModusPonensRule(Rule):
     def number_of_lines() -> int:
         return 2
 
-class DNIRule(Rule):
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
-    ) -> bool:
-        expected_dependencies = list()
-        for line in self._lines:
-            expected_dependencies.extend(line.dependencies)
-
-        if not self._same_set(expected_dependencies, dependencies):
-            return False
+    def line_types() -> Tuple[Optional[FormulaType], ...]:
+        return (FormulaType.conditional_type, None)
 
-        if current_line.formula.type != FormulaType.not_type:
-            return False
-
-        if current_line.formula.inner.type != FormulaType.not_type:
-            return False
-
-        if self._lines[0].formula != current_line.formula.inner.inner:
-            return False
-
-        return True
+class DNIRule(Rule):
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        formula = view.node(line)
+        return (
+            view.type_value(formula) == _NOT
+            and view.type_value(view.inner(formula)) == _NOT
+            and view.node(lines[0]) == view.inner(view.inner(formula))
+        )
 
     def symbol() -> str:
         return "DNI"
@@ -281,29 +189,18 @@ class DNIRule(Rule):
     def number_of_lines() -> int:
         return 1
 
-class DNERule(Rule):
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
-    ) -> bool:
-        expected_dependencies = list()
-        for line in self._lines:
-            expected_dependencies.extend(line.dependencies)
-
-        if not self._same_set(expected_dependencies, dependencies):
-            return False
-
-        if self._lines[0].formula.type != FormulaType.not_type:
-            return False
-
-        if self._lines[0].formula.inner.type != FormulaType.not_type:
-            return False
+    def conclusion_type() -> FormulaType:
+        return FormulaType.not_type
 
-        if self._lines[0].formula.inner.inner != current_line.formula:
-            return False
-
-        return True
+class DNERule(Rule):
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        formula_0 = view.node(lines[0])
+        return (
+            view.type_value(formula_0) == _NOT
+            and view.type_value(view.inner(formula_0)) == _NOT
+            and view.inner(view.inner(formula_0)) == view.node(line)
+        )
 
     def symbol() -> str:
         return "DNE"
@@ -311,35 +208,22 @@ class DNERule(Rule):
     def number_of_lines() -> int:
         return 1
 
-class ModusTollensRule(Rule):
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
-    ) -> bool:
-        expected_dependencies = list()
-        for line in self._lines:
-            expected_dependencies.extend(line.dependencies)
-
-        if not self._same_set(expected_dependencies, dependencies):
-            return False
-
-        if self._lines[0].formula.type != FormulaType.conditional_type:
-            return False
-
-        if self._lines[1].formula.type != FormulaType.not_type:
-            return False
-
-        if current_line.formula.type != FormulaType.not_type:
-            return False
-
-        if self._lines[0].formula.right != self._lines[1].formula.inner:
-            return False
-
-        if self._lines[0].formula.left != current_line.formula.inner:
-            return False
+    def line_types() -> Tuple[Optional[FormulaType], ...]:
+        return (FormulaType.not_type,)
 
-        return True
+class ModusTollensRule(Rule):
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        formula_0 = view.node(lines[0])
+        formula_1 = view.node(lines[1])
+        formula = view.node(line)
+        return (
+            view.type_value(formula_0) == _CONDITIONAL
+            and view.type_value(formula_1) == _NOT
+            and view.type_value(formula) == _NOT
+            and view.right(formula_0) == view.inner(formula_1)
+            and view.left(formula_0) == view.inner(formula)
+        )
 
     def symbol() -> str:
         return "MT"
@@ -347,50 +231,77 @@ class ModusTollensRule(Rule):
     def number_of_lines() -> int:
         return 2
 
-class RAARule(Rule):
-    def _is_valid(
-        self,
-        dependencies: List[Line],
-        current_line: Line,
-    ) -> bool:
-        expected_dependencies = list()
-        for line in self._lines:
-            expected_dependencies.extend(line.dependencies)
-
-        expected_dependencies = list(filter(
-            lambda l: (l is not self._lines[0]),
-            expected_dependencies
-        ))
-
-        if not self._same_set(expected_dependencies, dependencies):
-            return False
+    def conclusion_type() -> FormulaType:
+        return FormulaType.not_type
 
-        if not self._lines[0].is_assumption():
-            return False
+    def line_types() -> Tuple[Optional[FormulaType], ...]:
+        return (FormulaType.conditional_type, FormulaType.not_type)
 
-        if self._lines[0] not in self._lines[1].dependencies:
-            return False
+class RAARule(Rule):
+    @staticmethod
+    def discharged_lines() -> Tuple[int, ...]:
+        return (0,)
 
-        if self._lines[1].formula.type != FormulaType.and_type:
-            return False
+    @staticmethod
+    def subproofs() -> Tuple[Tuple[int, int], ...]:
+        return ((0, 1),)
 
-        if self._lines[1].formula.right.type != FormulaType.not_type:
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        # The second line is a contradiction `X&~X`.
+        formula_1 = view.node(lines[1])
+        if view.type_value(formula_1) != _AND or view.type_value(view.right(formula_1)) != _NOT:
             return False
+        formula = view.node(line)
+        return (
+            view.left(formula_1) == view.inner(view.right(formula_1))
+            and view.type_value(formula) == _NOT
+            and view.node(lines[0]) == view.inner(formula)
+        )
 
-        if self._lines[1].formula.left != self._lines[1].formula.right.inner:
-            return False
+    def symbol() -> str:
+        return "RAA"
 
-        if current_line.formula.type != FormulaType.not_type:
-            return False
+    def number_of_lines() -> int:
+        return 2
 
-        if self._lines[0].formula != current_line.formula.inner:
-            return False
+    def conclusion_type() -> FormulaType:
+        return FormulaType.not_type
 
+    def line_types() -> Tuple[Optional[FormulaType], ...]:
+        return (None, FormulaType.and_type)
+
+class TautologicalConsequenceRule(Rule):
+    """
+    The formula follows truth-functionally from the formulas of the lines,
+    which is decided with a SAT solver (see `sat.ConsequenceChecker`).
+    The solver is shared by the lines of a proof through the proof cache,
+    so the formulas are encoded once and the learned clauses are reused.
+    """
+    @staticmethod
+    def is_derived() -> bool:
         return True
 
-    def symbol() -> str:
-        return "RAA"
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        return TautologicalConsequenceRule.is_valid_formulas(
+            [view.formula(view.node(l)) for l in lines],
+            view.formula(view.node(line)),
+            view.proof_cache,
+        )
 
-    def number_of_lines() -> int:
-        return 2
+    @staticmethod
+    def is_valid_formulas(line_formulas: List[Formula], formula: Formula, proof_cache: Dict) -> bool:
+        from .sat import ConsequenceChecker
+
+        checker: Optional[ConsequenceChecker] = proof_cache.get(ConsequenceChecker)
+        if checker is None:
+            checker = ConsequenceChecker()
+            proof_cache[ConsequenceChecker] = checker
+        return checker.follows(line_formulas, formula)
+
+    def symbol() -> str:
+        return "TF"
 
+    def number_of_lines() -> Optional[int]:
+        return None
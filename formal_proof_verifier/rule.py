@@ -1,7 +1,30 @@
-from typing import List, Self, Optional
+from __future__ import annotations
+# Imported with the package: `typing` only for type checkers, see `__init__`.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, Iterable, List, Self, Optional, Tuple
+    from .formula import Formula, FormulaType
 from abc import ABC, abstractmethod
+from . import metrics
 
 class Rule(ABC):
+    _are_rules_loaded: bool = False
+    # Rules by the main connective of the formula they justify,
+    # and their number of lines, see `Rule.candidates`.
+    _inference_index: Dict[Tuple[FormulaType, int], List[type]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        Rule._inference_index.clear()
+
+    @staticmethod
+    def _load_rules() -> None:
+        # The rule modules are only imported when the first rule is created,
+        # so importing the package does not pay for creating every rule class.
+        if not Rule._are_rules_loaded:
+            from . import propositional_rules, predicate_rules, equality_rules
+            Rule._are_rules_loaded = True
+
     @staticmethod
     def _find_subclass(symbol: str, cls) -> Optional[Self]:
         for subclass in cls.__subclasses__():
@@ -12,27 +35,94 @@ class Rule(ABC):
         return None
 
     @staticmethod
-    def create(symbol: str, lines: list) -> Self:
-        cls: Optional[Self] = Rule._find_subclass(symbol, Rule)
+    def _rule_classes(cls) -> List[type]:
+        rule_classes: List[type] = []
+        for subclass in cls.__subclasses__():
+            if subclass.symbol() is not None:
+                rule_classes.append(subclass)
+            rule_classes.extend(Rule._rule_classes(subclass))
+        return rule_classes
+
+    @staticmethod
+    def candidates(formula: Formula, line_formulas: List[Formula]) -> List[type]:
+        """
+        Returns the rules which could justify the formula from the line formulas,
+        judging only by the main connectives (formula types) of the formulas.
+        """
+        Rule._load_rules()
+        key: Tuple[FormulaType, int] = (formula.type, len(line_formulas))
+        candidates: Optional[List[type]] = Rule._inference_index.get(key)
+        if candidates is None:
+            candidates = [
+                cls for cls in Rule._rule_classes(Rule)
+                if not cls.is_derived()
+                and cls.conclusion_type() in (None, formula.type)
+                and cls.number_of_lines() in (None, len(line_formulas))
+            ]
+            Rule._inference_index[key] = candidates
+
+        def _has_line_types(cls) -> bool:
+            line_types: Optional[Tuple[Optional[FormulaType], ...]] = cls.line_types()
+            return line_types is None or all(
+                t is None or t == f.type
+                for t, f in zip(line_types, line_formulas)
+            )
+
+        return [cls for cls in candidates if _has_line_types(cls)]
+
+    @staticmethod
+    def infer(lines: list, current_line, proof_cache: Optional[Dict] = None) -> List[str]:
+        """
+        Returns the symbols of the rules which justify the current line from the lines.
+        The validity of the lines themselves is not checked.
+        """
+        return [
+            cls.symbol()
+            for cls in Rule.candidates(current_line.formula, [l.formula for l in lines])
+            if cls(lines, proof_cache)._is_valid(
+                dependencies=current_line.dependencies,
+                current_line=current_line,
+            )
+        ]
+
+    @staticmethod
+    def find(symbol: str) -> Optional[type]:
+        Rule._load_rules()
+        return Rule._find_subclass(symbol, Rule)
+
+    @staticmethod
+    def create(symbol: str, lines: list, proof_cache: Optional[Dict] = None) -> Self:
+        cls: Optional[Self] = Rule.find(symbol)
 
         if cls is None:
             raise RuntimeError(f"Error: rule '{symbol}' is invalid.")
         number_of_lines = cls.number_of_lines()
-        if number_of_lines != len(lines):
+        if number_of_lines is not None and number_of_lines != len(lines):
             raise RuntimeError(f"Error: rule '{symbol}' has invalid number of line numbers.")
 
-        return cls(lines)
+        return cls(lines, proof_cache)
 
     def __init__(
         self,
         lines: list,
+        proof_cache: Optional[Dict] = None,
     ):
-        self._lines = lines
+        self._lines: Tuple = tuple(lines)
+        # Shared by the rules of the lines of the same proof,
+        # for work which can be reused between lines (see `TautologicalConsequenceRule`).
+        self._proof_cache: Dict = proof_cache if proof_cache is not None else {}
+
+    @property
+    def lines(self) -> Tuple:
+        return self._lines
 
     def is_valid(
         self,
         current_line,
     ) -> bool:
+        counter: Optional[metrics.OperationCounter] = metrics.local.active
+        if counter is not None:
+            counter.add(metrics.LINE_VALIDATIONS, len(self._lines))
         if any((l is not current_line and not l.is_valid()) for l in self._lines):
             return False
         return self._is_valid(dependencies=current_line.dependencies, current_line=current_line)
@@ -40,6 +130,15 @@ class Rule(ABC):
     @staticmethod
     def _same_set(set_1: List, set_2: List):
         def _is_in(x, set: List):
+            counter: Optional[metrics.OperationCounter] = metrics.local.active
+            if counter is not None:
+                # The comparisons made by `any` (up to the first match).
+                for i, e in enumerate(set):
+                    if x is e:
+                        counter.add(metrics.DEPENDENCY_COMPARISONS, i + 1)
+                        return True
+                counter.add(metrics.DEPENDENCY_COMPARISONS, len(set))
+                return False
             return any(x is e for e in set)
 
         def _all_is_in(set_a: List, set_b: List):
@@ -51,20 +150,221 @@ class Rule(ABC):
     def is_assumption() -> bool:
         return False
 
+    @staticmethod
+    def is_derived() -> bool:
+        # Derived rules can justify lines of any shape, so they are never inferred.
+        return False
+
     @staticmethod
     def symbol() -> str:
         pass
 
     @staticmethod
-    def number_of_lines() -> int:
+    def number_of_lines() -> Optional[int]:
+        # `None` for any number of lines.
         pass
 
-    @abstractmethod
+    @staticmethod
+    def conclusion_type() -> Optional[FormulaType]:
+        # Main connective of the formula justified by the rule, `None` for any.
+        return None
+
+    @staticmethod
+    def line_types() -> Optional[Tuple[Optional[FormulaType], ...]]:
+        # Main connective of the formula of each line, `None` for any.
+        return None
+
+    @staticmethod
+    def is_self_dependent() -> bool:
+        # The line depends only on itself (a premise or an assumption).
+        return False
+
+    @staticmethod
+    def discharged_lines() -> Tuple[int, ...]:
+        # Positions of the lines which are assumptions discharged by the rule:
+        # the line does not depend on them.
+        return ()
+
+    @staticmethod
+    def subproofs() -> Tuple[Tuple[int, int], ...]:
+        # Positions of the discharged assumptions and of the lines
+        # which must depend on them.
+        return ()
+
+    @staticmethod
+    def is_valid_in(view: ProofView, line, lines: Tuple) -> bool:
+        # Check if the formula of the line is the consequence of the formulas
+        # of the lines, see `Rule.check`.
+        pass
+
+    @staticmethod
+    def check(rule_class, view: ProofView, line, lines: Tuple) -> bool:
+        """
+        Checks the line justified by the rule class from the lines,
+        in a view of the proof: the dependencies of the line, the assumptions
+        discharged by the rule, and then the formulas (see `is_valid_in`).
+        This is the check of both the lines and `ProofStore`.
+        """
+        if rule_class.is_self_dependent():
+            return view.is_self_dependent(line)
+
+        discharged: List = [lines[i] for i in rule_class.discharged_lines()]
+        if not view.has_dependencies(line, lines, discharged):
+            return False
+        for l in discharged:
+            if not view.is_assumption(l):
+                return False
+        for assumption, conclusion in rule_class.subproofs():
+            if lines[assumption] not in view.dependencies(lines[conclusion]):
+                return False
+
+        return rule_class.is_valid_in(view, line, lines)
+
     def _is_valid(
         self,
         dependencies: list,
         current_line,
     ) -> bool:
-        # Check if formula is the consequence,
-        # and check if the dependency formulas are the same.
+        return Rule.check(type(self), LineView(self._proof_cache), current_line, self._lines)
+
+class ProofView(ABC):
+    """
+    The lines of a proof and the nodes of their formulas, as checked by
+    the rules (see `Rule.check`). Nodes of equal formulas are equal.
+    """
+    def __init__(self, proof_cache: Dict):
+        # Shared by the rule checks of the proof, see `Rule`.
+        self.proof_cache: Dict = proof_cache
+
+    @abstractmethod
+    def is_self_dependent(self, line) -> bool:
         pass
+
+    @abstractmethod
+    def has_dependencies(self, line, lines: Tuple, discharged: List) -> bool:
+        # The line depends on the dependencies of the lines,
+        # without the discharged lines.
+        pass
+
+    @abstractmethod
+    def dependencies(self, line) -> Iterable:
+        pass
+
+    @abstractmethod
+    def is_assumption(self, line) -> bool:
+        pass
+
+    @abstractmethod
+    def node(self, line):
+        pass
+
+    @abstractmethod
+    def type_value(self, node) -> int:
+        # The value of the `FormulaType` of the node.
+        pass
+
+    @abstractmethod
+    def left(self, node):
+        pass
+
+    @abstractmethod
+    def right(self, node):
+        pass
+
+    @abstractmethod
+    def inner(self, node):
+        pass
+
+    @abstractmethod
+    def formula(self, node) -> Formula:
+        pass
+
+class LineView(ProofView):
+    """
+    View of `Line` objects, whose nodes are their `Formula` objects.
+    """
+    def is_self_dependent(self, line) -> bool:
+        dependencies: Tuple = line.dependencies
+        return len(dependencies) == 1 and dependencies[0] is line
+
+    def has_dependencies(self, line, lines: Tuple, discharged: List) -> bool:
+        expected_dependencies: List = []
+        for l in lines:
+            expected_dependencies.extend(l.dependencies)
+        if len(discharged) != 0:
+            expected_dependencies = [
+                l for l in expected_dependencies
+                if not any(l is d for d in discharged)
+            ]
+        return Rule._same_set(expected_dependencies, line.dependencies)
+
+    def dependencies(self, line) -> Tuple:
+        return line.dependencies
+
+    def is_assumption(self, line) -> bool:
+        return line.is_assumption()
+
+    def node(self, line) -> Formula:
+        return line.formula
+
+    def type_value(self, node: Formula) -> int:
+        # `_value_` is a plain attribute, unlike `value`.
+        return node._type._value_
+
+    def left(self, node: Formula) -> Optional[Formula]:
+        return node._left
+
+    def right(self, node: Formula) -> Optional[Formula]:
+        return node._right
+
+    def inner(self, node: Formula) -> Optional[Formula]:
+        return node._inner
+
+    def formula(self, node: Formula) -> Formula:
+        return node
+
+class InferredRule(Rule):
+    """
+    Rule of a line whose rule symbol is missing or invalid.
+    The line is valid if any rule justifies it, see `Rule.infer`.
+    """
+    def __init__(
+        self,
+        lines: list,
+        proof_cache: Optional[Dict] = None,
+    ):
+        super().__init__(lines, proof_cache)
+        self._symbols: Optional[List[str]] = None
+
+    def symbols(self, current_line) -> List[str]:
+        if self._symbols is None:
+            symbols: List[str] = Rule.infer(self._lines, current_line, self._proof_cache)
+            # A line justified as a premise is also justified as an assumption,
+            # and is taken as a premise, see `is_assumption`.
+            if "P" in symbols and "A" in symbols:
+                symbols.remove("A")
+            self._symbols = symbols
+        return self._symbols
+
+    @staticmethod
+    def is_assumption() -> bool:
+        # An inferred line is never an assumption: a line which could be one
+        # could also be a premise, which takes precedence, so that a rule
+        # discharging assumptions cannot discharge a premise. This does not
+        # depend on whether the line was validated first.
+        return False
+
+    def _is_valid(
+        self,
+        dependencies: list,
+        current_line,
+    ) -> bool:
+        return len(self.symbols(current_line)) != 0
+
+    @staticmethod
+    def symbol() -> Optional[str]:
+        return None
+
+    @staticmethod
+    def number_of_lines() -> Optional[int]:
+        return None
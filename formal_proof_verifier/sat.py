@@ -0,0 +1,342 @@
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from .formula import Formula, FormulaType
+
+class Solver:
+    """
+    Incremental CDCL SAT solver with two watched literals per clause,
+    first unique implication point clause learning and activity-based branching.
+    Variables are positive integers, literals are nonzero integers
+    (`-v` is the negation of `v`), as in the DIMACS format.
+    Clauses can be added between calls of `solve`, and `solve` can be called
+    with assumptions. The learned clauses follow from the added clauses alone,
+    so they are kept and reused by the later calls.
+    """
+    def __init__(self):
+        # Indexed by variable, index 0 is unused.
+        self._assignment: List[int] = [0]
+        self._levels: List[int] = [0]
+        self._reasons: List[Optional[int]] = [None]
+        self._activity: List[float] = [0.0]
+
+        self._clauses: List[List[int]] = []
+        self._watches: Dict[int, List[int]] = {}
+
+        self._trail: List[int] = []
+        self._trail_limits: List[int] = []
+        self._propagated: int = 0
+
+        self._activity_increment: float = 1.0
+        self._is_inconsistent: bool = False
+        self._model: Optional[Dict[int, bool]] = None
+
+    @property
+    def number_of_variables(self) -> int:
+        return len(self._assignment) - 1
+
+    @property
+    def number_of_clauses(self) -> int:
+        return len(self._clauses)
+
+    @property
+    def model(self) -> Optional[Dict[int, bool]]:
+        # The satisfying assignment found by the last successful `solve`.
+        return self._model
+
+    def new_variable(self) -> int:
+        self._assignment.append(0)
+        self._levels.append(0)
+        self._reasons.append(None)
+        self._activity.append(0.0)
+        variable: int = len(self._assignment) - 1
+        self._watches[variable] = []
+        self._watches[-variable] = []
+        return variable
+
+    def _value(self, literal: int) -> int:
+        value: int = self._assignment[abs(literal)]
+        return value if literal > 0 else -value
+
+    def _assign(self, literal: int, reason: Optional[int]) -> None:
+        variable: int = abs(literal)
+        self._assignment[variable] = 1 if literal > 0 else -1
+        self._levels[variable] = len(self._trail_limits)
+        self._reasons[variable] = reason
+        self._trail.append(literal)
+
+    def _backtrack(self, level: int) -> None:
+        if len(self._trail_limits) > level:
+            limit: int = self._trail_limits[level]
+            for literal in self._trail[limit:]:
+                variable: int = abs(literal)
+                self._assignment[variable] = 0
+                self._reasons[variable] = None
+            del self._trail[limit:]
+            del self._trail_limits[level:]
+            self._propagated = min(self._propagated, limit)
+
+    def add_clause(self, literals: List[int]) -> None:
+        """
+        Adds a clause. Must not be called during `solve`.
+        """
+        if self._is_inconsistent:
+            return
+
+        clause: List[int] = []
+        for literal in literals:
+            value: int = self._value(literal)
+            if value == 1 or -literal in clause:
+                # Already satisfied at level 0, or a tautology.
+                return
+            elif value == 0 and literal not in clause:
+                clause.append(literal)
+
+        if len(clause) == 0:
+            self._is_inconsistent = True
+        elif len(clause) == 1:
+            self._assign(clause[0], None)
+            if self._propagate() is not None:
+                self._is_inconsistent = True
+        else:
+            self._add_watched_clause(clause)
+
+    def _add_watched_clause(self, clause: List[int]) -> int:
+        index: int = len(self._clauses)
+        self._clauses.append(clause)
+        self._watches[clause[0]].append(index)
+        self._watches[clause[1]].append(index)
+        return index
+
+    def _propagate(self) -> Optional[int]:
+        """
+        Unit propagation. Returns the index of a conflicting clause, if there is one.
+        The first literal of a clause which is the reason of an assignment
+        is the assigned literal.
+        """
+        while self._propagated < len(self._trail):
+            false_literal: int = -self._trail[self._propagated]
+            self._propagated += 1
+
+            watching: List[int] = self._watches[false_literal]
+            still_watching: List[int] = []
+            i: int = 0
+            while i < len(watching):
+                index: int = watching[i]
+                i += 1
+                clause: List[int] = self._clauses[index]
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+
+                if self._value(clause[0]) == 1:
+                    still_watching.append(index)
+                    continue
+
+                for k in range(2, len(clause)):
+                    if self._value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self._watches[clause[1]].append(index)
+                        break
+                else:
+                    still_watching.append(index)
+                    if self._value(clause[0]) == -1:
+                        still_watching.extend(watching[i:])
+                        self._watches[false_literal] = still_watching
+                        return index
+                    self._assign(clause[0], index)
+
+            self._watches[false_literal] = still_watching
+        return None
+
+    def _bump(self, variable: int) -> None:
+        self._activity[variable] += self._activity_increment
+        if self._activity[variable] > 1e100:
+            self._activity = [a * 1e-100 for a in self._activity]
+            self._activity_increment *= 1e-100
+
+    def _analyze(self, conflict: int) -> Tuple[List[int], int]:
+        """
+        Derives the first unique implication point clause of the conflict.
+        Returns the learned clause, whose first literal is asserted
+        after backtracking, and the level to backtrack to.
+        """
+        level: int = len(self._trail_limits)
+        seen: List[bool] = [False] * len(self._assignment)
+        learned: List[int] = [0]
+        counter: int = 0
+        literal: Optional[int] = None
+        clause: List[int] = self._clauses[conflict]
+        index: int = len(self._trail) - 1
+
+        while True:
+            for q in (clause if literal is None else clause[1:]):
+                variable: int = abs(q)
+                if not seen[variable] and self._levels[variable] > 0:
+                    seen[variable] = True
+                    self._bump(variable)
+                    if self._levels[variable] == level:
+                        counter += 1
+                    else:
+                        learned.append(q)
+
+            while not seen[abs(self._trail[index])]:
+                index -= 1
+            literal = self._trail[index]
+            index -= 1
+            seen[abs(literal)] = False
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self._clauses[self._reasons[abs(literal)]]
+
+        learned[0] = -literal
+        self._activity_increment *= 1.05
+
+        if len(learned) == 1:
+            return learned, 0
+        # The literal of the highest level is watched next to the asserted literal.
+        highest: int = max(range(1, len(learned)), key=lambda k: self._levels[abs(learned[k])])
+        learned[1], learned[highest] = learned[highest], learned[1]
+        return learned, self._levels[abs(learned[1])]
+
+    def _pick_branching_variable(self) -> Optional[int]:
+        best: Optional[int] = None
+        for variable in range(1, len(self._assignment)):
+            if self._assignment[variable] == 0 and (
+                best is None or self._activity[variable] > self._activity[best]
+            ):
+                best = variable
+        return best
+
+    def solve(self, assumptions: Optional[List[int]] = None) -> bool:
+        """
+        Returns whether the clauses are satisfiable with the assumptions (literals) true.
+        """
+        if assumptions is None:
+            assumptions = []
+        self._model = None
+        if self._is_inconsistent:
+            return False
+
+        try:
+            while True:
+                conflict: Optional[int] = self._propagate()
+                if conflict is not None:
+                    if len(self._trail_limits) == 0:
+                        self._is_inconsistent = True
+                        return False
+                    learned, level = self._analyze(conflict)
+                    self._backtrack(level)
+                    if len(learned) == 1:
+                        self._assign(learned[0], None)
+                    else:
+                        self._assign(learned[0], self._add_watched_clause(learned))
+                    continue
+
+                level: int = len(self._trail_limits)
+                if level < len(assumptions):
+                    assumption: int = assumptions[level]
+                    value: int = self._value(assumption)
+                    if value == -1:
+                        return False
+                    self._trail_limits.append(len(self._trail))
+                    if value == 0:
+                        self._assign(assumption, None)
+                    continue
+
+                variable: Optional[int] = self._pick_branching_variable()
+                if variable is None:
+                    self._model = {
+                        v: self._assignment[v] == 1
+                        for v in range(1, len(self._assignment))
+                    }
+                    return True
+                self._trail_limits.append(len(self._trail))
+                self._assign(-variable, None)
+        finally:
+            self._backtrack(0)
+
+class TseitinEncoder:
+    """
+    Encodes formulas into the clauses of a solver with the Tseitin transformation.
+    Each connective gets a variable equivalent to the subformula,
+    and negation is the negated literal.
+    Predicates and quantified formulas are treated as atoms.
+    Structurally equal subformulas get the same literal,
+    so repeated formulas are encoded only once.
+    """
+    def __init__(self, solver: Solver):
+        self._solver: Solver = solver
+        self._literals: Dict[Tuple, int] = {}
+
+    def _literal(self, key: Tuple) -> Tuple[int, bool]:
+        literal: Optional[int] = self._literals.get(key)
+        if literal is None:
+            literal = self._solver.new_variable()
+            self._literals[key] = literal
+            return literal, True
+        return literal, False
+
+    def encode(self, formula: Formula) -> int:
+        """
+        Returns the literal equivalent to the formula.
+        """
+        literals: Dict[int, int] = {}
+        stack: List[Formula] = [formula]
+        while len(stack) != 0:
+            f: Formula = stack[-1]
+            children: List[Formula] = []
+            if f.type in (FormulaType.and_type, FormulaType.or_type, FormulaType.conditional_type):
+                children = [f.left, f.right]
+            elif f.type == FormulaType.not_type:
+                children = [f.inner]
+            children = [c for c in children if id(c) not in literals]
+            if len(children) != 0:
+                stack.extend(children)
+                continue
+            stack.pop()
+
+            if f.type == FormulaType.not_type:
+                literals[id(f)] = -literals[id(f.inner)]
+            elif f.type in (FormulaType.and_type, FormulaType.or_type, FormulaType.conditional_type):
+                a: int = literals[id(f.left)]
+                b: int = literals[id(f.right)]
+                v, is_new = self._literal((f.type, a, b))
+                if is_new:
+                    if f.type == FormulaType.and_type:
+                        clauses = [[-v, a], [-v, b], [v, -a, -b]]
+                    elif f.type == FormulaType.or_type:
+                        clauses = [[-v, a, b], [v, -a], [v, -b]]
+                    else:
+                        clauses = [[-v, -a, b], [v, a], [v, -b]]
+                    for clause in clauses:
+                        self._solver.add_clause(clause)
+                literals[id(f)] = v
+            elif f.type == FormulaType.atomic_type:
+                literals[id(f)] = self._literal((f.type, f.atom))[0]
+            else:
+                literals[id(f)] = self._literal((FormulaType.atomic_type, str(f)))[0]
+        return literals[id(formula)]
+
+class ConsequenceChecker:
+    """
+    Decides whether a formula follows truth-functionally from other formulas.
+    The encoded formulas, the learned clauses and the results are kept,
+    so repeated checks over the same formulas reuse the earlier work.
+    """
+    def __init__(self):
+        self._solver: Solver = Solver()
+        self._encoder: TseitinEncoder = TseitinEncoder(self._solver)
+        self._results: Dict[Tuple[FrozenSet[int], int], bool] = {}
+
+    @property
+    def solver(self) -> Solver:
+        return self._solver
+
+    def follows(self, premises: List[Formula], conclusion: Formula) -> bool:
+        premise_literals: List[int] = [self._encoder.encode(p) for p in premises]
+        conclusion_literal: int = self._encoder.encode(conclusion)
+        key: Tuple[FrozenSet[int], int] = (frozenset(premise_literals), conclusion_literal)
+        result: Optional[bool] = self._results.get(key)
+        if result is None:
+            result = not self._solver.solve(premise_literals + [-conclusion_literal])
+            self._results[key] = result
+        return result
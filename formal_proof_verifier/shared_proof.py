@@ -0,0 +1,213 @@
+import os
+import struct
+from array import array
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional, Tuple, Union
+from .compiled_proof import FORMULA_TABLE_ARRAYS, PROOF_STORE_ARRAYS
+from .proof_store import FormulaTable, ProofStore
+
+# Layout of a proof store (with its formula table) in shared memory,
+# in which the arrays are used in place by the processes attaching to it:
+#
+#   header:      magic (4 bytes), version (u16), number of arrays (u16)
+#   descriptors: for each array, its typecode (1 byte, then 7 bytes of
+#                padding), offset (u64) and length (u64), in the order of
+#                the string offsets, `FORMULA_TABLE_ARRAYS` and
+#                `PROOF_STORE_ARRAYS`, and then the offset (u64) and length
+#                (u64) of the UTF-8 encodings of the strings
+#   data:        the items of the arrays (in the byte order of the machine),
+#                each aligned to 8 bytes, and the encodings of the strings
+MAGIC: bytes = b"FPVS"
+VERSION: int = 1
+
+_HEADER = struct.Struct("<4sHH")
+_DESCRIPTOR = struct.Struct("<c7xQQ")
+_BLOB = struct.Struct("<QQ")
+_ALIGNMENT: int = 8
+_ARRAY_NAMES: Tuple[str, ...] = ("_string_offsets",) + FORMULA_TABLE_ARRAYS + PROOF_STORE_ARRAYS
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+class _SharedStrings:
+    """
+    The strings of a shared formula table, decoded when they are used.
+    """
+    __slots__ = ("_offsets", "_encoded_strings")
+
+    def __init__(self, offsets: memoryview, encoded_strings: memoryview):
+        self._offsets: memoryview = offsets
+        self._encoded_strings: memoryview = encoded_strings
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if not (0 <= index < len(self._offsets) - 1):
+            raise IndexError(index)
+        return str(self._encoded_strings[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+class SharedProof:
+    """
+    A proof store and its formula table, published in shared memory
+    by `publish`, so that other processes `attach` to it by its name
+    and verify against it without copying or deserialising it
+    (the strings of the formula table are decoded when they are used).
+    The attached store and formula table are read-only.
+    The publisher owns the shared memory: it must `unlink` it when the
+    other processes are done, and every process must `close` it.
+    """
+    def __init__(self, shared_memory: SharedMemory, is_owner: bool):
+        self._shared_memory: SharedMemory = shared_memory
+        self._is_owner: bool = is_owner
+        # The views of the shared memory, which must be released to close it.
+        self._views: List[memoryview] = []
+        try:
+            self._store: ProofStore = self._attach_store()
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def name(self) -> str:
+        return self._shared_memory.name
+
+    @property
+    def store(self) -> ProofStore:
+        return self._store
+
+    @property
+    def formula_table(self) -> FormulaTable:
+        return self._store.formula_table
+
+    @staticmethod
+    def publish(proof: Union[ProofStore, FormulaTable], name: Optional[str] = None) -> "SharedProof":
+        """
+        Copies a proof store (or a formula table alone) into a new
+        shared memory block, with the given or a generated name.
+        """
+        store: ProofStore = proof if isinstance(proof, ProofStore) else ProofStore(proof)
+        formula_table: FormulaTable = store.formula_table
+        encoded_strings: List[bytes] = [s.encode("utf-8") for s in formula_table._strings]
+        string_offsets: array = array("I", [0])
+        for encoded_string in encoded_strings:
+            string_offsets.append(string_offsets[-1] + len(encoded_string))
+        arrays: List[array] = (
+            [string_offsets]
+            + [getattr(formula_table, n) for n in FORMULA_TABLE_ARRAYS]
+            + [getattr(store, n) for n in PROOF_STORE_ARRAYS]
+        )
+
+        offset: int = _HEADER.size + len(arrays) * _DESCRIPTOR.size + _BLOB.size
+        offsets: List[int] = []
+        for values in arrays:
+            offset = _align(offset)
+            offsets.append(offset)
+            offset += len(values) * values.itemsize
+        blob_offset: int = offset
+        size: int = blob_offset + string_offsets[-1]
+
+        shared_memory: SharedMemory = SharedMemory(name=name, create=True, size=max(size, 1))
+        try:
+            buffer: memoryview = shared_memory.buf
+            _HEADER.pack_into(buffer, 0, MAGIC, VERSION, len(arrays))
+            descriptor_offset: int = _HEADER.size
+            for values, offset in zip(arrays, offsets):
+                _DESCRIPTOR.pack_into(buffer, descriptor_offset, values.typecode.encode(), offset, len(values))
+                descriptor_offset += _DESCRIPTOR.size
+                buffer[offset:offset + len(values) * values.itemsize] = values.tobytes()
+            _BLOB.pack_into(buffer, descriptor_offset, blob_offset, string_offsets[-1])
+            buffer[blob_offset:size] = b"".join(encoded_strings)
+        except BaseException:
+            shared_memory.close()
+            shared_memory.unlink()
+            raise
+        return SharedProof(shared_memory, is_owner=True)
+
+    @staticmethod
+    def attach(name: str) -> "SharedProof":
+        """
+        Attaches to a proof published by another process.
+        """
+        # The publisher tracks (and unlinks) the shared memory,
+        # not the processes attaching to it.
+        try:
+            shared_memory: SharedMemory = SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13, attaching registers the shared memory with the
+            # resource tracker of the process, which unlinks it when the process
+            # exits, so it is unregistered. (A child of the publisher shares its
+            # tracker, so this also unregisters it for the publisher, see `unlink`.)
+            # Shared memory is only tracked on POSIX systems.
+            shared_memory = SharedMemory(name=name)
+            if os.name == "posix":
+                resource_tracker.unregister(shared_memory._name, "shared_memory")
+        return SharedProof(shared_memory, is_owner=False)
+
+    def _view(self, offset: int, length: int, typecode: str) -> memoryview:
+        view: memoryview = self._shared_memory.buf[offset:offset + length * array(typecode).itemsize]
+        self._views.append(view)
+        view = view.toreadonly().cast(typecode)
+        self._views.append(view)
+        return view
+
+    def _attach_store(self) -> ProofStore:
+        buffer: memoryview = self._shared_memory.buf
+        if len(buffer) < _HEADER.size:
+            raise RuntimeError("Error: not a shared proof.")
+        magic, version, number_of_arrays = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise RuntimeError("Error: not a shared proof.")
+        if version != VERSION:
+            raise RuntimeError(f"Error: shared proof has version {version}, expected {VERSION}.")
+        if number_of_arrays != len(_ARRAY_NAMES):
+            raise RuntimeError("Error: shared proof has an invalid layout.")
+
+        views: List[memoryview] = []
+        descriptor_offset: int = _HEADER.size
+        for _ in range(number_of_arrays):
+            typecode, offset, length = _DESCRIPTOR.unpack_from(buffer, descriptor_offset)
+            descriptor_offset += _DESCRIPTOR.size
+            views.append(self._view(offset, length, typecode.decode()))
+        blob_offset, blob_length = _BLOB.unpack_from(buffer, descriptor_offset)
+
+        formula_table: FormulaTable = FormulaTable()
+        formula_table._strings = _SharedStrings(views[0], self._view(blob_offset, blob_length, "B"))
+        # The indices are only needed to add to the table, which is read-only.
+        formula_table._string_ids = None
+        formula_table._node_ids = None
+        store: ProofStore = ProofStore(formula_table)
+        for name, view in zip(_ARRAY_NAMES[1:], views[1:]):
+            setattr(formula_table if name in FORMULA_TABLE_ARRAYS else store, name, view)
+        return store
+
+    def close(self) -> None:
+        """
+        Detaches from the shared memory. The store can no longer be used.
+        """
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._shared_memory.close()
+
+    def unlink(self) -> None:
+        """
+        Frees the shared memory, once every process has closed it.
+        Only the publisher can unlink it.
+        """
+        if not self._is_owner:
+            raise RuntimeError("Error: only the publisher of a shared proof can unlink it.")
+        # Registered again, in case a child attaching to it before Python 3.13
+        # unregistered it from the shared tracker, as `unlink` unregisters it.
+        if os.name == "posix":
+            resource_tracker.register(self._shared_memory._name, "shared_memory")
+        self._shared_memory.unlink()
+
+    def __enter__(self) -> "SharedProof":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+        if self._is_owner:
+            self.unlink()
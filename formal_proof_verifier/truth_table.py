@@ -0,0 +1,159 @@
+from typing import Dict, List, Optional, Tuple
+from .formula import Formula, FormulaType
+from .line import Line
+from . import metrics
+
+# The valuations are evaluated in blocks, in which the first (at most)
+# `BLOCK_ATOMS` atoms take every combination of truth values,
+# and the rest of the atoms are constant.
+# Every formula is evaluated on a whole block at once as a packed bit-vector
+# (a Python integer), where bit `j` is the truth value under the `j`-th valuation.
+BLOCK_ATOMS: int = 16
+
+_PROPOSITIONAL_TYPES = (
+    FormulaType.atomic_type,
+    FormulaType.and_type,
+    FormulaType.or_type,
+    FormulaType.conditional_type,
+    FormulaType.not_type,
+)
+
+def is_propositional(formula: Formula) -> bool:
+    stack: List[Formula] = [formula]
+    while len(stack) != 0:
+        f: Formula = stack.pop()
+        if f.type not in _PROPOSITIONAL_TYPES:
+            return False
+        stack.extend(c for c in (f.left, f.right, f.inner) if c is not None)
+    return True
+
+def _compile(
+    formulas: List[Formula],
+) -> Tuple[List[str], List[Tuple[FormulaType, int, int]], List[int]]:
+    """
+    Compiles the formulas into a list of atoms, and a list of instructions
+    in post-order, where each instruction is the formula type and the indices
+    of the operands (an atom index for atomic formulas).
+    Returns the atoms, the instructions and the instruction index of each formula.
+    """
+    atoms: List[str] = []
+    atom_indices: Dict[str, int] = {}
+    instructions: List[Tuple[FormulaType, int, int]] = []
+    # Structurally equal subformulas are evaluated only once.
+    instruction_indices: Dict[Tuple[FormulaType, int, int], int] = {}
+    formula_indices: Dict[int, int] = {}
+
+    def _add(instruction: Tuple[FormulaType, int, int]) -> int:
+        index: Optional[int] = instruction_indices.get(instruction)
+        if index is None:
+            index = len(instructions)
+            instructions.append(instruction)
+            instruction_indices[instruction] = index
+        return index
+
+    for formula in formulas:
+        stack: List[Formula] = [formula]
+        while len(stack) != 0:
+            f: Formula = stack[-1]
+            if f.type not in _PROPOSITIONAL_TYPES:
+                raise RuntimeError(f"Error: formula '{f}' is not propositional.")
+            children: List[Formula] = [
+                c for c in (f.left, f.right, f.inner)
+                if c is not None and id(c) not in formula_indices
+            ]
+            if len(children) != 0:
+                # Reversed, so that the atoms are in the order of their appearance.
+                stack.extend(reversed(children))
+                continue
+            stack.pop()
+
+            if f.type == FormulaType.atomic_type:
+                if f.atom not in atom_indices:
+                    atom_indices[f.atom] = len(atoms)
+                    atoms.append(f.atom)
+                instruction = (f.type, atom_indices[f.atom], -1)
+            elif f.type == FormulaType.not_type:
+                instruction = (f.type, formula_indices[id(f.inner)], -1)
+            else:
+                instruction = (f.type, formula_indices[id(f.left)], formula_indices[id(f.right)])
+            formula_indices[id(f)] = _add(instruction)
+
+    return atoms, instructions, [formula_indices[id(f)] for f in formulas]
+
+def _block_columns(number_of_atoms: int) -> Tuple[List[int], int]:
+    """
+    Returns the bit-vectors of the atoms varying inside a block, and the mask of the block.
+    Bit `j` of the bit-vector of atom `k` is bit `k` of `j`.
+    """
+    size: int = 1 << number_of_atoms
+    mask: int = (1 << size) - 1
+    columns: List[int] = []
+    for k in range(number_of_atoms):
+        half: int = 1 << k
+        column: int = ((1 << half) - 1) << half
+        width: int = 2 * half
+        while width < size:
+            column |= column << width
+            width *= 2
+        columns.append(column)
+    return columns, mask
+
+def find_countermodel(premises: List[Formula], conclusion: Formula) -> Optional[Dict[str, bool]]:
+    """
+    Checks the sequent (premises ⊢ conclusion) with a truth table.
+    Returns a valuation of the atoms in which every premise is true
+    and the conclusion is false, or `None` if the sequent is valid.
+    """
+    atoms, instructions, roots = _compile(premises + [conclusion])
+    premise_roots: List[int] = roots[:-1]
+    conclusion_root: int = roots[-1]
+
+    block_atoms: int = min(len(atoms), BLOCK_ATOMS)
+    columns, mask = _block_columns(block_atoms)
+    # Counted per block, so that a budget (see `budget.BudgetCounter`)
+    # can interrupt the blocks of a sequent with many atoms.
+    counter: Optional[metrics.OperationCounter] = metrics.local.active
+
+    for block in range(1 << (len(atoms) - block_atoms)):
+        if counter is not None:
+            counter.add(metrics.EVALUATED_NODES, len(instructions))
+        def _atom(k: int) -> int:
+            if k < block_atoms:
+                return columns[k]
+            else:
+                return mask if (block >> (k - block_atoms)) & 1 else 0
+
+        values: List[int] = []
+        for type, a, b in instructions:
+            if type == FormulaType.atomic_type:
+                values.append(_atom(a))
+            elif type == FormulaType.and_type:
+                values.append(values[a] & values[b])
+            elif type == FormulaType.or_type:
+                values.append(values[a] | values[b])
+            elif type == FormulaType.conditional_type:
+                values.append((values[a] ^ mask) | values[b])
+            else:
+                values.append(values[a] ^ mask)
+
+        counterexamples: int = values[conclusion_root] ^ mask
+        for root in premise_roots:
+            counterexamples &= values[root]
+
+        if counterexamples != 0:
+            j: int = (counterexamples & -counterexamples).bit_length() - 1
+            valuation: int = (block << block_atoms) | j
+            return {atom: (valuation >> k) & 1 == 1 for k, atom in enumerate(atoms)}
+
+    return None
+
+def proof_sequent(lines: List[Tuple[str, Line]]) -> Tuple[List[Formula], Formula]:
+    """
+    Returns the sequent claimed by the proof: the formulas of the dependencies
+    of the last line, and the formula of the last line.
+    """
+    lines = list(lines)
+    if len(lines) == 0:
+        raise RuntimeError("Error: empty proof.")
+    last_line: Line = lines[-1][1]
+    return [l.formula for l in last_line.dependencies], last_line.formula
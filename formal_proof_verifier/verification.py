@@ -0,0 +1,207 @@
+from typing import Dict, List, Optional
+from .budget import Budget, BudgetCounter, BudgetExceeded, check_formula, check_lines
+from .formal_proof_verifier import create_lines, split_line
+
+class LineReport:
+    """
+    The validity of a line, or `None` if the line is dead:
+    it was not checked, because the target line does not depend on it.
+    """
+    def __init__(self, line_str: str, is_valid: Optional[bool]):
+        self._line_str: str = line_str
+        self._is_valid: Optional[bool] = is_valid
+
+    @property
+    def line_str(self) -> str:
+        return self._line_str
+
+    @property
+    def is_valid(self) -> Optional[bool]:
+        return self._is_valid
+
+    @property
+    def is_dead(self) -> bool:
+        return self._is_valid is None
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"line": self.line_str, "valid": self.is_valid, "dead": self.is_dead}
+
+class ProofReport:
+    """
+    The reports of the lines, or the error which stopped verification.
+    If a limit of the budget was exceeded, `budget_exceeded` is its name,
+    and the lines are those verified before.
+    """
+    def __init__(
+        self,
+        lines: List[LineReport],
+        error: Optional[str] = None,
+        budget_exceeded: Optional[str] = None,
+    ):
+        self._lines: List[LineReport] = lines
+        self._error: Optional[str] = error
+        self._budget_exceeded: Optional[str] = budget_exceeded
+
+    @property
+    def lines(self) -> List[LineReport]:
+        return self._lines
+
+    @property
+    def error(self) -> Optional[str]:
+        return self._error
+
+    @property
+    def budget_exceeded(self) -> Optional[str]:
+        return self._budget_exceeded
+
+    @property
+    def is_valid(self) -> bool:
+        return self.error is None and all(line.is_valid is not False for line in self.lines)
+
+    def invalid_lines(self) -> List[LineReport]:
+        return [line for line in self.lines if line.is_valid is False]
+
+    def dead_lines(self) -> List[LineReport]:
+        return [line for line in self.lines if line.is_dead]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "valid": self.is_valid,
+            "error": self.error,
+            "budget_exceeded": self.budget_exceeded,
+            "lines": [line.to_dict() for line in self.lines],
+        }
+
+def _cone(lines_str: List[str], target: str) -> List[bool]:
+    """
+    Returns whether each line is in the backward cone of the target line:
+    the target line, and the lines cited by or depended on by a line in the cone.
+    Only the lines are split, the formulas are not parsed.
+    Line numbers which do not exist are left to `create_lines` to report.
+    """
+    indices: Dict[str, int] = {}
+    references: List[List[str]] = []
+    for i, line_str in enumerate(lines_str):
+        dependencies_str, line_number_str, _, rule_lines_str, _ = split_line(line_str)
+        if line_number_str in indices:
+            raise RuntimeError(f"Error: Line number '{line_number_str}' already exists.")
+        indices[line_number_str] = i
+        references.append(rule_lines_str + dependencies_str)
+
+    if target not in indices:
+        raise RuntimeError(f"Error: target line number '{target}' does not exist.")
+
+    is_in_cone: List[bool] = [False] * len(lines_str)
+    is_in_cone[indices[target]] = True
+    stack: List[int] = [indices[target]]
+    while len(stack) != 0:
+        for l in references[stack.pop()]:
+            i: Optional[int] = indices.get(l)
+            if i is not None and not is_in_cone[i]:
+                is_in_cone[i] = True
+                stack.append(i)
+    return is_in_cone
+
+def verify_text(
+    text: str,
+    fail_fast: bool = False,
+    check_sequent: bool = False,
+    target: Optional[str] = None,
+    budget: Optional[Budget] = None,
+) -> ProofReport:
+    """
+    Parses and verifies every line of the proof in `text`.
+    Structural errors (invalid lines, unknown rules or line numbers)
+    are reported as the error of the report instead of being raised.
+    With a `target` line number, only the lines in its backward cone
+    (see `_cone`) are parsed and verified, and the other lines are dead.
+    With `fail_fast`, verification stops at the first invalid line.
+    With `check_sequent`, the sequent claimed by the proof is checked first
+    (with a truth table, or by searching small finite models if it is not
+    propositional), and the lines are not verified if it has a counterexample.
+    With a `budget`, verification stops when a limit is exceeded,
+    and the report has the lines verified before and the exceeded limit.
+    """
+    line_reports: List[LineReport] = []
+    if budget is None:
+        return _verify_text(text, fail_fast, check_sequent, target, None, None, line_reports)
+    with BudgetCounter(budget) as counter:
+        try:
+            return _verify_text(text, fail_fast, check_sequent, target, budget, counter, line_reports)
+        except BudgetExceeded as error:
+            return ProofReport(line_reports, error=str(error), budget_exceeded=error.limit)
+
+def _verify_text(
+    text: str,
+    fail_fast: bool,
+    check_sequent: bool,
+    target: Optional[str],
+    budget: Optional[Budget],
+    counter: Optional[BudgetCounter],
+    line_reports: List[LineReport],
+) -> ProofReport:
+    lines_str: List[str] = [
+        line_str for line_str in text.split("\n")
+        if line_str.split(sep="#", maxsplit=1)[0].strip(" ") != ""
+    ]
+    try:
+        if budget is not None:
+            check_lines(budget, len(lines_str))
+        is_in_cone: List[bool] = (
+            [True] * len(lines_str) if target is None else _cone(lines_str, target)
+        )
+        cone_lines_str: List[str] = [l for l, c in zip(lines_str, is_in_cone) if c]
+        if budget is not None and (
+            budget.max_formula_length is not None or budget.max_formula_depth is not None
+        ):
+            # The formulas are checked before any of them is parsed.
+            for line_str in cone_lines_str:
+                _, line_number_str, formula_str, _, _ = split_line(line_str)
+                check_formula(budget, formula_str, line_number_str)
+        lines = list(create_lines(cone_lines_str))
+    except BudgetExceeded:
+        raise
+    except RecursionError:
+        return ProofReport([], error="Error: a formula is nested too deeply.")
+    except RuntimeError as error:
+        return ProofReport([], error=str(error))
+
+    if check_sequent and len(lines) != 0:
+        from .truth_table import is_propositional, proof_sequent
+
+        premises, conclusion = proof_sequent(lines)
+        counterexample: Optional[str] = None
+        if all(is_propositional(f) for f in premises + [conclusion]):
+            from .truth_table import find_countermodel
+
+            countermodel = find_countermodel(premises, conclusion)
+            if countermodel is not None:
+                counterexample = ", ".join(
+                    f"{atom}={'T' if value else 'F'}"
+                    for atom, value in countermodel.items()
+                )
+        else:
+            from .model_finder import find_countermodel
+
+            model = find_countermodel(premises, conclusion)
+            if model is not None:
+                counterexample = str(model)
+        if counterexample is not None:
+            return ProofReport(
+                [],
+                error=f"Error: the sequent of the proof is invalid, counterexample: {counterexample}.",
+            )
+
+    cone_lines = iter(lines)
+    for line_str, c in zip(lines_str, is_in_cone):
+        if not c:
+            line_reports.append(LineReport(line_str.strip(), None))
+            continue
+        if counter is not None:
+            counter.check_deadline()
+        _, line = next(cone_lines)
+        is_valid: bool = line.is_valid()
+        line_reports.append(LineReport(line_str.strip(), is_valid))
+        if fail_fast and not is_valid:
+            break
+    return ProofReport(line_reports)
@@ -5,6 +5,11 @@ setup(
     version="0.1",
     packages=find_packages(),
     python_requires=">=3.11",
+    entry_points={
+        "console_scripts": [
+            "fpv=formal_proof_verifier.cli:main",
+        ]
+    },
     extras_require={
         "dev": [
             "pytest",
@@ -0,0 +1,94 @@
+import json
+
+from formal_proof_verifier.cli import main
+
+VALID_PROOF: str = """
+    1 1 P&Q P
+    1 2 P   1 &E
+"""
+
+INVALID_PROOF: str = """
+    1 1 P&Q P
+    1 2 R   1 &E
+    1 3 Q   1 &E
+"""
+
+def test_text_output(tmp_path, capsys):
+    valid_path = tmp_path / "valid.txt"
+    valid_path.write_text(VALID_PROOF)
+    invalid_path = tmp_path / "invalid.txt"
+    invalid_path.write_text(INVALID_PROOF)
+
+    assert main([str(valid_path)]) == 0
+    assert capsys.readouterr().out == f"{valid_path}: OK\n"
+
+    assert main([str(valid_path), str(invalid_path)]) == 1
+    out: str = capsys.readouterr().out
+    assert f"{valid_path}: OK" in out
+    assert f"{invalid_path}: FAILED" in out
+    assert "'1 2 R   1 &E'" in out
+
+    assert main([str(tmp_path / "missing.txt")]) == 1
+    assert "ERROR" in capsys.readouterr().out
+
+def test_json_output(tmp_path, capsys):
+    invalid_path = tmp_path / "invalid.txt"
+    invalid_path.write_text(INVALID_PROOF)
+
+    assert main(["--format", "json", str(invalid_path)]) == 1
+    results = json.loads(capsys.readouterr().out)
+    assert len(results) == 1
+    assert results[0]["path"] == str(invalid_path)
+    assert results[0]["valid"] is False
+    assert [line["valid"] for line in results[0]["lines"]] == [True, False, True]
+
+def test_fail_fast(tmp_path, capsys):
+    valid_path = tmp_path / "valid.txt"
+    valid_path.write_text(VALID_PROOF)
+    invalid_path = tmp_path / "invalid.txt"
+    invalid_path.write_text(INVALID_PROOF)
+
+    assert main(["--fail-fast", "--format", "json", str(invalid_path), str(valid_path)]) == 1
+    results = json.loads(capsys.readouterr().out)
+    assert len(results) == 1
+    assert [line["valid"] for line in results[0]["lines"]] == [True, False]
+
+def test_jobs(tmp_path, capsys):
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"proof_{i}.txt"
+        path.write_text(VALID_PROOF if i != 2 else INVALID_PROOF)
+        paths.append(str(path))
+
+    assert main(["--jobs", "2", "--format", "json"] + paths) == 1
+    results = json.loads(capsys.readouterr().out)
+    assert [result["path"] for result in results] == paths
+    assert [result["valid"] for result in results] == [True, True, False, True]
+
+def test_stdin(monkeypatch, capsys):
+    import io
+
+    monkeypatch.setattr("sys.stdin", io.StringIO(VALID_PROOF))
+    assert main([]) == 0
+    assert capsys.readouterr().out == "-: OK\n"
+
+def test_target(tmp_path, capsys):
+    invalid_path = tmp_path / "invalid.txt"
+    invalid_path.write_text(INVALID_PROOF)
+
+    assert main(["--target", "3", str(invalid_path)]) == 0
+    assert capsys.readouterr().out == (
+        f"{invalid_path}: OK\n"
+        f"{invalid_path}: dead line '1 2 R   1 &E'\n"
+    )
+
+def test_budget(tmp_path, capsys):
+    valid_path = tmp_path / "valid.txt"
+    valid_path.write_text(VALID_PROOF)
+
+    assert main(["--max-lines", "2", str(valid_path)]) == 0
+    capsys.readouterr()
+    assert main(["--max-lines", "1", "--format", "json", str(valid_path)]) == 1
+    results = json.loads(capsys.readouterr().out)
+    assert results[0]["budget_exceeded"] == "max_lines"
+    assert results[0]["error"] == "Error: budget exceeded, more than 1 lines."
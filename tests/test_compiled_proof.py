@@ -0,0 +1,51 @@
+import pytest
+
+from formal_proof_verifier.compiled_proof import dump, dumps, load, loads
+from formal_proof_verifier.formula import create_formula as cf
+from formal_proof_verifier.proof_store import ProofStore
+from test_proof_store import PROOFS
+
+@pytest.mark.parametrize("text", PROOFS)
+def test_round_trip(text: str):
+    store: ProofStore = ProofStore.from_text(text)
+    loaded: ProofStore = loads(dumps(store))
+    assert len(loaded) == len(store)
+    assert loaded.verify() == store.verify()
+    for i in range(len(store)):
+        assert loaded.label(i) == store.label(i)
+        assert loaded.symbol(i) == store.symbol(i)
+        assert loaded.formula(i) == store.formula(i)
+        assert list(loaded.citations(i)) == list(store.citations(i))
+        assert list(loaded.dependencies(i)) == list(store.dependencies(i))
+
+def test_file(tmp_path):
+    path: str = str(tmp_path / "proof.fpvc")
+    store: ProofStore = ProofStore.from_text(PROOFS[3])
+    dump(store, path)
+    assert load(path).verify() == store.verify()
+
+def test_loaded_formula_table_is_extensible():
+    store: ProofStore = ProofStore.from_text(PROOFS[0])
+    table = loads(dumps(store)).formula_table
+    size: int = len(table)
+    # Formulas already in the table are found again, new ones are added.
+    assert table.add(cf("P&(~P)")) == store.formula_id(0)
+    assert len(table) == size
+    node: int = table.add(cf("(P&(~P))&R"))
+    assert len(table) == size + 2
+    assert table.formula(node) == cf("(P&(~P))&R")
+
+def test_errors():
+    data: bytes = dumps(ProofStore.from_text(PROOFS[0]))
+    with pytest.raises(RuntimeError, match="not a compiled proof"):
+        loads(b"XXXX" + data[4:])
+    with pytest.raises(RuntimeError, match="version"):
+        loads(data[:4] + b"\xff\xff" + data[6:])
+    with pytest.raises(RuntimeError, match="truncated"):
+        loads(data[:-1])
+    with pytest.raises(RuntimeError, match="truncated"):
+        loads(data[:8])
+    corrupted: bytearray = bytearray(data)
+    corrupted[-1] ^= 1
+    with pytest.raises(RuntimeError, match="checksum"):
+        loads(bytes(corrupted))
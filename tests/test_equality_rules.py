@@ -47,3 +47,161 @@ def test_equality_introduction_rule():
         - 1 a=b =I
     """
     assert map_is_valid(text) == [False]
+
+def test_equality_elimination_rule():
+    # Valid use of the rule.
+    text: str = """
+        1 1 a=b    P
+        2 2 F(a)   P
+        1,2 3 F(b) 1,2 =E
+    """
+    assert map_is_valid(text) == [True, True, True]
+
+    # Valid use of the rule, in the other direction.
+    text: str = """
+        1 1 a=b    P
+        2 2 F(b)   P
+        1,2 3 F(a) 1,2 =E
+    """
+    assert map_is_valid(text) == [True, True, True]
+
+    # Valid use of the rule, replacing only some of the occurrences.
+    text: str = """
+        1   1 a=b           P
+        2   2 R(a,a)&F(a)   P
+        1,2 3 R(a,b)&F(a)   1,2 =E
+        1,2 4 R(b,a)&F(b)   1,2 =E
+    """
+    assert map_is_valid(text) == [True, True, True, True]
+
+    # Valid use of the rule, replacing in both directions.
+    text: str = """
+        1   1 a=b     P
+        2   2 R(a,b)  P
+        1,2 3 R(b,a)  1,2 =E
+    """
+    assert map_is_valid(text) == [True, True, True]
+
+    # Replacing a different name.
+    text: str = """
+        1   1 a=b     P
+        2   2 R(a,c)  P
+        1,2 3 R(a,a)  1,2 =E
+    """
+    assert map_is_valid(text) == [True, True, False]
+
+    # Replacing a bound variable.
+    text: str = """
+        1   1 a=b            P
+        2   2 F(a)&(Aa(G(a)))  P
+        1,2 3 F(b)&(Aa(G(b)))  1,2 =E
+    """
+    assert map_is_valid(text) == [True, True, False]
+
+    # Replacing a name captured by a quantifier.
+    text: str = """
+        1   1 a=b        P
+        2   2 Ab(R(a,b)) P
+        1,2 3 Ab(R(b,b)) 1,2 =E
+    """
+    assert map_is_valid(text) == [True, True, False]
+
+    # Different formulas.
+    text: str = """
+        1   1 a=b        P
+        2   2 F(a)&G(a)  P
+        1,2 3 F(b)vG(b)  1,2 =E
+    """
+    assert map_is_valid(text) == [True, True, False]
+
+    # Not an equality.
+    text: str = """
+        1   1 R(a,b)  P
+        2   2 F(a)    P
+        1,2 3 F(b)    1,2 =E
+    """
+    assert map_is_valid(text) == [True, True, False]
+
+def test_equality_closure_rule():
+    # Valid use of the rule: symmetry and transitivity.
+    text: str = """
+        1     1 a=b    P
+        2     2 c=b    P
+        3     3 d=c    P
+        1,2,3 4 a=d    1,2,3 =*
+        1,2,3 5 d=a    1,2,3 =*
+        -     6 e=e    =*
+    """
+    assert map_is_valid(text) == [True, True, True, True, True, True]
+
+    # Valid use of the rule: congruence.
+    text: str = """
+        1       1 a=b              P
+        2       2 b=c              P
+        3       3 R(a,c)&F(b)      P
+        1,2,3   4 R(c,a)&F(a)      1,2,3 =*
+        1,2,3   5 Ax(R(x,c)>F(a))  1,2,3 =*
+    """
+    assert map_is_valid(text) == [True, True, True, True, False]
+
+    # Names which are not equal.
+    text: str = """
+        1     1 a=b    P
+        2     2 c=d    P
+        1,2   3 a=d    1,2 =*
+        4     4 F(a)   P
+        1,2,4 5 F(c)   1,2,4 =*
+    """
+    assert map_is_valid(text) == [True, True, False, True, False]
+
+    # Bound variables are not replaced.
+    text: str = """
+        1   1 a=x           P
+        2   2 Ax(F(x)&G(a)) P
+        1,2 3 Ax(F(a)&G(a)) 1,2 =*
+        1,2 4 Ax(F(x)&G(x)) 1,2 =*
+    """
+    assert map_is_valid(text) == [True, True, False, False]
+
+    # Missing dependency.
+    text: str = """
+        1 1 a=b    P
+        2 2 b=c    P
+        1 3 a=c    1,2 =*
+    """
+    assert map_is_valid(text) == [True, True, False]
+
+def test_equality_closure_is_incremental():
+    from formal_proof_verifier.equality_rules import UnionFind, _Closure
+
+    union_find: UnionFind = UnionFind()
+    union_find.union("a", "b")
+    union_find.union("b", "c")
+    union_find.union("c", "a")
+    assert union_find.is_same("a", "c")
+    union_find.undo(1)
+    assert union_find.is_same("a", "b") and not union_find.is_same("a", "c")
+
+    # Each line cites one more equality than the previous one,
+    # and only the new equality is applied.
+    n: int = 50
+    text: str = "\n".join(f"{i} {i} e{i}=e{i + 1} P" for i in range(1, n + 1)) + "\n" + "\n".join(
+        f"{','.join(str(j) for j in range(1, i + 1))} {n + i} e1=e{i + 1} "
+        f"{','.join(str(j) for j in range(1, i + 1))} =*"
+        for i in range(1, n + 1)
+    )
+    lines = [line for _, line in create_lines_from_text(text)]
+    assert all(line.is_valid() for line in lines)
+    closure: _Closure = lines[-1].rule._proof_cache[_Closure]
+    assert len(closure.union_find) == n
+
+    # The equalities which are not cited any more are undone.
+    text = """
+        1   1 a=b  P
+        2   2 b=c  P
+        1,2 3 a=c  1,2 =*
+        1   4 a=c  1 =*
+        2   5 c=b  2 =*
+        1,2 6 c=a  1,2 =*
+    """
+    assert map_is_valid(text) == [True, True, True, False, True, True]
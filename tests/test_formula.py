@@ -10,7 +10,7 @@ def test_recognize_predicate():
     assert formula.left.atom == "P"
     assert formula.right.type == FormulaType.predicate_type
     assert formula.right.predicate == "Predicate"
-    assert formula.right.variables == ["variable"]
+    assert formula.right.variables == ("variable",)
 
     formula: Formula = cf("Pv(Predicate)something")
     assert formula.type == FormulaType.or_type
@@ -18,13 +18,13 @@ def test_recognize_predicate():
     assert formula.left.atom == "P"
     assert formula.right.type == FormulaType.predicate_type
     assert formula.right.predicate == "Predicate"
-    assert formula.right.variables == ["something"]
+    assert formula.right.variables == ("something",)
 
     formula: Formula = cf("Tripredicate(v1,v2,v3)>P")
     assert formula.type == FormulaType.conditional_type
     assert formula.left.type == FormulaType.predicate_type
     assert formula.left.predicate == "Tripredicate"
-    assert formula.left.variables == ["v1", "v2", "v3"]
+    assert formula.left.variables == ("v1", "v2", "v3")
     assert formula.right.type == FormulaType.atomic_type
     assert formula.right.atom == "P"
 
@@ -32,7 +32,7 @@ def test_recognize_predicate():
     assert formula.type == FormulaType.or_type
     assert formula.left.type == FormulaType.predicate_type
     assert formula.left.predicate == "is"
-    assert formula.left.variables == ["a", "b"]
+    assert formula.left.variables == ("a", "b")
     assert formula.right.type == FormulaType.atomic_type
     assert formula.right.atom == "P"
 
@@ -41,12 +41,12 @@ def test_recognize_predicate():
     assert formula.left.type == FormulaType.not_type
     assert formula.left.inner.type == FormulaType.predicate_type
     assert formula.left.inner.predicate == "="
-    assert formula.left.inner.variables == ["S", "{}"]
+    assert formula.left.inner.variables == ("S", "{}")
     assert formula.right.type == FormulaType.existential_type
     assert formula.right.variable == "x"
     assert formula.right.inner.type == FormulaType.predicate_type
     assert formula.right.inner.predicate == "in"
-    assert formula.right.inner.variables == ["x", "S"]
+    assert formula.right.inner.variables == ("x", "S")
 
 def test_formula_comparison():
     assert cf("P") == cf("P")
@@ -76,3 +76,108 @@ def test_formula_comparison():
     assert cf("P&Q") != cf("R&Q")
     assert cf("PvQ") != cf("PvR")
     assert cf("~P") != cf("~Q")
+
+def test_immutable():
+    formula: Formula = cf("F(a,b)&(Ax(G(x)))")
+    with pytest.raises(AttributeError):
+        formula._left = None
+    with pytest.raises(AttributeError):
+        formula.left.variables.append("c")
+
+    # Equal formulas have the same hash, so they can be shared through a dictionary.
+    other: Formula = cf("(F(a,b))&(Ax(G(x)))")
+    assert formula == other
+    assert hash(formula) == hash(other)
+    assert {formula: 1}[other] == 1
+    assert hash(formula) != hash(cf("F(b,a)&(Ax(G(x)))"))
+
+def test_quantifier_scopes():
+    # The same variable can be quantified in separate scopes.
+    formula: Formula = cf("(Ax(F(x)))&(Ex(G(x)))")
+    assert formula.left.variable == formula.right.variable == "x"
+
+    # But not in a nested scope.
+    with pytest.raises(RuntimeError):
+        cf("Ax(F(x)&(Ex(G(x))))")
+
+    # Many nested scopes.
+    variables = [f"x{i}" for i in range(100)]
+    formula_str: str = "F(" + ",".join(variables) + ")"
+    for variable in reversed(variables):
+        formula_str = f"A{variable}({formula_str})"
+    formula = cf(formula_str)
+    for variable in variables:
+        assert formula.variable == variable
+        formula = formula.inner
+    assert formula.variables == tuple(variables)
+
+def test_notations():
+    expected: Formula = cf("(P&Q)>((~R)v(Ax(F(x)>(Ey(R(x,y))))))")
+    assert cf("(P /\\ Q) -> ((¬R) \\/ (∀x(F(x) -> (∃y(R(x, y))))))") == expected
+    assert cf("(P ∧ Q) → ((~ R) ∨ (∀x (F(x) > (∃y (R(x,y))))))") == expected
+    assert cf(" a = b ") == cf("a=b")
+
+def test_custom_connectives():
+    from formal_proof_verifier.formula_parser import Lexer
+
+    lexer = Lexer({"and": FormulaType.and_type, "not": FormulaType.not_type})
+    formula: Formula = cf("P and (not Q)", lexer=lexer)
+    assert formula == cf("P&(~Q)")
+
+def test_tokenize():
+    from formal_proof_verifier.formula_parser import tokenize
+
+    assert tokenize("F(a, b) -> P") == [
+        ("name", "F", 0),
+        ("(", "(", 1),
+        ("name", "a", 2),
+        (",", ",", 3),
+        ("name", "b", 5),
+        (")", ")", 6),
+        ("connective", "->", 8),
+        ("name", "P", 11),
+    ]
+
+def test_parse_errors():
+    with pytest.raises(RuntimeError, match="position 3"):
+        cf("P&Q)")
+    with pytest.raises(RuntimeError):
+        cf("")
+    with pytest.raises(RuntimeError):
+        cf("P&&Q")
+    # A connective in place of an operand.
+    for formula_str in ["P&A", "v>G", "P&E", "~A", "P&~", "~&P", "Ax(P&A)"]:
+        with pytest.raises(RuntimeError, match="in place of a formula"):
+            cf(formula_str)
+
+def test_str():
+    formulas = {
+        "(P)&(Q)": "P&Q",
+        "P /\\ Q": "P&Q",
+        "(P&Q)>R": "(P&Q)>R",
+        "~(~P)": "~(~P)",
+        "(~P)&Q": "(~P)&Q",
+        "~F(a)": "~F(a)",
+        "(a)=(b)": "a=b",
+        "~(a=b)": "~a=b",
+        "R(a, b)v(a)is(b)": "R(a,b)vis(a,b)",
+        "∀x(F(x) -> G(x))": "Ax(F(x)>G(x))",
+        "(Ax(F(x)))&P": "(Ax(F(x)))&P",
+        "A(x)(E(y)(R(x,y)))": "Ax(Ey(R(x,y)))",
+    }
+    for formula_str, expected in formulas.items():
+        formula: Formula = cf(formula_str)
+        assert str(formula) == expected
+        # The string is parsed back to the same formula.
+        assert cf(expected) == formula
+        assert str(cf(expected)) == expected
+
+    # The string is computed once.
+    formula: Formula = cf("(P&Q)>R")
+    assert str(formula) is str(formula)
+
+    # Deep formulas are printed without recursion.
+    formula = cf("P")
+    for _ in range(10000):
+        formula = Formula(FormulaType.not_type, inner=formula)
+    assert str(formula) == "~(" * 9999 + "~P" + ")" * 9999
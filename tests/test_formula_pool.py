@@ -0,0 +1,52 @@
+from formal_proof_verifier import create_lines_from_text
+from formal_proof_verifier.formula import create_formula as cf
+from formal_proof_verifier.formula_pool import FormulaPool, default_pool
+
+PROOF: str = """
+    1 1 (P&Q)>R   P
+    2 2 P&Q       P
+    1,2 3 R       1,2 MP
+"""
+
+def test_shared_formulas():
+    pool = FormulaPool()
+    formula = pool.create_formula("(P&Q)>(P&Q)")
+    assert formula.left is formula.right
+    assert pool.create_formula("(P&Q)>(P&Q)") is formula
+    assert pool.intern(cf("P&Q")) is formula.left
+    assert pool.intern(cf("(P&Q)v(~(P&Q))")).left is formula.left
+
+def test_released_formulas():
+    pool = FormulaPool()
+    lines_1 = create_lines_from_text(PROOF, formula_pool=pool)
+    lines_2 = create_lines_from_text(PROOF, formula_pool=pool)
+    for (_, line_1), (_, line_2) in zip(lines_1, lines_2):
+        assert line_1.formula is line_2.formula
+        assert line_1.is_valid() and line_2.is_valid()
+    assert len(pool) != 0
+
+    del lines_1, lines_2, line_1, line_2
+    assert len(pool) == 0
+
+def test_lru():
+    pool = FormulaPool(lru_size=2)
+    pool.create_formula("P&Q")
+    pool.create_formula("R")
+    pool.create_formula("S")
+    # "S" and "R" are kept alive, and "P&Q", "P" and "Q" are released.
+    assert len(pool) == 2
+    formula = pool.create_formula("R")
+    assert pool.create_formula("R") is formula
+
+def test_default_pool():
+    assert default_pool() is default_pool()
+
+def test_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = FormulaPool(lru_size=8)
+    formula_strs = [f"(P{i % 20}&Q)>R" for i in range(2000)]
+    with ThreadPoolExecutor(8) as executor:
+        formulas = list(executor.map(pool.create_formula, formula_strs))
+    for formula_str, formula in zip(formula_strs, formulas):
+        assert formula is pool.create_formula(formula_str)
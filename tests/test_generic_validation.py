@@ -1,3 +1,6 @@
+from typing import List
+import pytest
+
 from utils import map_is_valid
 from formal_proof_verifier import create_lines_from_text
 
@@ -144,3 +147,80 @@ def test_only_one_variable_with_property():
     lines: List[Union[str, Line]] = create_lines_from_text(text)
 
     assert all(line[1].is_valid() for line in lines)
+
+def test_long_linear_proof():
+    # Each line cites the previous one, which is deeper than the recursion limit.
+    number_of_lines: int = 5000
+    lines_str: List[str] = ["1 1 P P"]
+    for i in range(2, number_of_lines + 1):
+        if i % 2 == 0:
+            lines_str.append(f"1 {i} ~(~P) {i - 1} DNI")
+        else:
+            lines_str.append(f"1 {i} P {i - 1} DNE")
+
+    assert map_is_valid("\n".join(lines_str)) == [True] * number_of_lines
+
+    lines_str[1] = "1 2 ~(~Q) 1 DNI"
+    lines = list(create_lines_from_text("\n".join(lines_str)))
+    assert not lines[-1][1].is_valid()
+    assert lines[0][1].is_valid()
+
+def test_no_reference_cycles():
+    import gc
+
+    text: str = """
+        1    1 P&(~P)     A
+        2    2 ~Q         A
+        1    3 P          1 &E
+        1,2  4 P&(~Q)     3,2 &I
+        1,2  5 P          4 &E
+        1    6 (~Q)>P     2,5 CP
+        1    7 ~P         1 &E
+        1    8 ~(~Q)      6,7 MT
+        1    9 Q          8 DNE
+        -   10 (P&(~P))>Q 1,9 CP
+    """
+
+    gc.collect()
+    gc.disable()
+    try:
+        lines = create_lines_from_text(text)
+        assert all(line[1].is_valid() for line in lines)
+        del lines
+        # Everything is freed by reference counting, nothing is left for the collector.
+        assert gc.collect() == 0
+    finally:
+        gc.enable()
+
+def test_lazy_formulas():
+    text: str = """
+        1 1 P&Q   P
+        2 2 R&&S  P
+        1 3 P     1 &E
+    """
+    with pytest.raises(RuntimeError):
+        create_lines_from_text(text)
+
+    lines = [line for _, line in create_lines_from_text(text, lazy_formulas=True)]
+    assert lines[2].is_valid()
+    with pytest.raises(RuntimeError, match="in line '2 2 R&&S  P'"):
+        lines[1].formula
+
+    # Line numbers are still checked when the lines are created.
+    text: str = """
+        1 1 P&Q   P
+        1 2 P     3 &E
+    """
+    with pytest.raises(RuntimeError):
+        create_lines_from_text(text, lazy_formulas=True)
+
+def test_immutable_lines():
+    text: str = """
+        1 1 P&Q   P
+        1 2 P     1 &E
+    """
+    lines = [line for _, line in create_lines_from_text(text)]
+    assert isinstance(lines[1].dependencies, tuple)
+    assert lines[1].dependencies == (lines[0],)
+    with pytest.raises(AttributeError):
+        lines[1]._dependencies = ()
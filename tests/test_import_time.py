@@ -0,0 +1,101 @@
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# Modules which must not be imported by merely importing the package.
+# The rule modules and the formula parser are imported when the first
+# rule and formula are created, the printer and the packer when the first
+# formula is printed and pickled.
+LAZY_MODULES: List[str] = [
+    "formal_proof_verifier.propositional_rules",
+    "formal_proof_verifier.predicate_rules",
+    "formal_proof_verifier.equality_rules",
+    "formal_proof_verifier.verification",
+    "formal_proof_verifier.formula_parser",
+    "formal_proof_verifier.formula_printer",
+    "formal_proof_verifier.packing",
+    "re",
+    "copy",
+    "typing",
+]
+
+# The budget in milliseconds documented in the README: the time that
+# importing the package and `cli` adds to `python -c pass`,
+# and the self import time of `cli`.
+IMPORT_TIME_BUDGET: int = 15
+CLI_SELF_IMPORT_TIME_BUDGET: int = 2
+
+def _imported_modules(code: str) -> List[str]:
+    script: str = (
+        "import sys\n"
+        "before = set(sys.modules)\n"
+        f"{code}\n"
+        "print('\\n'.join(sorted(set(sys.modules) - before)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.split()
+
+def _run_times(codes: List[str]) -> List[float]:
+    # The fastest of several runs of each code, in milliseconds.
+    # The runs of the codes alternate, so that the noise of a busy machine
+    # is spread over all of them.
+    run_times: List[float] = [float("inf")] * len(codes)
+    for _ in range(20):
+        for i, code in enumerate(codes):
+            start: float = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], check=True)
+            run_times[i] = min(run_times[i], (time.perf_counter() - start) * 1000)
+    return run_times
+
+def _import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # The self and cumulative import times in microseconds, by module.
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        # Format: "import time: <self us> | <cumulative us> | <module>".
+        fields: List[str] = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            times[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    return times
+
+def test_package_import_is_lazy():
+    modules: List[str] = _imported_modules("import formal_proof_verifier")
+    assert "formal_proof_verifier.formal_proof_verifier" in modules
+    assert all(module not in modules for module in LAZY_MODULES)
+
+def test_rules_are_imported_on_demand():
+    modules: List[str] = _imported_modules(
+        "from formal_proof_verifier import create_lines_from_text\n"
+        "create_lines_from_text('1 1 P P')"
+    )
+    assert "formal_proof_verifier.propositional_rules" in modules
+    assert "formal_proof_verifier.predicate_rules" in modules
+    assert "formal_proof_verifier.equality_rules" in modules
+
+def test_cli_import_is_lazy():
+    modules: List[str] = _imported_modules("import formal_proof_verifier.cli")
+    assert all(module not in modules for module in LAZY_MODULES)
+    assert "argparse" not in modules
+    assert "json" not in modules
+    assert "concurrent.futures" not in modules
+
+def test_import_time():
+    import_run_time, run_time = _run_times(["import formal_proof_verifier.cli", "pass"])
+    import_time: float = import_run_time - run_time
+    assert import_time < IMPORT_TIME_BUDGET
+    cli_self_import_time: int = min(
+        _import_times("formal_proof_verifier.cli")["formal_proof_verifier.cli"][0]
+        for _ in range(3)
+    )
+    assert cli_self_import_time < CLI_SELF_IMPORT_TIME_BUDGET * 1000
@@ -0,0 +1,73 @@
+from typing import Dict, List
+
+from formal_proof_verifier import create_lines_from_text, metrics
+from formal_proof_verifier.formula import create_formula as cf
+from formal_proof_verifier.formula_parser import tokenize
+from formal_proof_verifier.line import Line
+from formal_proof_verifier.metrics import OperationCounter
+
+def _chain_text(number_of_lines: int) -> str:
+    # Each line cites the previous one.
+    return "1 1 P P\n" + "\n".join(
+        f"1 {i} {'~(~(P))' if i % 2 == 0 else 'P'} {i - 1} {'DNI' if i % 2 == 0 else 'DNE'}"
+        for i in range(2, number_of_lines + 1)
+    )
+
+def _count_verification(text: str) -> Dict[str, int]:
+    lines: List[Line] = [line for _, line in create_lines_from_text(text)]
+    with OperationCounter() as counter:
+        assert all(line.is_valid() for line in lines)
+    return counter.as_dict()
+
+def test_counts():
+    with OperationCounter() as counter:
+        tokens = tokenize("(P&Q)>R")
+    assert counter[metrics.TOKENS] == len(tokens) == 7
+
+    p_and_q = cf("P&Q")
+    with OperationCounter() as counter:
+        assert p_and_q == cf("P&Q")
+    assert counter[metrics.FORMULA_NODES] == 3
+
+def test_nothing_is_counted_by_default():
+    assert metrics.local.active is None
+    counter: OperationCounter = OperationCounter()
+    cf("P&Q") == cf("P&Q")
+    assert counter.as_dict() == dict.fromkeys(metrics.COUNTERS, 0)
+
+def test_nested_counters():
+    with OperationCounter() as outer:
+        tokenize("P&Q")
+        with OperationCounter() as inner:
+            tokenize("P")
+        assert metrics.local.active is outer
+    assert metrics.local.active is None
+    assert inner[metrics.TOKENS] == 1
+    assert outer[metrics.TOKENS] == 4
+
+def test_verification_is_linear():
+    counts: Dict[str, int] = _count_verification(_chain_text(200))
+    # Each line is validated once, and checks its one cited line.
+    assert counts[metrics.LINE_VALIDATIONS] == 199
+    # The dependencies are one line, compared both ways.
+    assert counts[metrics.DEPENDENCY_COMPARISONS] == 2 * 199
+
+    double_counts: Dict[str, int] = _count_verification(_chain_text(400))
+    for name in metrics.COUNTERS:
+        assert double_counts[name] <= 2 * counts[name] + 2
+
+def test_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    def _count(formula_str: str) -> int:
+        with OperationCounter() as counter:
+            for _ in range(200):
+                tokenize(formula_str)
+        return counter[metrics.TOKENS]
+
+    # The counters of concurrent threads only count the work of their thread.
+    with OperationCounter() as outer:
+        with ThreadPoolExecutor(4) as executor:
+            counts = list(executor.map(_count, ["P", "P&Q"] * 4))
+    assert counts == [200, 600] * 4
+    assert outer[metrics.TOKENS] == 0
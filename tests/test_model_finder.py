@@ -0,0 +1,58 @@
+from formal_proof_verifier.formula import create_formula as cf
+from formal_proof_verifier.model_finder import find_countermodel
+from formal_proof_verifier.verification import verify_text
+
+def test_valid_sequents():
+    assert find_countermodel([cf("Ax(F(x))")], cf("F(a)")) is None
+    assert find_countermodel([cf("F(a)")], cf("Ex(F(x))")) is None
+    assert find_countermodel([cf("Ey(Ax(R(x,y)))")], cf("Ax(Ey(R(x,y)))")) is None
+    assert find_countermodel([cf("F(a)"), cf("a=b")], cf("F(b)")) is None
+    assert find_countermodel([cf("Ax(F(x)>G(x))"), cf("Ex(F(x))")], cf("Ex(G(x))")) is None
+    assert find_countermodel([], cf("Ax(x=x)")) is None
+
+def test_countermodels():
+    model = find_countermodel([cf("Ex(F(x))")], cf("Ax(F(x))"))
+    assert model.domain_size == 2
+    assert model.predicates == {("F", 1): frozenset({(0,)})}
+    assert str(model) == "domain of size 2, F={0}"
+
+    model = find_countermodel([cf("Ax(Ey(R(x,y)))")], cf("Ey(Ax(R(x,y)))"))
+    assert model.domain_size == 2
+    assert str(model) == "domain of size 2, R={(0,1),(1,0)}"
+
+    model = find_countermodel([cf("F(a)")], cf("F(b)"))
+    assert str(model) == "domain of size 2, a=0, b=1, F={0}"
+
+    model = find_countermodel([cf("Ax(F(x)vG(x))")], cf("(Ax(F(x)))v(Ax(G(x)))"))
+    assert str(model) == "domain of size 2, F={0}, G={1}"
+
+    # Atoms are propositions.
+    assert str(find_countermodel([cf("P>Q")], cf("Q>P"))) == "domain of size 1, P=F, Q=T"
+
+def test_domain_size():
+    # Every model of the premise has at least 3 elements.
+    premises = [cf("(~(a=b))&((~(b=c))&(~(a=c)))")]
+    assert find_countermodel(premises, cf("Ex(F(x))"), max_domain_size=2) is None
+    assert find_countermodel(premises, cf("Ex(F(x))"), max_domain_size=3).domain_size == 3
+
+def test_max_interpretations():
+    premises = [cf("Ax(Ey(R(x,y)))"), cf("Ax(Ey(S(x,y)))")]
+    conclusion = cf("Ex(Ey(R(x,y)&S(x,y)))")
+    assert find_countermodel(premises, conclusion, max_domain_size=3) is not None
+    assert find_countermodel(premises, conclusion, max_interpretations=15) is None
+
+def test_verify_text_with_predicate_sequent():
+    text: str = """
+        1 1 Ex(F(x)) P
+        1 2 F(a)     1 UE
+    """
+    report = verify_text(text, check_sequent=True)
+    assert not report.is_valid
+    assert "counterexample: domain of size 2, a=0, F={1}" in report.error
+
+    text: str = """
+        1 1 Ax(F(x)&G(x)) P
+        1 2 F(a)&G(a)     1 UE
+        1 3 F(a)          2 &E
+    """
+    assert verify_text(text, check_sequent=True).is_valid
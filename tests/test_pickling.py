@@ -0,0 +1,144 @@
+import pickle
+import pytest
+from typing import List
+
+from formal_proof_verifier import create_lines_from_text
+from formal_proof_verifier.formula import create_formula as cf
+from formal_proof_verifier.line import Line
+from formal_proof_verifier.packing import FormulaPacker, PackedProof, unpack_formulas
+from test_proof_store import PROOFS
+
+def _lines(text: str, **kwargs) -> List[Line]:
+    return [line for _, line in create_lines_from_text(text, **kwargs)]
+
+def test_formula():
+    formulas: List[str] = [
+        "P",
+        "(P&Q)>(P&Q)",
+        "~(Ex(Ay(F(y)>(x=y))))",
+        "(Ax(F(x)))v(Ay(F(y)))",
+    ]
+    for formula_str in formulas:
+        formula = pickle.loads(pickle.dumps(cf(formula_str)))
+        assert formula == cf(formula_str)
+        assert str(formula) == str(cf(formula_str))
+
+    # Shared subformulas are rebuilt shared.
+    formula = pickle.loads(pickle.dumps(cf("(P&Q)>(P&Q)")))
+    assert formula.left is formula.right
+
+def test_formula_packer():
+    packer: FormulaPacker = FormulaPacker()
+    index_1: int = packer.add(cf("(P&Q)>R"))
+    index_2: int = packer.add(cf("~(P&Q)"))
+    # P, Q, P&Q, R, (P&Q)>R and ~(P&Q).
+    assert len(packer.nodes) == 6
+    formulas = unpack_formulas(packer.nodes)
+    assert formulas[index_1] == cf("(P&Q)>R")
+    assert formulas[index_2] == cf("~(P&Q)")
+    assert formulas[index_1].left is formulas[index_2].inner
+    # Bound variables are kept.
+    assert packer.add(cf("Ax(F(x))")) != packer.add(cf("Ay(F(y))"))
+
+def test_lines():
+    for text in PROOFS:
+        lines: List[Line] = _lines(text)
+        unpickled: List[Line] = pickle.loads(pickle.dumps(PackedProof.pack(lines))).lines()
+        assert [l.is_valid() for l in unpickled] == [l.is_valid() for l in lines]
+        assert [l.formula for l in unpickled] == [l.formula for l in lines]
+        for line, original in zip(unpickled, lines):
+            assert type(line.rule) is type(original.rule)
+            assert [unpickled.index(l) for l in line.rule.lines] == (
+                [lines.index(l) for l in original.rule.lines]
+            )
+            assert [unpickled.index(l) for l in line.dependencies] == (
+                [lines.index(l) for l in original.dependencies]
+            )
+        assert all(l.rule._proof_cache is unpickled[0].rule._proof_cache for l in unpickled)
+
+def test_line_alone():
+    lines: List[Line] = _lines(PROOFS[0])
+    line: Line = pickle.loads(pickle.dumps(lines[6]))
+    assert line.is_valid()
+    assert line.formula == lines[6].formula
+
+def test_lines_are_packed_once():
+    lines: List[Line] = _lines(PROOFS[1])
+    # The proof packed together is sent once, however many lines it has.
+    packed_proof: PackedProof = PackedProof.pack(lines)
+    assert len(packed_proof) == len(lines)
+    assert len(pickle.dumps(packed_proof)) < 2 * len(pickle.dumps(lines[-1]))
+
+    # A line pickled alone is self-contained.
+    unpickled: List[Line] = pickle.loads(pickle.dumps(lines))
+    assert [l.formula for l in unpickled] == [l.formula for l in lines]
+    assert unpickled[-1].dependencies[0] is not unpickled[0]
+
+def test_lazy_and_inferred_lines():
+    text: str = """
+        1   1 P&Q   P
+        1   2 P     1
+        1   3 R&&S  1 &E
+    """
+    lines: List[Line] = _lines(text, infer_rules=True, lazy_formulas=True)
+    unpickled: List[Line] = pickle.loads(pickle.dumps(lines))
+    assert unpickled[1].is_valid()
+    assert unpickled[1].rule.symbols(unpickled[1]) == ["&E"]
+    assert unpickled[0].formula == cf("P&Q")
+    with pytest.raises(RuntimeError, match="invalid formula 'R&&S' in line '1   3 R&&S  1 &E'"):
+        unpickled[2].formula
+
+def test_long_proof():
+    text: str = "1 1 P P\n" + "\n".join(
+        f"1 {i} {'~(~(P))' if i % 2 == 0 else 'P'} {i - 1} {'DNI' if i % 2 == 0 else 'DNE'}"
+        for i in range(2, 5001)
+    )
+    lines: List[Line] = _lines(text)
+    packed_proof: PackedProof = PackedProof.pack(lines)
+    data: bytes = pickle.dumps(packed_proof)
+    assert len(data) < 50 * len(lines)
+    assert all(l.is_valid() for l in pickle.loads(data).lines())
+
+    # Each line pickled separately is flat (so far below the recursion
+    # limit of pickle), and the same size as on a fresh proof, however
+    # many lines were pickled before. Its size grows with the lines it
+    # depends on or cites, so the total of all the lines is quadratic:
+    # every 50th line (and the last one) is pickled.
+    fresh_lines: List[Line] = _lines(text)
+    indices: List[int] = list(range(0, len(lines), 50)) + [len(lines) - 1]
+    sizes: List[int] = [len(pickle.dumps(lines[i])) for i in indices]
+    assert sizes == [len(pickle.dumps(fresh_lines[i])) for i in reversed(indices)][::-1]
+    assert all(size < 50 * (i + 1) + 200 for size, i in zip(sizes, indices))
+    line: Line = pickle.loads(pickle.dumps(lines[-1]))
+    assert line.is_valid()
+    # Pickling keeps no state in the proof.
+    assert PackedProof not in lines[0].rule._proof_cache
+
+def test_lines_of_several_proofs():
+    lines_1: List[Line] = _lines(PROOFS[0])
+    lines_2: List[Line] = _lines(PROOFS[1])
+    interleaved: List[Line] = [l for pair in zip(lines_1, lines_2) for l in pair]
+    unpickled: List[Line] = pickle.loads(pickle.dumps(PackedProof.pack(interleaved))).lines()
+    assert len(unpickled) == len(interleaved)
+    assert [l.is_valid() for l in unpickled] == [l.is_valid() for l in interleaved]
+    assert unpickled[-1].formula == interleaved[-1].formula
+
+    # Packing does not create reference cycles.
+    import gc
+    gc.collect()
+    pickle.dumps(_lines(PROOFS[2]))
+    assert gc.collect() == 0
+
+def test_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    def _pickle(text: str) -> List[bool]:
+        lines: List[Line] = _lines(text)
+        for line in lines:
+            pickle.dumps(line)
+        return [l.is_valid() for l in pickle.loads(pickle.dumps(lines))]
+
+    texts: List[str] = PROOFS * 20
+    with ThreadPoolExecutor(8) as executor:
+        results: List[List[bool]] = list(executor.map(_pickle, texts))
+    assert results == [[l.is_valid() for l in _lines(text)] for text in texts]
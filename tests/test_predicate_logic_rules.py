@@ -726,3 +726,37 @@ def test_existential_elimination_rule():
         1,2 6 Ex(F(x)&(Ey(P))) 1,3,5 EE
     """
     assert map_is_valid(text) == [True, True, True, True, True, False]
+
+def test_quantifier_instances():
+    # Valid use of the rules, with nested quantifiers and multi-variable predicates.
+    text: str = """
+        1 1 Ax(Ey(R(x,y)&R(y,x)))  P
+        1 2 Ey(R(a,y)&R(y,a))      1 UE
+        1 3 Ex(Ey(R(x,y)&R(y,x)))  2 EI
+    """
+    assert map_is_valid(text) == [True, True, True]
+
+    # Inconsistent instances of the variable.
+    text: str = """
+        1 1 Ax(R(x,x)) P
+        1 2 R(a,b)     1 UE
+        1 3 R(a,a)     1 UE
+    """
+    assert map_is_valid(text) == [True, False, True]
+
+    # The instance of the variable is captured by a nested quantifier.
+    text: str = """
+        1 1 Ax(Ey(R(x,y)))  P
+        1 2 Ey(R(y,y))      1 UE
+        3 3 Ey(R(b,y))      P
+        3 4 Ex(Ey(R(x,y)))  3 EI
+    """
+    assert map_is_valid(text) == [True, False, True, True]
+
+    # A different name, not an instance of the variable.
+    text: str = """
+        1 1 F(a)&G(b)      P
+        1 2 Ex(F(x)&G(x))  1 EI
+        1 3 Ex(F(x)&G(b))  1 EI
+    """
+    assert map_is_valid(text) == [True, False, True]
@@ -0,0 +1,71 @@
+import pytest
+
+from formal_proof_verifier.proof_archive import ArchiveReader, ArchiveWriter
+from formal_proof_verifier.proof_store import ProofStore
+from test_proof_store import PROOFS
+
+def _write(path: str) -> None:
+    with ArchiveWriter(path) as writer:
+        for i, text in enumerate(PROOFS):
+            assert writer.add(f"proof-{i}", text) == i
+        # A store already on the formula table of the archive.
+        writer.add("store", ProofStore.from_text(PROOFS[0], writer.formula_table))
+
+def test_random_access(tmp_path):
+    path: str = str(tmp_path / "proofs.fpva")
+    _write(path)
+    with ArchiveReader(path) as reader:
+        assert len(reader) == len(PROOFS) + 1
+        assert reader.names[-1] == "store"
+        # In reverse order, so that no proof is read after the previous one.
+        for i in reversed(range(len(PROOFS))):
+            expected: ProofStore = ProofStore.from_text(PROOFS[i])
+            for store in (reader.proof(i), reader.proof(f"proof-{i}")):
+                assert store.verify() == expected.verify()
+                assert [store.formula(j) for j in range(len(store))] == (
+                    [expected.formula(j) for j in range(len(expected))]
+                )
+                assert [store.label(j) for j in range(len(store))] == (
+                    [expected.label(j) for j in range(len(expected))]
+                )
+
+def test_shared_formula_table(tmp_path):
+    path: str = str(tmp_path / "proofs.fpva")
+    _write(path)
+    with ArchiveReader(path) as reader:
+        store_1: ProofStore = reader.proof("proof-0")
+        store_2: ProofStore = reader.proof("store")
+        assert store_1.formula_table is store_2.formula_table is reader.formula_table
+        assert list(store_1._formula_ids) == list(store_2._formula_ids)
+
+def test_errors(tmp_path):
+    path: str = str(tmp_path / "proofs.fpva")
+    with ArchiveWriter(path) as writer:
+        with pytest.raises(RuntimeError, match="formula table"):
+            writer.add("other", ProofStore.from_text(PROOFS[0]))
+        writer.add("proof", PROOFS[0])
+    with ArchiveReader(path) as reader:
+        with pytest.raises(RuntimeError, match="no proof 'missing'"):
+            reader.proof("missing")
+        with pytest.raises(RuntimeError, match="no proof 1"):
+            reader.proof(1)
+
+    with open(path, "rb") as file:
+        data: bytearray = bytearray(file.read())
+    # A byte of the record of the proof.
+    data[10] ^= 1
+    with open(path, "wb") as file:
+        file.write(data)
+    with ArchiveReader(path) as reader:
+        with pytest.raises(RuntimeError, match="'proof' is corrupted"):
+            reader.proof(0)
+
+    with open(path, "wb") as file:
+        file.write(data[:-1])
+    with pytest.raises(RuntimeError, match="truncated"):
+        ArchiveReader(path)
+
+    with open(path, "wb") as file:
+        file.write(b"XXXX" + data[4:])
+    with pytest.raises(RuntimeError, match="not a proof archive"):
+        ArchiveReader(path)
@@ -0,0 +1,190 @@
+import pytest
+from typing import Dict, List, Set
+
+from utils import map_is_valid
+from formal_proof_verifier import create_lines_from_text
+from formal_proof_verifier.formula import create_formula as cf
+from formal_proof_verifier.formal_proof_verifier import split_line
+from formal_proof_verifier.proof_store import RULE_SYMBOLS, FormulaTable, ProofStore
+
+PROOFS: List[str] = [
+    """
+        1    1 P&(~P)     A
+        2    2 ~Q         A
+        1    3 P          1 &E
+        1,2  4 P&(~Q)     3,2 &I
+        1,2  5 P          4 &E
+        1    6 Q>(~P)     2,5 CP
+        1    7 ~P         1 &E
+        1    8 ~(~Q)      6,7 MT
+        1    9 Q          8 DNE
+        -   10 (P&(~P))>Q 1,9 CP
+    """,
+    """
+        1         1 (P&Q)>R                        P
+        2         2 ~((P>R)v(Q>R))                 A
+        3         3 P                              A
+        4         4 Q                              A
+        3,4       5 P&Q                            3,4 &I
+        1,3,4     6 R                              1,5 MP
+        1,4       7 P>R                            3,6 CP
+        1,4       8 (P>R)v(Q>R)                    7 vI
+        1,2,4     9 ((P>R)v(Q>R))&(~((P>R)v(Q>R))) 8,2 &I
+        1,2      10 ~Q                             4,9 RAA
+        1,2,4    11 Q&(~Q)                         4,10 &I
+        12       12 ~R                             A
+        1,2,4,12 13 (Q&(~Q))&(~R)                  11,12 &I
+        1,2,4,12 14 Q&(~Q)                         13 &E
+        1,2,4    15 ~(~R)                          12,14 RAA
+        1,2,4    16 R                              15 DNE
+        1,2      17 Q>R                            4,16 CP
+        1,2      18 (P>R)v(Q>R)                    17 vI
+        1,2      19 ((P>R)v(Q>R))&(~((P>R)v(Q>R))) 18,2 &I
+        1        20 ~(~((P>R)v(Q>R)))              2,19 RAA
+        1        21 (P>R)v(Q>R)                    20 DNE
+    """,
+    """
+        1 1 PvQ   P
+        2 2 P     A
+        2 3 QvP   2 vI
+        4 4 Q     A
+        4 5 QvP   4 vI
+        1 6 QvP   1,2,3,4,5 vE
+        1 7 QvR   1,2,3,4,5 vE
+        1 8 ~(~P) 2 DNI
+    """,
+    """
+        1    1 Ex(F(x)&G(x))        P
+        2    2 Ax(F(x)>(G(x)>H(x))) P
+        3    3 F(a)&G(a)            A
+        3    4 F(a)                 3 &E
+        3    5 G(a)                 3 &E
+        2    6 F(a)>(G(a)>H(a))     2 UE
+        2,3  7 G(a)>H(a)            6,4 MP
+        2,3  8 H(a)                 7,5 MP
+        2,3  9 Ex(H(x))             8 EI
+        1,2 10 Ex(H(x))             1,3,9 EE
+        1,2 11 Ay(H(y))             10 UI
+        3   12 Ax(F(x))             4 UI
+    """,
+    """
+        -   1 a=a          =I
+        2   2 a=b          P
+        3   3 F(a)&G(a,a)  P
+        2,3 4 F(b)&G(b,b)  2,3 =E
+        2,3 5 F(b)&G(a,b)  2,3 =E
+        -   6 a=b          =I
+    """,
+    """
+        1       1 a=b          P
+        2       2 b=c          P
+        3       3 R(a,c)       P
+        1,2,3   4 R(c,a)       1,2,3 =*
+        1,2     5 c=a          1,2 =*
+        1,2     6 c=d          1,2 =*
+        1,2,3   7 ~(~(R(c,a))) 4 TF
+    """,
+]
+
+@pytest.mark.parametrize("text", PROOFS)
+def test_same_validity_as_lines(text: str):
+    expected: List[bool] = map_is_valid(text)
+    assert ProofStore.from_text(text).verify() == expected
+    assert ProofStore.from_lines(create_lines_from_text(text)).verify() == expected
+
+def _mutations(text: str) -> List[str]:
+    """
+    Variants of a proof in which one line has the formula or the dependencies
+    of another line, or an assumption is a premise (and the other way round),
+    so that most of the variants are invalid.
+    """
+    lines_str: List[str] = [l for l in text.split("\n") if l.strip() != ""]
+    fields: List[List[str]] = [l.split() for l in lines_str]
+    mutations: List[str] = []
+    for i, line_fields in enumerate(fields):
+        variants: List[List[str]] = []
+        for other_fields in fields:
+            if other_fields[2] != line_fields[2]:
+                variants.append(line_fields[:2] + [other_fields[2]] + line_fields[3:])
+            if other_fields[0] != line_fields[0]:
+                variants.append([other_fields[0]] + line_fields[1:])
+        swapped_symbol: Dict[str, str] = {"A": "P", "P": "A"}
+        if line_fields[-1] in swapped_symbol:
+            variants.append(line_fields[:-1] + [swapped_symbol[line_fields[-1]]])
+        for variant in variants:
+            mutations.append("\n".join(lines_str[:i] + [" ".join(variant)] + lines_str[i + 1:]))
+    return mutations
+
+def test_every_rule_is_tested():
+    symbols: Set[str] = set()
+    for text in PROOFS:
+        for line_str in text.split("\n"):
+            if line_str.strip() != "":
+                symbols.add(split_line(line_str)[4])
+    assert symbols == set(RULE_SYMBOLS)
+
+@pytest.mark.parametrize("text", PROOFS)
+def test_mutations_same_validity_as_lines(text: str):
+    # The store checks its lines with the rules, through a view of line
+    # indices and node ids, so any difference with the lines (in particular
+    # for invalid lines) is a bug in one of the views.
+    for mutation in _mutations(text):
+        try:
+            expected: List[bool] = map_is_valid(mutation)
+        except RuntimeError:
+            with pytest.raises(RuntimeError):
+                ProofStore.from_text(mutation)
+            continue
+        assert ProofStore.from_text(mutation).verify() == expected, mutation
+
+def test_formula_table():
+    table: FormulaTable = FormulaTable()
+    formulas: List[str] = [
+        "(P&Q)>(P&Q)",
+        "~(Ex(Ay(F(y)>(x=y))))",
+        "Ax~(Ey(R(x,y)))",
+        "(a)is(b)vP",
+    ]
+    for formula_str in formulas:
+        node: int = table.add(cf(formula_str))
+        assert table.formula(node) == cf(formula_str)
+        assert table.add(cf(formula_str)) == node
+
+    # Equal subformulas are stored once.
+    node: int = table.add(cf("(P&Q)>(P&Q)"))
+    assert table.left(node) == table.right(node)
+    assert table.add(cf("P&Q")) == table.left(node)
+
+def test_shared_formula_table():
+    table: FormulaTable = FormulaTable()
+    store_1: ProofStore = ProofStore.from_text(PROOFS[0], table)
+    store_2: ProofStore = ProofStore.from_text(PROOFS[0], table)
+    assert store_1.formula_table is store_2.formula_table
+    assert [store_1.formula_id(i) for i in range(len(store_1))] == (
+        [store_2.formula_id(i) for i in range(len(store_2))]
+    )
+
+def test_lines():
+    store: ProofStore = ProofStore.from_text(PROOFS[2])
+    assert len(store) == 8
+    assert store.label(5) == "6"
+    assert store.symbol(5) == "vE"
+    assert store.formula(5) == cf("QvP")
+    assert list(store.citations(5)) == [0, 1, 2, 3, 4]
+    assert list(store.dependencies(5)) == [0]
+    assert list(store.dependencies(0)) == [0]
+
+def test_structural_errors():
+    texts: List[str] = [
+        "1 1 P",
+        "1 1 P P\n1 1 P P",
+        "1 1 P P\n1 2 P 3 &E",
+        "1 1 P P\n1 2 P 1 XX",
+        "1 1 P P\n1 2 P 1,1 &E",
+        "2 1 P P",
+    ]
+    for text in texts:
+        with pytest.raises(RuntimeError):
+            create_lines_from_text(text)
+        with pytest.raises(RuntimeError):
+            ProofStore.from_text(text)
@@ -0,0 +1,109 @@
+import pytest
+from typing import List
+
+from formal_proof_verifier import create_lines_from_text
+from formal_proof_verifier.formula import create_formula as cf
+from formal_proof_verifier.rule import Rule, InferredRule
+
+def _inferred_symbols(text: str) -> List[List[str]]:
+    lines = create_lines_from_text(text, infer_rules=True)
+    return [
+        line.rule.symbols(line) if isinstance(line.rule, InferredRule) else [type(line.rule).symbol()]
+        for _, line in lines
+    ]
+
+def test_missing_rule_symbols():
+    text: str = """
+        1    1 P&(~P)
+        2    2 ~Q
+        1    3 P          1
+        1,2  4 P&(~Q)     3,2
+        1,2  5 P          4
+        1    6 (~Q)>P     2,5
+        1    7 ~P         1
+        1    8 ~(~Q)      6,7
+        1    9 Q          8
+        -   10 (P&(~P))>Q 1,9
+    """
+    # Lines 1 and 2 could be premises or assumptions, and are taken as
+    # premises, which cannot be discharged by CP (lines 6 and 10).
+    assert _inferred_symbols(text) == [
+        ["P"], ["P"], ["&E"], ["&I"], ["&E"],
+        [], ["&E"], ["MT"], ["DNE"], [],
+    ]
+    lines = create_lines_from_text(text, infer_rules=True)
+    assert [line[1].is_valid() for line in lines] == [
+        True, True, True, True, True, False, True, False, False, False,
+    ]
+
+def test_ambiguous_line_is_not_discharged():
+    # The discharged line is written as an assumption, and its lines are
+    # validated in either order.
+    text: str = """
+        1 1 P
+        - 2 P>P 1,1
+    """
+    for validate_first in (True, False):
+        lines = [line for _, line in create_lines_from_text(text, infer_rules=True)]
+        if validate_first:
+            assert lines[0].is_valid()
+        assert not lines[0].is_assumption()
+        assert not lines[1].is_valid()
+        assert lines[1].rule.symbols(lines[1]) == []
+
+    # With an explicit assumption, the same proof is valid.
+    text = """
+        1 1 P   A
+        - 2 P>P 1,1
+    """
+    lines = [line for _, line in create_lines_from_text(text, infer_rules=True)]
+    assert lines[1].is_valid()
+    assert lines[1].rule.symbols(lines[1]) == ["CP"]
+
+def test_invalid_rule_symbols():
+    text: str = """
+        1   1 P&Q       P
+        1   2 P         1 &I
+        1   3 Q         1 XX
+        1   4 Q&P       3,2 vE
+        1   5 ~(~(Q&P)) 4 DNE
+        1   6 a=a       =E
+    """
+    # Only missing, unknown or misapplied (by the number of lines) rules are inferred.
+    assert _inferred_symbols(text) == [["P"], ["&E"], ["&E"], ["&I"], ["DNE"], []]
+    lines = create_lines_from_text(text, infer_rules=True)
+    assert [line[1].is_valid() for line in lines] == [True, True, True, True, False, False]
+
+    # The rule symbol is not inferred if it is not requested.
+    with pytest.raises(RuntimeError):
+        create_lines_from_text(text)
+
+def test_no_matching_rule():
+    text: str = """
+        1 1 P&Q P
+        1 2 R   1
+        1 3 R   &E
+    """
+    assert _inferred_symbols(text)[1:] == [[], []]
+    lines = create_lines_from_text(text, infer_rules=True)
+    assert [line[1].is_valid() for line in lines] == [True, False, False]
+
+def test_candidates():
+    def _symbols(formula: str, line_formulas: List[str]) -> List[str]:
+        return [
+            cls.symbol()
+            for cls in Rule.candidates(cf(formula), [cf(f) for f in line_formulas])
+        ]
+
+    assert _symbols("P&Q", ["P", "Q"]) == ["&I"]
+    assert _symbols("P", ["P&Q"]) == ["&E"]
+    assert _symbols("~P", ["P>Q", "~Q"]) == ["MP", "MT"]
+    assert _symbols("Ax(F(x))", ["F(a)"]) == ["UI"]
+    assert _symbols("F(b)", ["a=b", "F(a)"]) == ["=E"]
+    assert _symbols("P", []) == ["P", "A"]
+
+def test_inferred_rule_on_instance():
+    lines = [line for _, line in create_lines_from_text("1 1 P", infer_rules=True)]
+    assert isinstance(lines[0].rule, InferredRule)
+    assert lines[0].rule.symbol() is None
+    assert lines[0].rule.number_of_lines() is None
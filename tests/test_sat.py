@@ -0,0 +1,119 @@
+import itertools
+import random
+from typing import List
+
+from formal_proof_verifier import create_lines_from_text
+from formal_proof_verifier.formula import create_formula as cf
+from formal_proof_verifier.proof_store import ProofStore
+from formal_proof_verifier.sat import ConsequenceChecker, Solver
+from utils import map_is_valid
+
+def _is_satisfiable(number_of_variables: int, clauses: List[List[int]]) -> bool:
+    return any(
+        all(any((l > 0) == values[abs(l) - 1] for l in clause) for clause in clauses)
+        for values in itertools.product([False, True], repeat=number_of_variables)
+    )
+
+def test_random_clauses():
+    rng = random.Random(0)
+    for _ in range(300):
+        number_of_variables: int = rng.randint(1, 8)
+        clauses: List[List[int]] = [
+            [rng.choice([1, -1]) * rng.randint(1, number_of_variables) for _ in range(rng.randint(1, 3))]
+            for _ in range(rng.randint(1, 40))
+        ]
+        solver = Solver()
+        for _ in range(number_of_variables):
+            solver.new_variable()
+        for clause in clauses:
+            solver.add_clause(clause)
+
+        is_satisfiable: bool = solver.solve()
+        assert is_satisfiable == _is_satisfiable(number_of_variables, clauses)
+        if is_satisfiable:
+            model = solver.model
+            assert all(any((l > 0) == model[abs(l)] for l in clause) for clause in clauses)
+
+def test_assumptions():
+    solver = Solver()
+    p, q = solver.new_variable(), solver.new_variable()
+    solver.add_clause([-p, q])
+    assert solver.solve([p])
+    assert solver.model[q]
+    assert not solver.solve([p, -q])
+    # Assumptions are not kept between calls.
+    assert solver.solve([-q])
+    assert not solver.model[p]
+
+def test_pigeonhole():
+    # 7 pigeons do not fit into 6 holes.
+    solver = Solver()
+    pigeons, holes = 7, 6
+    variables = [[solver.new_variable() for _ in range(holes)] for _ in range(pigeons)]
+    for i in range(pigeons):
+        solver.add_clause(variables[i])
+    for j in range(holes):
+        for a in range(pigeons):
+            for b in range(a + 1, pigeons):
+                solver.add_clause([-variables[a][j], -variables[b][j]])
+    assert not solver.solve()
+
+def test_consequence_checker():
+    checker = ConsequenceChecker()
+    assert checker.follows([cf("P>Q"), cf("~Q")], cf("~P"))
+    assert checker.follows([], cf("((P>Q)>P)>P"))
+    assert checker.follows([cf("P&(~P)")], cf("Q"))
+    assert not checker.follows([cf("P>Q")], cf("Q>P"))
+    # Predicates and quantified formulas are atoms.
+    assert checker.follows([cf("Ax(Fx)"), cf("(Ax(Fx))>Ga")], cf("Ga"))
+    assert not checker.follows([cf("Ax(Fx)")], cf("Fa"))
+
+def test_many_atoms():
+    atoms: List[str] = [f"P{i}" for i in range(60)]
+    premises = [cf(f"{atoms[i]}>{atoms[i + 1]}") for i in range(len(atoms) - 1)]
+    checker = ConsequenceChecker()
+    assert checker.follows(premises, cf(f"{atoms[0]}>{atoms[-1]}"))
+    assert not checker.follows(premises, cf(f"{atoms[-1]}>{atoms[0]}"))
+
+def test_cache_reuse():
+    checker = ConsequenceChecker()
+    premises = [cf("P>(Q&R)"), cf("P")]
+    assert checker.follows(premises, cf("Q"))
+    number_of_variables: int = checker.solver.number_of_variables
+    number_of_clauses: int = checker.solver.number_of_clauses
+    # The premises are already encoded.
+    assert checker.follows(premises, cf("R"))
+    assert checker.solver.number_of_variables == number_of_variables
+    assert checker.solver.number_of_clauses == number_of_clauses
+
+def test_tautological_consequence_rule():
+    text: str = """
+        1    1 P>(Q&R)    A
+        2    2 ~R         A
+        1,2  3 ~P         1,2 TF
+        -    4 Pv(~P)     TF
+        1,2  5 ~Q         1,2 TF
+        1    6 (~R)>(~P)  2,3 CP
+        1,2  7 ~P         1 TF
+    """
+    assert map_is_valid(text) == [True, True, True, True, False, True, False]
+
+def test_tautological_consequence_rule_shares_checker():
+    text: str = """
+        1    1 P>Q        A
+        2    2 P          A
+        1,2  3 Q          1,2 TF
+        1,2  4 Q&P        1,2 TF
+    """
+    lines = [line for _, line in create_lines_from_text(text)]
+    assert all(line.is_valid() for line in lines)
+    assert lines[2].rule._proof_cache is lines[3].rule._proof_cache
+
+def test_tautological_consequence_rule_in_store():
+    text: str = """
+        1    1 P>(Q&R)    A
+        2    2 ~R         A
+        1,2  3 ~P         1,2 TF
+        1,2  4 ~Q         1,2 TF
+    """
+    assert ProofStore.from_text(text).verify() == [True, True, True, False]
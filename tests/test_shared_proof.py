@@ -0,0 +1,87 @@
+import multiprocessing
+import subprocess
+import sys
+from typing import List
+
+import pytest
+
+from formal_proof_verifier.formula import create_formula as cf
+from formal_proof_verifier.proof_store import FormulaTable, ProofStore
+from formal_proof_verifier.shared_proof import SharedProof
+from test_proof_store import PROOFS
+
+def _verify_shared(name: str) -> List[bool]:
+    shared_proof: SharedProof = SharedProof.attach(name)
+    try:
+        return shared_proof.store.verify()
+    finally:
+        shared_proof.close()
+
+@pytest.mark.parametrize("text", PROOFS)
+def test_attach(text: str):
+    store: ProofStore = ProofStore.from_text(text)
+    with SharedProof.publish(store) as published:
+        attached: SharedProof = SharedProof.attach(published.name)
+        try:
+            assert attached.store.verify() == store.verify()
+            for i in range(len(store)):
+                assert attached.store.label(i) == store.label(i)
+                assert attached.store.formula(i) == store.formula(i)
+                assert list(attached.store.dependencies(i)) == list(store.dependencies(i))
+        finally:
+            attached.close()
+
+def test_formula_table():
+    table: FormulaTable = FormulaTable()
+    node: int = table.add(cf("Ax(F(x)>(G(x)vP))"))
+    with SharedProof.publish(table) as published:
+        attached: SharedProof = SharedProof.attach(published.name)
+        try:
+            assert len(attached.store) == 0
+            assert attached.formula_table.formula(node) == cf("Ax(F(x)>(G(x)vP))")
+        finally:
+            attached.close()
+
+def test_read_only():
+    with SharedProof.publish(ProofStore.from_text(PROOFS[0])) as published:
+        attached: SharedProof = SharedProof.attach(published.name)
+        try:
+            with pytest.raises(TypeError):
+                attached.store._opcodes[0] = 0
+            with pytest.raises(RuntimeError, match="only the publisher"):
+                attached.unlink()
+        finally:
+            attached.close()
+
+def test_worker_processes():
+    store: ProofStore = ProofStore.from_text(PROOFS[1])
+    with SharedProof.publish(store) as published:
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(2) as pool:
+            results: List[List[bool]] = pool.map(_verify_shared, [published.name] * 2)
+    assert results == [store.verify()] * 2
+
+def test_independent_processes():
+    # Processes which are not children of the publisher have their own
+    # resource tracker, which must not unlink the shared memory when they exit.
+    store: ProofStore = ProofStore.from_text(PROOFS[1])
+    published: SharedProof = SharedProof.publish(store)
+    try:
+        script: str = (
+            "from formal_proof_verifier.shared_proof import SharedProof\n"
+            f"shared_proof = SharedProof.attach({published.name!r})\n"
+            "print(all(shared_proof.store.verify()))\n"
+            "shared_proof.close()\n"
+        )
+        for _ in range(2):
+            result = subprocess.run(
+                [sys.executable, "-c", script],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            assert result.stdout.strip() == str(all(store.verify()))
+            assert "leaked" not in result.stderr
+    finally:
+        published.close()
+        published.unlink()
@@ -0,0 +1,71 @@
+import time
+from typing import List
+
+from formal_proof_verifier import create_lines_from_text
+from formal_proof_verifier.formula import create_formula as cf
+from formal_proof_verifier.truth_table import find_countermodel, is_propositional, proof_sequent
+from formal_proof_verifier.verification import verify_text
+
+def test_valid_sequents():
+    assert find_countermodel([cf("P&Q")], cf("P")) is None
+    assert find_countermodel([cf("P>Q"), cf("P")], cf("Q")) is None
+    assert find_countermodel([cf("P>Q"), cf("~Q")], cf("~P")) is None
+    assert find_countermodel([cf("P&(~P)")], cf("Q")) is None
+    assert find_countermodel([], cf("Pv(~P)")) is None
+    assert find_countermodel([], cf("((P>Q)>P)>P")) is None
+
+def test_countermodels():
+    assert find_countermodel([cf("P>Q")], cf("Q>P")) == {"P": False, "Q": True}
+    assert find_countermodel([cf("PvQ")], cf("P")) == {"P": False, "Q": True}
+    assert find_countermodel([], cf("P")) == {"P": False}
+
+    premises = [cf("P>(QvR)"), cf("P")]
+    countermodel = find_countermodel(premises, cf("Q"))
+    assert countermodel == {"P": True, "Q": False, "R": True}
+
+def test_many_atoms():
+    atoms: List[str] = [f"P{i}" for i in range(25)]
+    premises = [cf(f"{atoms[i]}>{atoms[i + 1]}") for i in range(len(atoms) - 1)]
+
+    start: float = time.perf_counter()
+    assert find_countermodel(premises, cf(f"{atoms[0]}>{atoms[-1]}")) is None
+    # Generous limit, so that slow machines do not fail the test.
+    assert time.perf_counter() - start < 2.0
+
+    countermodel = find_countermodel(premises, cf(f"{atoms[-1]}>{atoms[0]}"))
+    assert countermodel is not None
+    assert countermodel[atoms[-1]] and not countermodel[atoms[0]]
+
+def test_proof_sequent():
+    text: str = """
+        1    1 P&(~P)     A
+        2    2 ~Q         A
+        1    3 P          1 &E
+        1,2  4 P&(~Q)     3,2 &I
+        1,2  5 P          4 &E
+        1    6 (~Q)>P     2,5 CP
+    """
+    premises, conclusion = proof_sequent(create_lines_from_text(text))
+    assert premises == [cf("P&(~P)")]
+    assert conclusion == cf("(~Q)>P")
+    assert find_countermodel(premises, conclusion) is None
+
+    assert is_propositional(cf("(P&Q)>(~R)"))
+    assert not is_propositional(cf("P&F(a)"))
+    assert not is_propositional(cf("Ax(F(x))"))
+
+def test_verify_text_with_sequent():
+    text: str = """
+        1 1 PvQ P
+        1 2 P   1 &E
+    """
+    report = verify_text(text, check_sequent=True)
+    assert not report.is_valid
+    assert "counterexample: P=F, Q=T" in report.error
+    assert verify_text(text).lines[1].is_valid is False
+
+    text: str = """
+        1 1 P&Q P
+        1 2 P   1 &E
+    """
+    assert verify_text(text, check_sequent=True).is_valid
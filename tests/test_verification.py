@@ -0,0 +1,128 @@
+import time
+
+import pytest
+
+from formal_proof_verifier import create_lines_from_text
+from formal_proof_verifier.budget import Budget, BudgetCounter, BudgetExceeded
+from formal_proof_verifier.verification import verify_text
+
+PROOF: str = """
+    1    1 P&Q      P
+    2    2 R        P
+    1    3 P        1 &E
+    2    4 R&R      2,2 &I
+    1    5 S        1 &E
+    1    6 Q        1 &E
+    1    7 Q&P      6,3 &I
+"""
+
+def test_target():
+    report = verify_text(PROOF, target="7")
+    assert report.is_valid
+    assert [line.is_valid for line in report.lines] == [True, None, True, None, None, True, True]
+    assert [line.line_str for line in report.dead_lines()] == [
+        "2    2 R        P",
+        "2    4 R&R      2,2 &I",
+        "1    5 S        1 &E",
+    ]
+
+    report = verify_text(PROOF, target="5")
+    assert not report.is_valid
+    assert [line.is_valid for line in report.lines] == [True, None, None, None, False, None, None]
+
+    assert not verify_text(PROOF).is_valid
+
+def test_target_does_not_parse_dead_lines():
+    text: str = """
+        1 1 P&Q      P
+        2 2 R&&S     P
+        1 3 P        1 &E
+    """
+    report = verify_text(text, target="3")
+    assert report.is_valid
+    assert report.lines[1].is_dead
+    assert verify_text(text).error is not None
+
+def test_target_errors():
+    assert "target line number '9'" in verify_text(PROOF, target="9").error
+
+    # Lines in the cone are still checked for structural errors.
+    text: str = """
+        1 1 P&Q      P
+        1 2 P        3 &E
+        1 3 Q        1 &E
+    """
+    assert "Invalid line number for rule" in verify_text(text, target="2").error
+
+def test_target_with_sequent():
+    text: str = """
+        1 1 P&Q      P
+        2 2 R        P
+        1 3 R        2 &E
+    """
+    report = verify_text(text, target="3", check_sequent=True)
+    assert "counterexample" in report.error
+
+def test_budget():
+    report = verify_text(PROOF, budget=Budget(max_lines=7))
+    assert report.budget_exceeded is None
+    assert not report.is_valid
+
+    report = verify_text(PROOF, budget=Budget(max_lines=6))
+    assert report.budget_exceeded == "max_lines"
+    assert report.error == "Error: budget exceeded, more than 6 lines."
+    assert report.to_dict()["budget_exceeded"] == "max_lines"
+
+    report = verify_text(PROOF, budget=Budget(max_formula_length=2))
+    assert report.budget_exceeded == "max_formula_length"
+    assert "line number '1'" in report.error
+
+    nested: str = "1 1 " + "~(" * 5000 + "P" + ")" * 5000 + " P"
+    report = verify_text(nested, budget=Budget(max_formula_depth=100))
+    assert report.budget_exceeded == "max_formula_depth"
+    # Without a budget, the formula is still reported instead of crashing.
+    assert verify_text(nested).error == "Error: a formula is nested too deeply."
+
+def test_budget_of_nodes():
+    # Every line cites the same line.
+    text: str = "1 1 P P\n" + "\n".join(f"1 {i} ~(~(P)) 1 DNI" for i in range(2, 1001))
+    assert verify_text(text, budget=Budget(max_nodes=100000)).is_valid
+
+    # About 7000 tokens are parsed, and 4000 units are counted by the verification.
+    report = verify_text(text, budget=Budget(max_nodes=9000))
+    assert report.budget_exceeded == "max_nodes"
+    # The lines verified before are reported.
+    assert 0 < len(report.lines) < 1000
+    assert all(line.is_valid for line in report.lines)
+
+def test_deadline():
+    text: str = "1 1 P P\n" + "\n".join(f"1 {i} ~(~(P)) 1 DNI" for i in range(2, 1001))
+    report = verify_text(text, budget=Budget(deadline=0.0))
+    assert report.budget_exceeded == "deadline"
+    assert verify_text(text, budget=Budget(deadline=60.0)).is_valid
+
+def test_deadline_of_sequent_check():
+    # A valid sequent with 32 atoms, whose truth table takes seconds.
+    formula_str: str = "P0"
+    for i in range(1, 32):
+        formula_str = f"({formula_str})&P{i}"
+    text: str = f"1 1 {formula_str} P"
+    start: float = time.monotonic()
+    report = verify_text(text, check_sequent=True, budget=Budget(deadline=0.1))
+    assert report.budget_exceeded == "deadline"
+    assert time.monotonic() - start < 1.0
+
+    # The models searched for a sequent which is not propositional are counted too.
+    text = "1 1 F(a)&(Ax(G(x)>(H(x)vR(x,a)))) P"
+    report = verify_text(text, check_sequent=True, budget=Budget(max_nodes=1000))
+    assert report.budget_exceeded == "max_nodes"
+    assert verify_text(text, check_sequent=True).is_valid
+
+def test_budget_of_lazy_formulas():
+    text: str = "1 1 " + "&".join(["(P)"] * 2) + " P\n1 2 P&P 1 &E"
+    lines = [line for _, line in create_lines_from_text(text, lazy_formulas=True)]
+    with BudgetCounter(Budget(max_nodes=5)):
+        # The budget is exceeded while the formula is parsed, on validation.
+        with pytest.raises(BudgetExceeded) as error:
+            lines[1].is_valid()
+    assert error.value.limit == "max_nodes"